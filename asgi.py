@@ -4,4 +4,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from subscriptions.live import route_dashboard_events  # noqa: E402  (needs the app registry loaded)
+
+application = route_dashboard_events(django_application)
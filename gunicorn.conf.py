@@ -0,0 +1,36 @@
+import os
+import shutil
+import subprocess
+import sys
+
+from prometheus_client import multiprocess
+
+_collector = None
+
+
+def on_starting(server):
+    # Metric files from a previous run would be merged into the new run's totals.
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def when_ready(server):
+    # The domain gauges come from a separate process writing to the same directory; start it only after
+    # on_starting has cleared the directory, or its metric files would be removed from under it.
+    global _collector
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        manage = os.path.join(os.path.dirname(os.path.abspath(__file__)), "manage.py")
+        _collector = subprocess.Popen([sys.executable, manage, "collect_metrics", "--loop", "--interval", "60"])
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    if _collector is not None:
+        _collector.terminate()
+        _collector.wait(timeout=10)
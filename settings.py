@@ -24,11 +24,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so platform probes skip everything below, including ALLOWED_HOSTS checks.
+    "subscriptions.middleware.HealthCheckMiddleware",
+    "subscriptions.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "subscriptions.middleware.CachedAuthenticationMiddleware",
+    "subscriptions.middleware.RateLimitMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -55,6 +59,7 @@ WSGI_APPLICATION = "wsgi.application"
 ASGI_APPLICATION = "asgi.application"
 
 DATABASE_URL = os.getenv("DATABASE_URL") or os.getenv("KOYEB_DATABASE_URL")
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
 
 if not DATABASE_URL:
     db_name = os.getenv("KOYEB_DB_NAME") or os.getenv("POSTGRES_DB")
@@ -81,8 +86,29 @@ else:
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": str(BASE_DIR / "db.sqlite3"),
+            # A file rather than memory, so concurrency tests can open several connections to it.
+            "TEST": {"NAME": str(BASE_DIR / "test_db.sqlite3")},
         }
     }
+    # The same file under the replica alias. Nothing is routed to it unless DATABASE_REPLICA_URL installs
+    # the router below; router tests use it as a second connection that mirrors the primary.
+    DATABASES["replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+
+# Seconds a client keeps reading from the primary after a write request.
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "15"))
+
+if DATABASE_REPLICA_URL:
+    DATABASES["replica"] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=600,
+        ssl_require=True,
+    )
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+    DATABASE_ROUTERS = ["subscriptions.routers.PrimaryReplicaRouter"]
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+        "subscriptions.middleware.PrimaryStickinessMiddleware",
+    )
 
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -101,6 +127,26 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Cached data versions, rate-limit buckets and cached users must be seen by every web worker and
+# management command, so production needs a shared cache. Without REDIS_URL each process gets its
+# own memory cache, which is only correct for a single process (local development and tests).
+REDIS_URL = os.getenv("REDIS_URL")
+SHARED_CACHE = bool(REDIS_URL)
+if REDIS_URL:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL}}
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+if SHARED_CACHE:
+    # Sessions are read from the cache and written through to the database.
+    SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+else:
+    # A per-process cache would let other workers keep a logged-out session or a deactivated user.
+    SESSION_ENGINE = "django.contrib.sessions.backends.db"
+    MIDDLEWARE[MIDDLEWARE.index("subscriptions.middleware.CachedAuthenticationMiddleware")] = (
+        "django.contrib.auth.middleware.AuthenticationMiddleware"
+    )
+
 LOGIN_URL = "login"
 LOGIN_REDIRECT_URL = "subscriptions:dashboard"
 LOGOUT_REDIRECT_URL = "home"
@@ -113,3 +159,23 @@ EXCHANGE_RATES = {
     "MXN": 0.058,
     "ARS": 0.0011,
 }
+
+# Token buckets per URL name: "user" applies to signed-in users, "ip" to every request.
+# "<tokens>/<period>" holds that many tokens, refilled evenly over s, min, h or day.
+RATE_LIMITS = {
+    "subscriptions:dashboard": {"user": "30/min", "ip": "120/min"},
+    "subscriptions:dashboard-refresh": {"user": "10/min"},
+    "subscriptions:subscription-list": {"user": "60/min", "ip": "240/min"},
+    "subscriptions:calendar-feed": {"ip": "60/h"},
+    "subscriptions:sync": {"user": "120/min"},
+    "subscriptions:batch": {"user": "30/min"},
+    "login": {"ip": "20/min"},
+}
+RATE_LIMIT_EXEMPT_USERS = [name for name in os.getenv("RATE_LIMIT_EXEMPT_USERS", "").split(",") if name]
+RATE_LIMIT_EXEMPT_IPS = [network for network in os.getenv("RATE_LIMIT_EXEMPT_IPS", "").split(",") if network]
+# Trusted proxies in front of the app (1 behind the Koyeb load balancer). The per-IP buckets read the
+# client from X-Forwarded-For only when this is set; otherwise every client shares the proxy's address.
+RATE_LIMIT_PROXY_HOPS = int(os.getenv("RATE_LIMIT_PROXY_HOPS", "0"))
+
+# Bearer token required to scrape /metrics. Without it, /metrics answers 403 unless DEBUG is on.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
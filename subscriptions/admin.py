@@ -0,0 +1,84 @@
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from .models import BillingCycle, NotificationRule, Provider, RenewalEvent, Subscription, SubscriptionHistory
+from .services import STATUS_TRANSITIONS, bulk_change_status, estimated_count
+
+
+class EstimatedCountPaginator(Paginator):
+    """Use planner statistics for unfiltered changelists instead of COUNT(*) over the whole table."""
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is not None and not query.where:
+            return estimated_count(self.object_list.model)
+        return super().count
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+@admin.register(Provider)
+class ProviderAdmin(ScalableModelAdmin):
+    list_display = ("name", "category", "owner", "updated_at")
+    list_select_related = ("owner",)
+    raw_id_fields = ("owner",)
+    search_fields = ("^name",)
+
+
+@admin.register(BillingCycle)
+class BillingCycleAdmin(ScalableModelAdmin):
+    list_display = ("__str__", "interval", "unit", "owner")
+    list_select_related = ("owner",)
+    raw_id_fields = ("owner",)
+    search_fields = ("unit",)
+
+
+def _status_action(action: str):
+    def change_status(modeladmin, request, queryset):
+        changed = bulk_change_status(queryset, action)
+        modeladmin.message_user(
+            request, f"{changed} subscriptions {STATUS_TRANSITIONS[action].action_name}.", messages.SUCCESS
+        )
+
+    change_status.__name__ = f"{action}_subscriptions"
+    return admin.action(description=f"{action.capitalize()} selected subscriptions")(change_status)
+
+
+@admin.register(Subscription)
+class SubscriptionAdmin(ScalableModelAdmin):
+    list_display = ("name", "provider", "owner", "status", "cost_amount", "cost_currency", "next_billing_date")
+    list_select_related = ("provider", "owner", "billing_cycle")
+    list_filter = ("status",)
+    raw_id_fields = ("owner",)
+    autocomplete_fields = ("provider", "billing_cycle")
+    search_fields = ("^name",)
+    readonly_fields = ("monthly_cost_base",)
+    actions = [_status_action(action) for action in STATUS_TRANSITIONS]
+
+
+@admin.register(NotificationRule)
+class NotificationRuleAdmin(ScalableModelAdmin):
+    list_display = ("__str__", "owner", "timing", "is_enabled")
+    list_select_related = ("owner", "subscription__provider")
+    raw_id_fields = ("owner", "subscription")
+
+
+@admin.register(RenewalEvent)
+class RenewalEventAdmin(ScalableModelAdmin):
+    list_display = ("__str__", "renewal_date", "amount_amount", "amount_currency", "is_processed")
+    list_select_related = ("subscription__provider",)
+    list_filter = ("is_processed",)
+    raw_id_fields = ("subscription",)
+
+
+@admin.register(SubscriptionHistory)
+class SubscriptionHistoryAdmin(ScalableModelAdmin):
+    list_display = ("__str__", "event_type", "created_at")
+    list_select_related = ("subscription",)
+    raw_id_fields = ("subscription",)
@@ -5,3 +5,6 @@ class SubscriptionsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "subscriptions"
     verbose_name = "Subscriptions"
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from .caching import bump_data_version
+from .models import (
+    ArchivedNotificationRule,
+    ArchivedRenewalEvent,
+    ArchivedSubscription,
+    ArchivedSubscriptionHistory,
+    NotificationRule,
+    RenewalEvent,
+    Subscription,
+    SubscriptionHistory,
+    SubscriptionStatus,
+)
+from .sync import record_deletions
+
+# (live model, archive model) pairs for every table referencing a subscription. A
+# table missing here makes archiving fail on its foreign key rather than lose rows.
+DEPENDENT_TABLES: list[tuple[type[models.Model], type[models.Model]]] = [
+    (NotificationRule, ArchivedNotificationRule),
+    (RenewalEvent, ArchivedRenewalEvent),
+    (SubscriptionHistory, ArchivedSubscriptionHistory),
+]
+
+
+def _copy_rows(queryset: models.QuerySet, target: type[models.Model]) -> int:
+    """Copy rows into ``target`` with a single INSERT ... SELECT, keeping every shared column as is."""
+    source_fields = {field.attname for field in queryset.model._meta.concrete_fields}
+    columns = [field.attname for field in target._meta.concrete_fields if field.attname in source_fields]
+    sql, params = queryset.order_by().values(*columns).query.sql_with_params()
+    quote = connection.ops.quote_name
+    target_columns = ", ".join(quote(target._meta.get_field(name).column) for name in columns)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {quote(target._meta.db_table)} ({target_columns}) {sql}", params)
+        return cursor.rowcount
+
+
+def delete_rows(queryset: models.QuerySet) -> int:
+    """Delete the rows of ``queryset`` with a single DELETE, without the collector's per-row fetch and signals.
+
+    Callers write the sync tombstones and handle dependent rows themselves.
+    """
+    model = queryset.model
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(model._meta.db_table)} WHERE {quote(model._meta.pk.column)} IN ({sql})", params
+        )
+        return cursor.rowcount
+
+
+def archivable_subscriptions(older_than_days: int) -> models.QuerySet[Subscription]:
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    return Subscription.objects.filter(status=SubscriptionStatus.CANCELLED, cancellation_date__lt=cutoff)
+
+
+def archive_cancelled_subscriptions(older_than_days: int, batch_size: int = 1000) -> int:
+    """Move subscriptions cancelled more than ``older_than_days`` ago, and their dependents, to the archive."""
+    eligible = archivable_subscriptions(older_than_days).order_by("pk")
+    archived = 0
+    last_pk = None
+    while True:
+        remaining = eligible if last_pk is None else eligible.filter(pk__gt=last_pk)
+        chunk = list(remaining.values_list("pk", "owner_id")[:batch_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1][0]
+        pks = [pk for pk, _ in chunk]
+        with transaction.atomic():
+            live = Subscription.objects.filter(pk__in=pks)
+            _copy_rows(live, ArchivedSubscription)
+            for model, archive_model in DEPENDENT_TABLES:
+                dependents = model.objects.filter(subscription_id__in=pks)
+                _copy_rows(dependents, archive_model)
+                record_deletions(dependents)
+                # The rows were copied verbatim, so skip the collector's per-row fetch and signals.
+                delete_rows(dependents)
+            record_deletions(live)
+            delete_rows(live)
+        for owner_id in {owner_id for _, owner_id in chunk}:
+            bump_data_version(owner_id)
+        archived += len(pks)
+    return archived
+
+
+def restore_archived_subscription(archived: ArchivedSubscription) -> Subscription:
+    """Move an archived subscription and its dependents back into the live tables."""
+    pk = archived.pk
+    now = timezone.now()
+    with transaction.atomic():
+        _copy_rows(ArchivedSubscription.objects.filter(pk=pk), Subscription)
+        # Only updated_at moves, so sync clients that saw the archive tombstones pick the rows up again.
+        Subscription.objects.filter(pk=pk).update(updated_at=now)
+        for model, archive_model in DEPENDENT_TABLES:
+            _copy_rows(archive_model.objects.filter(subscription_id=pk), model)
+            model.objects.filter(subscription_id=pk).update(updated_at=now)
+        archived.delete()
+    bump_data_version(archived.owner_id)
+    return Subscription.objects.get(pk=pk)
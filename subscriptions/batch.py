@@ -0,0 +1,312 @@
+"""Batched creates and updates for API clients.
+
+``POST /batch/`` takes a list of operations and applies them in one transaction::
+
+    {"operations": [
+        {"op": "create", "type": "subscription", "ref": "music", "data": {...}},
+        {"op": "create", "type": "notification_rule", "data": {"subscription": "$music", "timing": "1_day"}},
+        {"op": "update", "type": "renewal_event", "id": "<uuid>", "data": {"is_processed": true}}
+    ]}
+
+Each operation is validated with the fields and per-user scoping of the
+matching create/update view; updates only need the fields they change. Rows
+are then written with one ``bulk_create`` and one ``bulk_update`` per model,
+and subscription history with one insert. A ``ref`` names a row created in the
+batch, and a foreign key given as ``"$<ref>"`` points at it. Subscriptions are
+written first so rules and renewal events can reference them. If any operation
+is invalid nothing is kept, and the results say which operations failed.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from django.db import transaction
+from django.db.models import F, Model
+from django.forms import ModelForm, model_to_dict, modelform_factory
+from django.utils import timezone
+
+from .caching import bump_data_version
+from .forms import NOTIFICATION_RULE_FIELDS, RENEWAL_EVENT_FIELDS, SUBSCRIPTION_FIELDS
+from .models import BillingCycle, NotificationRule, Provider, RenewalEvent, Subscription, SubscriptionHistory
+from .scoping import scope_owned_or_shared_queryset, scope_queryset_for_user
+from .spend import uncount_renewal
+
+MAX_OPERATIONS = 500
+REFERENCE_PREFIX = "$"
+
+
+class BatchError(ValueError):
+    """The payload is malformed, as opposed to an operation failing validation."""
+
+
+@dataclass
+class _Operation:
+    index: int
+    action: str
+    kind: str
+    data: dict
+    ref: str | None = None
+    target_id: UUID | None = None
+    form: ModelForm | None = None
+    changed: list[str] = field(default_factory=list)
+    errors: dict[str, list[str]] = field(default_factory=dict)
+
+    @property
+    def instance(self) -> Any:
+        assert self.form is not None
+        return self.form.instance
+
+
+class _Kind:
+    model: type[Model]
+    fields: list[str]
+    derived_fields: list[str] = []
+    owner_lookup = "owner"
+
+    def updatable(self, user):
+        return scope_queryset_for_user(self.model._default_manager.all(), user, self.owner_lookup)
+
+    def prepare(self, instance, user, now: datetime) -> None:
+        """Apply what the view's ``form_valid`` and the model's ``save`` would."""
+
+    def validate(self, instance) -> dict[str, list[str]]:
+        return {}
+
+    def unique_key(self, instance) -> tuple | None:
+        return None
+
+    def after_write(self, created: list[_Operation], updated: list[_Operation]) -> None:
+        pass
+
+
+class _Subscriptions(_Kind):
+    model = Subscription
+    fields = SUBSCRIPTION_FIELDS
+    derived_fields = ["next_billing_date", "monthly_cost_base", "version"]
+
+    def prepare(self, instance, user, now):
+        if not instance.owner_id:
+            instance.owner = user
+        if not instance._state.adding:
+            # Invalidates edit forms rendered before this batch, as an edit through the view would.
+            instance.version = F("version") + 1
+        instance.next_billing_date = instance.billing_cycle.next_due_date(instance.start_date, reference_date=now)
+        instance.update_derived_fields()
+
+    def after_write(self, created, updated):
+        SubscriptionHistory.objects.bulk_create(
+            [
+                SubscriptionHistory(
+                    subscription=op.instance,
+                    event_type=SubscriptionHistory.EventType.CREATED,
+                    description="Subscription created",
+                )
+                for op in created
+            ]
+            + [
+                SubscriptionHistory(
+                    subscription=op.instance,
+                    event_type=SubscriptionHistory.EventType.UPDATED,
+                    description=f"Updated fields: {', '.join(op.changed)}",
+                )
+                for op in updated
+                if op.changed
+            ]
+        )
+
+
+class _NotificationRules(_Kind):
+    model = NotificationRule
+    fields = NOTIFICATION_RULE_FIELDS
+    derived_fields = ["owner"]
+
+    def prepare(self, instance, user, now):
+        if instance.subscription_id is not None:
+            instance.owner_id = instance.subscription.owner_id
+        elif not instance.owner_id:
+            instance.owner = user
+
+    def validate(self, instance):
+        if instance.subscription_id is None:
+            # The owner is not a form field, so ModelForm skips this unique constraint.
+            clash = NotificationRule.objects.filter(
+                owner_id=instance.owner_id, subscription__isnull=True, timing=instance.timing
+            )
+            if clash.exclude(pk=instance.pk).exists():
+                return {"timing": ["A default rule with this timing already exists."]}
+        return {}
+
+    def unique_key(self, instance):
+        if instance.subscription_id is None:
+            return (None, instance.owner_id, instance.timing)
+        return (instance.subscription_id, None, instance.timing)
+
+
+class _RenewalEvents(_Kind):
+    model = RenewalEvent
+    fields = RENEWAL_EVENT_FIELDS
+    derived_fields = ["owner"]
+    owner_lookup = "subscription__owner"
+
+    def prepare(self, instance, user, now):
+        instance.update_derived_fields()
+        # bulk_update sends no pre_save signal.
+        uncount_renewal(instance)
+
+
+# In write order: later kinds may reference rows created by earlier ones.
+KINDS: dict[str, _Kind] = {
+    "subscription": _Subscriptions(),
+    "notification_rule": _NotificationRules(),
+    "renewal_event": _RenewalEvents(),
+}
+
+
+def _parse(operations) -> list[_Operation]:
+    if not isinstance(operations, list):
+        raise BatchError("operations must be a list.")
+    if len(operations) > MAX_OPERATIONS:
+        raise BatchError(f"A batch holds at most {MAX_OPERATIONS} operations.")
+    parsed = []
+    refs = set()
+    for index, raw in enumerate(operations):
+        if not isinstance(raw, dict):
+            raise BatchError(f"Operation {index} must be an object.")
+        action, kind, data, ref = raw.get("op"), raw.get("type"), raw.get("data", {}), raw.get("ref")
+        if action not in ("create", "update"):
+            raise BatchError(f"Operation {index}: op must be 'create' or 'update'.")
+        if kind not in KINDS:
+            raise BatchError(f"Operation {index}: type must be one of {', '.join(KINDS)}.")
+        if not isinstance(data, dict):
+            raise BatchError(f"Operation {index}: data must be an object.")
+        if ref is not None:
+            if action != "create" or not isinstance(ref, str) or not ref:
+                raise BatchError(f"Operation {index}: ref must be a non-empty string on a create.")
+            if ref in refs:
+                raise BatchError(f"Operation {index}: ref {ref!r} is used twice.")
+            refs.add(ref)
+        target_id = None
+        if action == "update":
+            try:
+                target_id = UUID(str(raw["id"]))
+            except (KeyError, ValueError):
+                raise BatchError(f"Operation {index}: an update needs a valid id.") from None
+        parsed.append(_Operation(index, action, kind, data, ref=ref, target_id=target_id))
+    return parsed
+
+
+def _resolve_references(kind: _Kind, op: _Operation, refs: dict, failed_refs: set) -> dict:
+    data = dict(op.data)
+    unknown = sorted(set(data) - set(kind.fields))
+    if unknown:
+        op.errors["__all__"] = [f"Unknown fields: {', '.join(unknown)}."]
+    for name in kind.fields:
+        value = data.get(name)
+        if not (isinstance(value, str) and value.startswith(REFERENCE_PREFIX)):
+            continue
+        ref = value[len(REFERENCE_PREFIX):]
+        target = kind.model._meta.get_field(name).related_model
+        if ref in refs and refs[ref]._meta.model is target:
+            data[name] = str(refs[ref].pk)
+        elif ref in failed_refs:
+            op.errors[name] = [f"Refers to operation {ref!r}, which failed."]
+        else:
+            op.errors[name] = [f"Unknown reference {value!r}."]
+    return data
+
+
+def _scope_form(form, user) -> None:
+    """Limit foreign key choices exactly as the create/update views do."""
+    fields = form.fields
+    if "provider" in fields:
+        fields["provider"].queryset = scope_owned_or_shared_queryset(Provider.objects.all(), user)
+    if "billing_cycle" in fields:
+        fields["billing_cycle"].queryset = scope_queryset_for_user(BillingCycle.objects.all(), user)
+    if "subscription" in fields:
+        fields["subscription"].queryset = scope_queryset_for_user(Subscription.objects.all(), user)
+
+
+def _apply_group(kind: _Kind, group: list[_Operation], user, now, refs: dict, failed_refs: set) -> None:
+    targets = kind.updatable(user).in_bulk([op.target_id for op in group if op.action == "update"])
+    form_class = modelform_factory(kind.model, fields=kind.fields)
+    keys: dict[tuple, int] = {}
+    for op in group:
+        instance = None
+        if op.action == "update":
+            instance = targets.get(op.target_id)
+            if instance is None:
+                op.errors["id"] = ["Not found."]
+                continue
+        data = _resolve_references(kind, op, refs, failed_refs)
+        if op.errors:
+            continue
+        initial = model_to_dict(instance if instance is not None else kind.model(), kind.fields)
+        op.form = form_class(data={**initial, **data}, instance=instance)
+        _scope_form(op.form, user)
+        if not op.form.is_valid():
+            op.errors = {name: list(messages) for name, messages in op.form.errors.items()}
+            continue
+        # Compared on the instance rather than form.changed_data, which drops microseconds from initial values.
+        current = model_to_dict(op.instance, kind.fields)
+        op.changed = [name for name in kind.fields if current[name] != initial[name]]
+        kind.prepare(op.instance, user, now)
+        op.errors = kind.validate(op.instance)
+        key = kind.unique_key(op.instance)
+        if not op.errors and key is not None:
+            if key in keys:
+                op.errors["__all__"] = [f"Duplicates operation {keys[key]} in this batch."]
+            keys[key] = op.index
+
+    for op in group:
+        if op.errors and op.ref:
+            failed_refs.add(op.ref)
+    created = [op for op in group if op.action == "create" and not op.errors]
+    updated = [op for op in group if op.action == "update" and not op.errors]
+    kind.model._default_manager.bulk_create([op.instance for op in created])
+    for op in updated:
+        op.instance.updated_at = now
+    if updated:
+        kind.model._default_manager.bulk_update(
+            [op.instance for op in updated], [*kind.fields, *kind.derived_fields, "updated_at"]
+        )
+    for op in created:
+        if op.ref:
+            refs[op.ref] = op.instance
+    kind.after_write(created, updated)
+
+
+def _result(op: _Operation, applied: bool) -> dict:
+    result: dict[str, Any] = {"index": op.index, "op": op.action, "type": op.kind}
+    if op.ref:
+        result["ref"] = op.ref
+    if op.errors:
+        result.update(status="invalid", errors=op.errors)
+    elif not applied:
+        result["status"] = "not_applied"
+    else:
+        result.update(status="created" if op.action == "create" else "updated", id=str(op.instance.pk))
+    return result
+
+
+def apply_batch(user, operations, now=None) -> tuple[bool, list[dict]]:
+    """Validate and apply ``operations`` for ``user`` atomically; return (applied, per-operation results)."""
+    parsed = _parse(operations)
+    now = now or timezone.now()
+    refs: dict[str, Model] = {}
+    failed_refs: set[str] = set()
+    with transaction.atomic():
+        for name, kind in KINDS.items():
+            group = [op for op in parsed if op.kind == name]
+            if group:
+                _apply_group(kind, group, user, now, refs, failed_refs)
+        applied = not any(op.errors for op in parsed)
+        if not applied:
+            transaction.set_rollback(True)
+    if applied:
+        for owner_id in {op.instance.owner_id for op in parsed}:
+            bump_data_version(owner_id)
+    return applied, [_result(op, applied) for op in parsed]
@@ -0,0 +1,33 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+
+from .metrics import record_cache_lookup
+
+GLOBAL_SCOPE = "global"
+
+
+def _version_key(scope) -> str:
+    return f"subscriptions:data-version:{scope}"
+
+
+def _scope_version(scope) -> str:
+    key = _version_key(scope)
+    version = cache.get(key)
+    record_cache_lookup("data_version", version is not None)
+    if version is None:
+        # A missing (or evicted) version gets a fresh random value, which only
+        # ever causes a cache miss downstream, never a stale hit.
+        cache.add(key, uuid4().hex[:12], None)
+        version = cache.get(key)
+    return version
+
+
+def get_data_version(user_id) -> str:
+    """Return a token that changes whenever data visible to the user changes."""
+    return f"{_scope_version(GLOBAL_SCOPE)}.{_scope_version(user_id)}"
+
+
+def bump_data_version(user_id=None) -> None:
+    """Invalidate cached data for one user, or for everyone when ``user_id`` is None."""
+    cache.set(_version_key(GLOBAL_SCOPE if user_id is None else user_id), uuid4().hex[:12], None)
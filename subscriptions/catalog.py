@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import csv
+import json
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from django.utils.text import slugify
+
+from .caching import bump_data_version
+from .models import Provider
+
+CATALOG_FIELDS = ("name", "category", "website", "cancellation_url")
+
+
+@dataclass
+class CatalogLoadResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+
+def read_catalog(path: str | Path) -> Iterator[dict]:
+    """Yield catalog rows from a JSON array or a CSV file with a header row."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8") as handle:
+            yield from csv.DictReader(handle)
+    else:
+        with path.open(encoding="utf-8") as handle:
+            yield from json.load(handle)
+
+
+def _catalog_entry(row: dict, line: int) -> tuple[str, tuple[str, ...]]:
+    name = (row.get("name") or "").strip()
+    category = (row.get("category") or "").strip()
+    if not name or not category:
+        raise ValueError(f"Catalog entry {line} needs a name and a category.")
+    key = slugify(row.get("key") or name)[:100]
+    values = (name, category, (row.get("website") or "").strip(), (row.get("cancellation_url") or "").strip())
+    return key, values
+
+
+def load_provider_catalog(rows: Iterable[dict], chunk_size: int = 1000) -> CatalogLoadResult:
+    """Upsert shared providers by catalog key, writing only rows that are new or changed."""
+    result = CatalogLoadResult()
+    numbered = enumerate(rows, start=1)
+    while chunk := list(islice(numbered, chunk_size)):
+        # Later duplicates of a key win, and a key may only appear once per upsert statement.
+        entries = dict(_catalog_entry(row, line) for line, row in chunk)
+        existing = {
+            key: tuple(values)
+            for key, *values in Provider.objects.filter(catalog_key__in=entries).values_list(
+                "catalog_key", *CATALOG_FIELDS
+            )
+        }
+        pending = []
+        for key, values in entries.items():
+            if existing.get(key) == values:
+                result.unchanged += 1
+                continue
+            if key in existing:
+                result.updated += 1
+            else:
+                result.inserted += 1
+            pending.append(Provider(owner=None, catalog_key=key, **dict(zip(CATALOG_FIELDS, values))))
+        if pending:
+            Provider.objects.bulk_create(
+                pending,
+                update_conflicts=True,
+                unique_fields=["catalog_key"],
+                update_fields=[*CATALOG_FIELDS, "updated_at"],
+            )
+    if result.inserted or result.updated:
+        # Shared providers are visible to every user.
+        bump_data_version()
+    return result
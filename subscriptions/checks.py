@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core import checks
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Rate limits, data versions and cached users are only correct across processes with a shared cache."""
+    if getattr(settings, "SHARED_CACHE", False):
+        return []
+    return [
+        checks.Warning(
+            "No shared cache is configured, so every process enforces its own rate limits "
+            "and misses data version bumps made by other processes.",
+            hint="Set REDIS_URL.",
+            id="subscriptions.W001",
+        )
+    ]
+
+
+@checks.register(checks.Tags.security, deploy=True)
+def check_metrics_token(app_configs, **kwargs):
+    """``/metrics`` refuses every scrape outside ``DEBUG`` until a token is set."""
+    if settings.METRICS_TOKEN:
+        return []
+    return [
+        checks.Warning(
+            "METRICS_TOKEN is not set, so /metrics answers 403 to every scrape.",
+            hint="Set METRICS_TOKEN and send it as 'Authorization: Bearer <token>'.",
+            id="subscriptions.W002",
+        )
+    ]
@@ -8,3 +8,4 @@ def convert_to_base(amount: Decimal, currency: str) -> Decimal:
     if rate == 0:
         return Decimal("0")
     return amount * rate
+
@@ -2,6 +2,21 @@ from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 
+# Editable fields of the create/update views, shared with the batch API.
+SUBSCRIPTION_FIELDS = [
+    "name",
+    "provider",
+    "cost_amount",
+    "cost_currency",
+    "billing_cycle",
+    "status",
+    "start_date",
+    "cancellation_date",
+    "notes",
+]
+NOTIFICATION_RULE_FIELDS = ["subscription", "timing", "is_enabled"]
+RENEWAL_EVENT_FIELDS = ["subscription", "renewal_date", "amount_amount", "amount_currency", "is_processed"]
+
 
 class SignInForm(AuthenticationForm):
     error_messages = {
@@ -0,0 +1,84 @@
+"""Liveness and readiness probes for the platform health check.
+
+``middleware.HealthCheckMiddleware`` sits first in ``MIDDLEWARE`` and answers
+``/healthz`` and ``/readyz`` itself, so probes skip sessions, authentication,
+CSRF, host validation, templates and URL resolution. ``/healthz`` only shows
+that the worker is serving requests. ``/readyz`` also runs ``SELECT 1`` on the
+default database under a statement timeout, and checks that no migrations are
+pending; that result is kept for ``MIGRATION_CHECK_TTL`` seconds, since loading
+the migration graph is far slower than the probe itself.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+LIVENESS_PATHS = frozenset({"/healthz", "/healthz/"})
+READINESS_PATHS = frozenset({"/readyz", "/readyz/"})
+DATABASE_TIMEOUT_MS = 2000
+MIGRATION_CHECK_TTL = 60.0
+
+_migrations_checked: tuple[float, bool] | None = None
+
+
+def check_database(alias: str = DEFAULT_DB_ALIAS) -> bool:
+    connection = connections[alias]
+    try:
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(f"SET LOCAL statement_timeout = {DATABASE_TIMEOUT_MS}")
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    except Exception:
+        logger.exception("Readiness database check failed")
+        return False
+    return True
+
+
+def check_migrations(alias: str = DEFAULT_DB_ALIAS, now: float | None = None) -> bool:
+    """Whether every migration is applied, cached in process for ``MIGRATION_CHECK_TTL`` seconds."""
+    global _migrations_checked
+    now = time.monotonic() if now is None else now
+    if _migrations_checked is not None and now - _migrations_checked[0] < MIGRATION_CHECK_TTL:
+        return _migrations_checked[1]
+    try:
+        executor = MigrationExecutor(connections[alias])
+        applied = not executor.migration_plan(executor.loader.graph.leaf_nodes())
+    except Exception:
+        logger.exception("Readiness migration check failed")
+        applied = False
+    _migrations_checked = (now, applied)
+    return applied
+
+
+def _json_response(checks: dict[str, bool], method: str) -> HttpResponse:
+    ready = all(checks.values())
+    body = {"status": "ok" if ready else "unavailable", "checks": {name: "ok" if ok else "failed" for name, ok in checks.items()}}
+    response = HttpResponse(
+        b"" if method == "HEAD" else json.dumps(body).encode(),
+        status=200 if ready else 503,
+        content_type="application/json",
+    )
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+def probe_response(path: str, method: str) -> HttpResponse | None:
+    """The response for a health probe, or None when the request is not one."""
+    if method not in ("GET", "HEAD"):
+        return None
+    if path in LIVENESS_PATHS:
+        return _json_response({}, method)
+    if path in READINESS_PATHS:
+        # Skip the migration check while the database is down; it could only fail, and slower.
+        database = check_database()
+        return _json_response({"database": database, "migrations": database and check_migrations()}, method)
+    return None
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import NOTIFICATION_TIMING_OFFSETS, CalendarFeedKey, Subscription, new_calendar_feed_secret
+from .services import ProjectedRenewal, effective_notification_timings, merge_billing_schedules
+
+FEED_HORIZON_DAYS = 365
+FEED_MAX_EVENTS = 500
+TOKEN_SALT = "subscriptions.ics.calendar-feed"
+
+
+def _token(user_id, secret: str) -> str:
+    return salted_hmac(TOKEN_SALT, f"{user_id}:{secret}").hexdigest()[:32]
+
+
+def calendar_feed_token(user_id) -> str:
+    key, _ = CalendarFeedKey.objects.get_or_create(user_id=user_id)
+    return _token(user_id, key.secret)
+
+
+def rotate_calendar_feed_token(user_id) -> str:
+    """Replace the user's feed secret, revoking the old feed URL, and return the new token."""
+    secret = new_calendar_feed_secret()
+    CalendarFeedKey.objects.update_or_create(user_id=user_id, defaults={"secret": secret})
+    return _token(user_id, secret)
+
+
+def is_valid_calendar_feed_token(user_id, token: str) -> bool:
+    """Whether ``token`` is the current feed token of an active user, checked in one query."""
+    secret = (
+        CalendarFeedKey.objects.filter(user_id=user_id, user__is_active=True).values_list("secret", flat=True).first()
+    )
+    return secret is not None and constant_time_compare(token, _token(user_id, secret))
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    # RFC 5545 limits content lines to 75 octets; continuation lines start with a space.
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts: list[str] = []
+    while len(encoded) > 75:
+        cut = 75 if not parts else 74
+        while cut and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+    parts.append(encoded.decode("utf-8"))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _render_event(renewal: ProjectedRenewal, timings: list, stamp: str) -> str:
+    subscription = renewal.subscription
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{subscription.pk}-{renewal.renewal_date:%Y%m%d}@smp",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART;VALUE=DATE:{renewal.renewal_date:%Y%m%d}",
+        "SUMMARY:" + _escape(f"{subscription.name} renews ({renewal.amount_amount} {renewal.amount_currency})"),
+        "DESCRIPTION:" + _escape(f"Provider: {subscription.provider.name}"),
+    ]
+    for timing in timings:
+        lines += [
+            "BEGIN:VALARM",
+            "ACTION:DISPLAY",
+            f"TRIGGER:-P{NOTIFICATION_TIMING_OFFSETS[timing].days}D",
+            "DESCRIPTION:" + _escape(f"{subscription.name} renews soon"),
+            "END:VALARM",
+        ]
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+
+def render_renewal_feed(user_id) -> Iterator[str]:
+    """Yield an iCalendar document of a user's projected renewals and reminder alarms."""
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//SMP//Renewals//EN\r\nX-WR-CALNAME:Subscription renewals\r\n"
+    renewals = merge_billing_schedules(
+        Subscription.objects.filter(owner_id=user_id), days=FEED_HORIZON_DAYS, limit=FEED_MAX_EVENTS
+    )
+    timings = effective_notification_timings(
+        Subscription.objects.filter(pk__in={renewal.subscription.pk for renewal in renewals})
+    )
+    stamp = f"{timezone.now():%Y%m%dT%H%M%SZ}"
+    for renewal in renewals:
+        yield _render_event(renewal, timings.get(renewal.subscription.pk, []), stamp)
+    yield "END:VCALENDAR\r\n"
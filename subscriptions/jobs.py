@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor
+from datetime import timedelta
+from typing import Any, Callable
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job, JobStatus
+
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+
+def enqueue(
+    func: Callable[..., Any] | str,
+    *,
+    priority: int = 0,
+    run_at=None,
+    max_attempts: int = 5,
+    **kwargs,
+) -> Job:
+    """Queue ``func(**kwargs)`` to run on a worker; kwargs must be JSON serializable."""
+    name = func if isinstance(func, str) else f"{func.__module__}.{func.__qualname__}"
+    return Job.objects.create(
+        name=name,
+        payload=kwargs,
+        priority=priority,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts,
+    )
+
+
+def claim_jobs(batch_size: int = 10, now=None) -> list[Job]:
+    now = now or timezone.now()
+    queryset = Job.objects.filter(status=JobStatus.QUEUED, run_at__lte=now).order_by("-priority", "run_at")
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            jobs = list(queryset.select_for_update(skip_locked=True)[:batch_size])
+            Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                status=JobStatus.RUNNING, locked_at=now, attempts=F("attempts") + 1
+            )
+        else:
+            jobs = [
+                job
+                for job in queryset[:batch_size]
+                if Job.objects.filter(pk=job.pk, status=JobStatus.QUEUED).update(
+                    status=JobStatus.RUNNING, locked_at=now, attempts=F("attempts") + 1
+                )
+            ]
+    for job in jobs:
+        job.status = JobStatus.RUNNING
+        job.locked_at = now
+        job.attempts += 1
+    return jobs
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return min(timedelta(seconds=10 * 2 ** (attempts - 1)), MAX_RETRY_DELAY)
+
+
+def run_job(job: Job) -> bool:
+    """Run a claimed job. Finished jobs are deleted; failures are retried or dead-lettered."""
+    try:
+        import_string(job.name)(**job.payload)
+    except Exception as exc:
+        job.last_error = f"{type(exc).__name__}: {exc}"
+        job.locked_at = None
+        if job.attempts >= job.max_attempts:
+            job.status = JobStatus.DEAD
+        else:
+            job.status = JobStatus.QUEUED
+            job.run_at = timezone.now() + retry_delay(job.attempts)
+        job.save(update_fields=["status", "run_at", "last_error", "locked_at", "updated_at"])
+        return False
+    job.delete()
+    return True
+
+
+def _run_job_in_thread(job: Job) -> bool:
+    close_old_connections()
+    try:
+        return run_job(job)
+    finally:
+        close_old_connections()
+
+
+def release_stale_jobs(older_than: timedelta) -> tuple[int, int]:
+    """Release jobs left running by a worker that died mid-batch, returning (requeued, dead).
+
+    Each claim counts as an attempt, so a job that keeps killing its worker is
+    dead-lettered once it has used ``max_attempts`` instead of being requeued forever.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status=JobStatus.RUNNING, locked_at__lt=now - older_than)
+    dead = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=JobStatus.DEAD, locked_at=None, last_error="Worker stopped while running the job.", updated_at=now
+    )
+    requeued = stale.update(status=JobStatus.QUEUED, locked_at=None, updated_at=now)
+    return requeued, dead
+
+
+def work_batch(batch_size: int = 10, executor: Executor | None = None) -> int:
+    """Claim and run one batch of jobs, optionally on a thread pool, returning how many ran."""
+    jobs = claim_jobs(batch_size)
+    if executor is None:
+        for job in jobs:
+            run_job(job)
+    else:
+        list(executor.map(_run_job_in_thread, jobs))
+    return len(jobs)
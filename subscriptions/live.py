@@ -0,0 +1,306 @@
+"""Live dashboard updates over Server-Sent Events.
+
+Each ASGI worker runs one ``DashboardHub``. A single polling task per worker
+reads what changed in the database since its previous tick and fans small
+deltas out to the connected clients of the owners concerned, so the database
+load does not grow with the number of open dashboards. An idle connection
+costs one bounded queue and two suspended tasks; nothing polls while no
+client is connected.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import timedelta
+from decimal import Decimal
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Sum
+from django.http import HttpRequest
+from django.http.cookie import parse_cookie
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import RenewalEvent, Subscription, SubscriptionStatus
+from .sessions import get_cached_user
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 2.0
+KEEPALIVE_INTERVAL = 15.0
+# Recompute every connected owner's totals this often, which also picks up deletions.
+RESYNC_EVERY = 30
+CLIENT_QUEUE_SIZE = 16
+UPCOMING_WINDOW = timedelta(days=30)
+# Rows committed late can carry an updated_at slightly older than the last cursor,
+# so each poll looks back this far and skips rows it has already delivered.
+POLL_OVERLAP = timedelta(seconds=5)
+OWNER_CHUNK_SIZE = 500
+
+KEEPALIVE = b": keepalive\n\n"
+
+
+def encode_event(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+def _chunks(values: list, size: int) -> Iterable[list]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+class ChangePoller:
+    """Turn database changes since the previous poll into per-owner SSE messages."""
+
+    def __init__(self, now=None) -> None:
+        self._started = now or timezone.now()
+        self._cursor = self._started
+        self._delivered: dict = {}
+        self._totals: dict = {}
+
+    def forget(self, user_id) -> None:
+        self._totals.pop(user_id, None)
+
+    def poll(self, user_ids: set, resync_ids: set, now=None) -> list[tuple[object, bytes]]:
+        now = now or timezone.now()
+        since = max(self._cursor - POLL_OVERLAP, self._started)
+        messages = self._renewal_messages(user_ids, since, now)
+        changed_owners = set(
+            Subscription.objects.filter(updated_at__gt=since).values_list("owner_id", flat=True).distinct()
+        )
+        messages.extend(self._totals_messages((changed_owners & user_ids) | resync_ids))
+        self._cursor = now
+        # Anything older than the next look-back window can no longer be seen twice.
+        horizon = now - POLL_OVERLAP
+        self._delivered = {key: at for key, at in self._delivered.items() if at > horizon}
+        return messages
+
+    def _renewal_messages(self, user_ids: set, since, now) -> list[tuple[object, bytes]]:
+        rows = RenewalEvent.objects.filter(updated_at__gt=since).values(
+            "pk",
+            "subscription__owner_id",
+            "subscription__name",
+            "renewal_date",
+            "amount_amount",
+            "amount_currency",
+            "is_processed",
+            "updated_at",
+        )
+        messages = []
+        for row in rows.order_by("updated_at"):
+            owner_id = row["subscription__owner_id"]
+            key = (row["pk"], row["updated_at"])
+            if owner_id not in user_ids or key in self._delivered:
+                continue
+            self._delivered[key] = row["updated_at"]
+            data = {
+                "id": str(row["pk"]),
+                "subscription": row["subscription__name"],
+                "renewal_date": row["renewal_date"].isoformat(),
+                "amount": str(row["amount_amount"]),
+                "currency": row["amount_currency"],
+            }
+            if row["is_processed"]:
+                messages.append((owner_id, encode_event("renewal.processed", data)))
+            elif row["renewal_date"] <= now + UPCOMING_WINDOW:
+                messages.append((owner_id, encode_event("renewal.upcoming", data)))
+        return messages
+
+    def _totals_messages(self, owner_ids: set) -> list[tuple[object, bytes]]:
+        totals = dict.fromkeys(owner_ids, Decimal("0"))
+        for chunk in _chunks(sorted(owner_ids), OWNER_CHUNK_SIZE):
+            rows = (
+                Subscription.objects.filter(owner_id__in=chunk, status=SubscriptionStatus.ACTIVE)
+                .values("owner_id")
+                .annotate(monthly=Sum("monthly_cost_base"))
+                .order_by()
+            )
+            totals.update((row["owner_id"], row["monthly"]) for row in rows)
+        messages = []
+        for owner_id, monthly in totals.items():
+            if self._totals.get(owner_id) == monthly:
+                continue
+            self._totals[owner_id] = monthly
+            data = {
+                "monthly_total": f"{monthly:.2f}",
+                "annual_total": f"{monthly * 12:.2f}",
+                "currency": settings.BASE_CURRENCY,
+            }
+            messages.append((owner_id, encode_event("totals", data)))
+        return messages
+
+
+def _database_poll(poller: ChangePoller) -> Callable[[set, set], Awaitable[list]]:
+    def poll(user_ids: set, resync_ids: set) -> list:
+        try:
+            return poller.poll(user_ids, resync_ids)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(poll)
+
+
+class DashboardHub:
+    """Per-process fan-out from one shared poller to every connected dashboard."""
+
+    def __init__(
+        self,
+        poll: Callable[[set, set], Awaitable[list]] | None = None,
+        poll_interval: float = POLL_INTERVAL,
+        keepalive_interval: float = KEEPALIVE_INTERVAL,
+    ):
+        self._poller = ChangePoller()
+        self._poll = poll or _database_poll(self._poller)
+        self.poll_interval = poll_interval
+        self.keepalive_interval = keepalive_interval
+        self._clients: dict[object, set[asyncio.Queue]] = {}
+        self._needs_totals: set = set()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def connections(self) -> int:
+        return sum(len(queues) for queues in self._clients.values())
+
+    def subscribe(self, user_id) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self._clients.setdefault(user_id, set()).add(queue)
+        # A new client has no baseline yet; the next poll sends it the current totals.
+        self._needs_totals.add(user_id)
+        self._poller.forget(user_id)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return queue
+
+    def unsubscribe(self, user_id, queue: asyncio.Queue) -> None:
+        queues = self._clients.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._clients[user_id]
+                self._poller.forget(user_id)
+        if not self._clients and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def publish(self, user_id, message: bytes) -> None:
+        for queue in self._clients.get(user_id, ()):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # A stalled client misses deltas rather than growing without bound;
+                # it gets fresh totals when it reconnects.
+                pass
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        last_keepalive = loop.time()
+        tick = 0
+        while self._clients:
+            await asyncio.sleep(self.poll_interval)
+            user_ids = set(self._clients)
+            resync_ids = user_ids if tick % RESYNC_EVERY == RESYNC_EVERY - 1 else self._needs_totals & user_ids
+            self._needs_totals.clear()
+            tick += 1
+            try:
+                messages = await self._poll(user_ids, resync_ids)
+            except Exception:
+                logger.exception("Dashboard change poll failed")
+                self._needs_totals.update(resync_ids)
+                continue
+            for user_id, message in messages:
+                self.publish(user_id, message)
+            if loop.time() - last_keepalive >= self.keepalive_interval:
+                last_keepalive = loop.time()
+                for user_id in list(self._clients):
+                    self.publish(user_id, KEEPALIVE)
+
+
+hub = DashboardHub()
+
+
+def _session_user_id(session_key: str | None):
+    """The authenticated user's id for a session cookie, resolved like ``CachedAuthenticationMiddleware`` does."""
+    if not session_key:
+        return None
+    try:
+        request = HttpRequest()
+        request.session = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+        user = get_cached_user(request)
+        return user.pk if user.is_authenticated else None
+    finally:
+        close_old_connections()
+
+
+async def _plain_response(send, status: int) -> None:
+    await send({"type": "http.response.start", "status": status, "headers": [(b"content-length", b"0")]})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _wait_for_disconnect(receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def dashboard_events_application(scope, receive, send) -> None:
+    """Stream dashboard deltas as Server-Sent Events.
+
+    This bypasses Django's request handling on purpose: a Django ASGI request
+    holds a dedicated sync thread (and with it a database connection) for as
+    long as its response streams. Here the session is checked with one call on
+    the shared sync thread, and an idle stream then holds no thread at all.
+    """
+    if scope["method"] != "GET":
+        await _plain_response(send, 405)
+        return
+    cookie = "; ".join(value.decode("latin-1") for name, value in scope["headers"] if name == b"cookie")
+    user_id = await sync_to_async(_session_user_id)(parse_cookie(cookie).get(settings.SESSION_COOKIE_NAME))
+    if user_id is None:
+        await _plain_response(send, 401)
+        return
+
+    queue = hub.subscribe(user_id)
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    message: asyncio.Future | None = None
+    try:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": b"retry: 5000\n\n", "more_body": True})
+        while True:
+            message = asyncio.ensure_future(queue.get())
+            await asyncio.wait((message, disconnected), return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                return
+            await send({"type": "http.response.body", "body": message.result(), "more_body": True})
+    finally:
+        disconnected.cancel()
+        if message is not None:
+            message.cancel()
+        hub.unsubscribe(user_id, queue)
+
+
+def route_dashboard_events(application):
+    """Wrap the Django ASGI application so the event stream path is served by ``dashboard_events_application``."""
+    path = reverse("subscriptions:dashboard-events")
+
+    async def router(scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == path:
+            await dashboard_events_application(scope, receive, send)
+        else:
+            await application(scope, receive, send)
+
+    return router
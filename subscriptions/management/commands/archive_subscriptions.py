@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from ...archive import archive_cancelled_subscriptions
+
+
+class Command(BaseCommand):
+    help = "Move long-cancelled subscriptions and their rules, renewals and history into the archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Archive subscriptions cancelled more than this many days ago.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        archived = archive_cancelled_subscriptions(options["days"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} subscriptions."))
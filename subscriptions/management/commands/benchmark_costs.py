@@ -0,0 +1,60 @@
+import random
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...models import BillingCycle, BillingCycleUnit, Subscription
+from ...services import summarize_costs
+
+
+def summarize_costs_decimal(subscriptions):
+    monthly = Decimal("0")
+    annual = Decimal("0")
+    for subscription in subscriptions:
+        monthly += subscription.monthly_cost_in_base()
+        annual += subscription.annual_cost_in_base()
+    return monthly, annual
+
+
+class Command(BaseCommand):
+    help = "Compare the Decimal and integer minor-unit cost summaries on in-memory subscriptions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        cycles = [
+            BillingCycle(interval=interval, unit=unit)
+            for unit in BillingCycleUnit.values
+            for interval in (1, 3, 7)
+        ]
+        currencies = list(settings.EXCHANGE_RATES)
+        subscriptions = []
+        for _ in range(options["count"]):
+            subscription = Subscription(
+                cost_amount=Decimal(rng.randint(100, 50_000)) / 100,
+                cost_currency=rng.choice(currencies),
+                billing_cycle=rng.choice(cycles),
+            )
+            subscription.update_derived_fields()
+            subscriptions.append(subscription)
+
+        timings = {}
+        for label, func in (("decimal", summarize_costs_decimal), ("integer", summarize_costs)):
+            best = float("inf")
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                func(subscriptions)
+                best = min(best, time.perf_counter() - started)
+            timings[label] = best
+
+        monthly_decimal, _ = summarize_costs_decimal(subscriptions)
+        summary = summarize_costs(subscriptions)
+        self.stdout.write(f"decimal: {timings['decimal']:.3f}s  integer: {timings['integer']:.3f}s")
+        self.stdout.write(f"speedup: {timings['decimal'] / timings['integer']:.2f}x")
+        self.stdout.write(f"monthly total difference: {abs(summary.monthly_total - monthly_decimal)}")
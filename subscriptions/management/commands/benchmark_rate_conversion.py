@@ -0,0 +1,57 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...models import ExchangeRate, RenewalEvent
+from ...services import HistoricalRateConverter, convert_renewal_amounts
+
+# Codes outside ISO 4217, so the benchmark never touches real rate series.
+CURRENCIES = ["XBA", "XBB", "XBC", "XBD", "XBE"]
+
+
+class Command(BaseCommand):
+    help = "Time convert_renewal_amounts on in-memory renewal events against daily historical rate series."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=1_000_000)
+        parser.add_argument("--currencies", type=int, choices=range(1, len(CURRENCIES) + 1), default=3)
+        parser.add_argument("--points", type=int, default=2000, help="Daily rates per currency.")
+
+    def handle(self, *args, **options):
+        currencies = CURRENCIES[: options["currencies"]]
+        points = options["points"]
+        first = date(2000, 1, 1)
+        ExchangeRate.objects.bulk_create(
+            (
+                ExchangeRate(currency=currency, effective_date=first + timedelta(days=day), rate=Decimal(1 + day % 100) / 100)
+                for currency in currencies
+                for day in range(points)
+            ),
+            batch_size=5000,
+        )
+        try:
+            started = time.perf_counter()
+            HistoricalRateConverter(currencies)
+            loaded = time.perf_counter() - started
+
+            start = timezone.make_aware(timezone.datetime(2000, 1, 1))
+            events = [
+                RenewalEvent(
+                    renewal_date=start + timedelta(days=index % (points + 30)),
+                    amount_amount=Decimal("9.99"),
+                    amount_currency=currencies[index % len(currencies)],
+                )
+                for index in range(options["events"])
+            ]
+            started = time.perf_counter()
+            convert_renewal_amounts(events)
+            converted = time.perf_counter() - started
+        finally:
+            ExchangeRate.objects.filter(currency__in=currencies).delete()
+        self.stdout.write(
+            f"{options['events']} events, {len(currencies)}x{points} rate points: "
+            f"loading series {loaded * 1000:.0f} ms, converting {converted:.2f} s"
+        )
@@ -0,0 +1,73 @@
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from ...models import BillingCycle, BillingCycleUnit, Provider, RenewalEvent, Subscription, SubscriptionHistory
+from ...services import delete_subscriptions
+
+
+class Command(BaseCommand):
+    help = "Compare delete latency of Django's collector and delete_subscriptions as history grows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--history", type=int, nargs="+", default=[10, 1_000, 10_000, 100_000])
+        parser.add_argument("--renewals", type=int, default=100, help="Renewal events per subscription.")
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.create_user(username=f"benchmark-delete-{time.time_ns()}")
+        provider = Provider.objects.create(owner=user, name="Benchmark", category="Software")
+        cycle = BillingCycle.objects.create(owner=user, interval=1, unit=BillingCycleUnit.MONTHS)
+
+        def create(history: int) -> Subscription:
+            subscription = Subscription.objects.create(
+                owner=user,
+                name="Benchmark",
+                provider=provider,
+                cost_amount=Decimal("5.00"),
+                billing_cycle=cycle,
+                start_date=timezone.now(),
+                next_billing_date=timezone.now(),
+            )
+            RenewalEvent.objects.bulk_create(
+                RenewalEvent(owner=user, subscription=subscription, renewal_date=timezone.now(), amount_amount=Decimal("5"))
+                for _ in range(options["renewals"])
+            )
+            SubscriptionHistory.objects.bulk_create(
+                (
+                    SubscriptionHistory(subscription=subscription, event_type=SubscriptionHistory.EventType.UPDATED)
+                    for _ in range(history)
+                ),
+                batch_size=5000,
+            )
+            return subscription
+
+        methods = {
+            "collector": lambda subscription: subscription.delete(),
+            "delete_subscriptions": lambda subscription: delete_subscriptions(
+                Subscription.objects.filter(pk=subscription.pk)
+            ),
+        }
+        self.stdout.write(f"{connection.vendor}, {options['renewals']} renewal events, best of {options['repeat']}")
+        try:
+            for history in options["history"]:
+                timings = {}
+                for label, delete in methods.items():
+                    best = float("inf")
+                    for _ in range(options["repeat"]):
+                        subscription = create(history)
+                        started = time.perf_counter()
+                        delete(subscription)
+                        best = min(best, time.perf_counter() - started)
+                    timings[label] = best
+                self.stdout.write(
+                    f"{history:>9} history rows: "
+                    + "  ".join(f"{label} {seconds * 1000:.1f} ms" for label, seconds in timings.items())
+                )
+        finally:
+            Subscription.objects.filter(owner=user).delete()
+            user.delete()
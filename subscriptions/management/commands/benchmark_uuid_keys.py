@@ -0,0 +1,77 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import UUIDField
+
+from ...uuids import uuid7
+
+GENERATORS = {"v4": uuid.uuid4, "v7": uuid7}
+
+
+class Command(BaseCommand):
+    help = "Compare insert throughput and index size of UUIDv4 and UUIDv7 keys on a scratch history-shaped table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--subscriptions", type=int, default=10_000, help="Distinct foreign key values.")
+
+    def handle(self, *args, **options):
+        uuid_type = connection.data_types["UUIDField"]
+        field = UUIDField()
+        quote = connection.ops.quote_name
+        subscription_ids = [field.get_db_prep_value(uuid.uuid4(), connection) for _ in range(options["subscriptions"])]
+        self.stdout.write(f"{connection.vendor}, {options['rows']} rows")
+        for label, generate in GENERATORS.items():
+            table = quote(f"benchmark_history_{label}")
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+                cursor.execute(
+                    f"CREATE TABLE {table} (id {uuid_type} NOT NULL PRIMARY KEY, subscription_id {uuid_type} NOT NULL, "
+                    "description varchar(64) NOT NULL)"
+                )
+                cursor.execute(f"CREATE INDEX {quote(f'benchmark_history_{label}_sub')} ON {table} (subscription_id)")
+            insert = f"INSERT INTO {table} (id, subscription_id, description) VALUES (%s, %s, %s)"
+            started = time.perf_counter()
+            for offset in range(0, options["rows"], options["batch_size"]):
+                count = min(options["batch_size"], options["rows"] - offset)
+                rows = [
+                    (
+                        field.get_db_prep_value(generate(), connection),
+                        subscription_ids[(offset + index) % len(subscription_ids)],
+                        "Renewal processed",
+                    )
+                    for index in range(count)
+                ]
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany(insert, rows)
+            elapsed = time.perf_counter() - started
+            sizes = self.index_sizes(f"benchmark_history_{label}")
+            self.stdout.write(
+                f"{label}: {options['rows'] / elapsed:,.0f} rows/s, "
+                + ", ".join(f"{name} {size / 2**20:.1f} MiB" for name, size in sizes.items())
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE {table}")
+
+    def index_sizes(self, table: str) -> dict[str, int]:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT CASE WHEN i.indisprimary THEN 'primary key' ELSE 'foreign key' END, "
+                    "pg_relation_size(i.indexrelid) FROM pg_index i WHERE i.indrelid = %s::regclass",
+                    [table],
+                )
+            elif connection.vendor == "sqlite":
+                # Needs SQLite built with the dbstat table, as CPython's bundled SQLite is.
+                cursor.execute(
+                    "SELECT CASE WHEN name LIKE 'sqlite_autoindex%%' THEN 'primary key' ELSE 'foreign key' END, "
+                    "SUM(pgsize) FROM dbstat WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name = %s "
+                    "AND type = 'index') GROUP BY name",
+                    [table],
+                )
+            else:
+                return {}
+            return dict(cursor.fetchall())
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...metrics import collect_domain_metrics
+
+
+class Command(BaseCommand):
+    help = "Refresh the domain gauges exported on /metrics."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep collecting instead of exiting after one pass.")
+        parser.add_argument("--interval", type=float, default=60.0, help="Seconds between collections with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            collect_domain_metrics()
+            self.stdout.write(f"Collected domain metrics in {time.perf_counter() - started:.3f}s.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...spend import RETENTION_DAYS, compact_renewal_events
+
+
+class Command(BaseCommand):
+    help = "Fold old processed renewal events into monthly spend snapshots and delete them in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=RETENTION_DAYS,
+            help="Compact processed renewals dated more than this many days ago.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--loop", action="store_true", help="Keep compacting instead of exiting after one pass.")
+        parser.add_argument("--interval", type=float, default=86400.0, help="Seconds between passes with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            compacted = compact_renewal_events(options["days"], batch_size=options["batch_size"])
+            self.stdout.write(f"Compacted {compacted} renewal events.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
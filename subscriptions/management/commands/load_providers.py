@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...catalog import load_provider_catalog, read_catalog
+
+
+class Command(BaseCommand):
+    help = "Upsert shared providers from a JSON or CSV catalog file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Catalog file (.json array or .csv with a header row).")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            result = load_provider_catalog(read_catalog(options["path"]), chunk_size=options["chunk_size"])
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Providers: {result.inserted} inserted, {result.updated} updated, {result.unchanged} unchanged."
+            )
+        )
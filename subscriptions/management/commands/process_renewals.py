@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from ...services import process_due_renewals
+
+
+class Command(BaseCommand):
+    help = "Process due renewal events in batches. Safe to run as several concurrent workers on PostgreSQL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for due renewals instead of exiting once the backlog is drained.",
+        )
+        parser.add_argument("--interval", type=float, default=30.0, help="Seconds to sleep between polls with --loop.")
+
+    def handle(self, *args, **options):
+        if not connection.features.has_select_for_update_skip_locked:
+            self.stderr.write(
+                f"{connection.vendor} does not support SKIP LOCKED; run a single worker for this database."
+            )
+        total = 0
+        while True:
+            processed = process_due_renewals(batch_size=options["batch_size"])
+            total += processed
+            if processed:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} renewal events."))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...sync import prune_deletion_log
+
+
+class Command(BaseCommand):
+    help = "Delete sync tombstones older than the retention window in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--loop", action="store_true", help="Keep pruning instead of exiting after one pass.")
+        parser.add_argument("--interval", type=float, default=86400.0, help="Seconds between passes with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            pruned = prune_deletion_log(batch_size=options["batch_size"])
+            self.stdout.write(f"Pruned {pruned} deletion log entries.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...sessions import purge_expired_sessions
+
+
+class Command(BaseCommand):
+    help = "Delete expired sessions in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--loop", action="store_true", help="Keep purging instead of exiting after one pass.")
+        parser.add_argument("--interval", type=float, default=3600.0, help="Seconds between passes with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            purged = purge_expired_sessions(batch_size=options["batch_size"])
+            self.stdout.write(f"Purged {purged} expired sessions.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from ...services import recompute_monthly_cost_base
+
+
+class Command(BaseCommand):
+    help = "Recompute every subscription's base-currency monthly cost. Run after changing EXCHANGE_RATES."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        updated = recompute_monthly_cost_base(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Recomputed monthly cost for {updated} subscriptions."))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...services import rollover_billing_dates
+
+
+class Command(BaseCommand):
+    help = "Advance next_billing_date on active subscriptions whose billing date has passed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--loop", action="store_true", help="Keep rolling dates over instead of exiting after one pass.")
+        parser.add_argument("--interval", type=float, default=86400.0, help="Seconds between passes with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            updated = rollover_billing_dates(batch_size=options["batch_size"])
+            self.stdout.write(f"Rolled over {updated} billing dates in {time.perf_counter() - started:.2f}s.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
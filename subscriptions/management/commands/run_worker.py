@@ -0,0 +1,52 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from ...jobs import release_stale_jobs, work_batch
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs on a thread pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--batch-size", type=int, default=20)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for jobs instead of exiting once the queue is drained.",
+        )
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds to sleep between polls with --loop.")
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=600,
+            help="Release jobs that have been running for longer than this many seconds.",
+        )
+
+    def handle(self, *args, **options):
+        requeued, dead = release_stale_jobs(timedelta(seconds=options["stale_after"]))
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale jobs.")
+        if dead:
+            self.stdout.write(f"Dead-lettered {dead} stale jobs that used all their attempts.")
+
+        total = 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as executor:
+            while True:
+                ran = work_batch(batch_size=options["batch_size"], executor=executor)
+                total += ran
+                if ran:
+                    continue
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed else 0.0
+        self.stdout.write(
+            self.style.SUCCESS(f"Ran {total} jobs in {elapsed:.2f}s ({rate:.1f} jobs/sec with {options['threads']} threads).")
+        )
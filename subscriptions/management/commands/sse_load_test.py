@@ -0,0 +1,141 @@
+import asyncio
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+from django.utils import timezone
+
+from ...models import BillingCycle, BillingCycleUnit, Provider, RenewalEvent, Subscription, SubscriptionStatus
+
+LOAD_TEST_USERNAME = "sse-load-test"
+
+
+class Command(BaseCommand):
+    help = (
+        "Open many in-process SSE connections to the dashboard event stream through the ASGI application, "
+        "then report memory per connection and how long one change takes to reach every client."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=2000)
+        parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for the change to fan out.")
+
+    def handle(self, *args, **options):
+        user, subscription, session_key = self.set_up()
+        try:
+            asyncio.run(self.run(subscription, session_key, options["clients"], options["timeout"]))
+        finally:
+            SessionStore(session_key=session_key).delete()
+            # Subscriptions protect their provider and billing cycle, so they go first.
+            subscription.delete()
+            user.delete()
+
+    def set_up(self):
+        user_model = get_user_model()
+        Subscription.objects.filter(owner__username=LOAD_TEST_USERNAME).delete()
+        user_model.objects.filter(username=LOAD_TEST_USERNAME).delete()
+        user = user_model.objects.create_user(username=LOAD_TEST_USERNAME)
+        subscription = Subscription.objects.create(
+            owner=user,
+            name="Load test",
+            provider=Provider.objects.create(owner=user, name="Load test", category="Testing"),
+            cost_amount=Decimal("10.00"),
+            billing_cycle=BillingCycle.objects.create(owner=user, interval=1, unit=BillingCycleUnit.MONTHS),
+            status=SubscriptionStatus.ACTIVE,
+            start_date=timezone.now(),
+            next_billing_date=timezone.now() + timedelta(days=7),
+        )
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = "django.contrib.auth.backends.ModelBackend"
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        return user, subscription, session.session_key
+
+    async def run(self, subscription, session_key, clients, timeout):
+        from asgi import application
+
+        from ...live import hub
+
+        path = reverse("subscriptions:dashboard-events")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"localhost"), (b"cookie", f"sessionid={session_key}".encode())],
+            "client": ("127.0.0.1", 0),
+            "server": ("localhost", 80),
+        }
+        disconnect = asyncio.Event()
+        connected = asyncio.Semaphore(0)
+        delivered = asyncio.Semaphore(0)
+        statuses: dict[int, int] = {}
+
+        async def client():
+            request_sent = False
+
+            async def receive():
+                nonlocal request_sent
+                if not request_sent:
+                    request_sent = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                await disconnect.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    statuses[message["status"]] = statuses.get(message["status"], 0) + 1
+                elif message.get("body", b"").startswith(b"retry:"):
+                    connected.release()
+                elif message.get("body", b"").startswith(b"event: renewal.upcoming"):
+                    delivered.release()
+
+            await application(dict(scope), receive, send)
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(client()) for _ in range(clients)]
+        for _ in range(clients):
+            await asyncio.wait_for(connected.acquire(), timeout)
+        connect_seconds = time.perf_counter() - started
+        per_connection = (tracemalloc.get_traced_memory()[0] - baseline) / clients
+        tracemalloc.stop()
+        self.stdout.write(
+            f"{hub.connections} connections open in {connect_seconds:.2f}s "
+            f"({per_connection / 1024:.1f} KiB of Python heap each); responses: {statuses}"
+        )
+
+        await sync_to_async(RenewalEvent.objects.create)(
+            subscription=subscription,
+            renewal_date=timezone.now() + timedelta(days=7),
+            amount_amount=subscription.cost_amount,
+        )
+        changed = time.perf_counter()
+        received = 0
+        try:
+            for _ in range(clients):
+                await asyncio.wait_for(delivered.acquire(), timeout)
+                received += 1
+        except TimeoutError:
+            pass
+        self.stdout.write(
+            f"Change reached {received}/{clients} clients in {time.perf_counter() - changed:.2f}s "
+            f"(poll interval {hub.poll_interval}s)."
+        )
+
+        disconnect.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.stdout.write(self.style.SUCCESS(f"Closed; {hub.connections} connections left open."))
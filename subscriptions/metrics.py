@@ -0,0 +1,115 @@
+"""Prometheus metrics.
+
+Set ``PROMETHEUS_MULTIPROC_DIR`` to a directory shared by every gunicorn
+worker (and the ``collect_metrics`` process) so ``/metrics`` reports values
+aggregated across processes instead of just the worker that served the scrape.
+"""
+
+from __future__ import annotations
+
+import os
+
+from django.db.models import Count, Q
+from django.db.models.functions import Upper
+from django.utils import timezone
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from .models import NotificationRule, RenewalEvent, Subscription, SubscriptionStatus
+
+REQUEST_LATENCY = Histogram(
+    "smp_request_duration_seconds",
+    "Time spent producing a response, by URL name.",
+    ["view", "method"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "smp_request_db_queries",
+    "Database queries executed per request, by URL name.",
+    ["view"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float("inf")),
+)
+CACHE_LOOKUPS = Counter(
+    "smp_cache_lookups_total",
+    "Cache lookups by cache and result; hit ratio is hit / (hit + miss).",
+    ["cache", "result"],
+)
+RATE_LIMITED = Counter(
+    "smp_rate_limited_total",
+    "Requests refused with 429, by URL name and bucket scope (user or ip).",
+    ["view", "scope"],
+)
+RENEWAL_BACKLOG = Gauge(
+    "smp_renewal_backlog",
+    "Unprocessed renewal events.",
+    multiprocess_mode="mostrecent",
+)
+OVERDUE_RENEWALS = Gauge(
+    "smp_overdue_renewals",
+    "Unprocessed renewal events whose renewal date has passed.",
+    multiprocess_mode="mostrecent",
+)
+ENABLED_NOTIFICATION_RULES = Gauge(
+    "smp_enabled_notification_rules",
+    "Enabled notification rules.",
+    multiprocess_mode="mostrecent",
+)
+ACTIVE_SUBSCRIPTIONS = Gauge(
+    "smp_active_subscriptions",
+    "Active subscriptions by cost currency.",
+    ["currency"],
+    multiprocess_mode="mostrecent",
+)
+DOMAIN_METRICS_UPDATED = Gauge(
+    "smp_domain_metrics_updated_timestamp_seconds",
+    "When the domain gauges were last collected.",
+    multiprocess_mode="mostrecent",
+)
+
+
+_reported_currencies: set[str] = set()
+
+
+def record_cache_lookup(cache_name: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache_name, "hit" if hit else "miss").inc()
+
+
+def collect_domain_metrics() -> None:
+    """Recompute the domain gauges. Run periodically, never per scrape."""
+    now = timezone.now()
+    renewals = RenewalEvent.objects.filter(is_processed=False).aggregate(
+        backlog=Count("pk"), overdue=Count("pk", filter=Q(renewal_date__lt=now))
+    )
+    RENEWAL_BACKLOG.set(renewals["backlog"])
+    OVERDUE_RENEWALS.set(renewals["overdue"])
+    ENABLED_NOTIFICATION_RULES.set(NotificationRule.objects.filter(is_enabled=True).count())
+    active = (
+        Subscription.objects.filter(status=SubscriptionStatus.ACTIVE)
+        .values(currency=Upper("cost_currency"))
+        .annotate(total=Count("pk"))
+        .order_by()
+    )
+    totals = {row["currency"]: row["total"] for row in active}
+    # Currencies with no active subscriptions left drop to zero rather than keep their last value.
+    for currency in _reported_currencies - totals.keys():
+        ACTIVE_SUBSCRIPTIONS.labels(currency).set(0)
+    for currency, total in totals.items():
+        ACTIVE_SUBSCRIPTIONS.labels(currency).set(total)
+    _reported_currencies.update(totals)
+    DOMAIN_METRICS_UPDATED.set(now.timestamp())
+
+
+def render_metrics() -> tuple[bytes, str]:
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
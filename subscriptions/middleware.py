@@ -0,0 +1,114 @@
+import time
+from contextlib import ExitStack, nullcontext
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.functional import SimpleLazyObject
+
+from .health import probe_response
+from .metrics import REQUEST_DB_QUERIES, REQUEST_LATENCY
+from .ratelimit import RateLimiter, check_rate_limits
+from .routers import use_primary
+from .sessions import get_cached_user
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS", "TRACE"}
+
+
+class HealthCheckMiddleware:
+    """Answer ``/healthz`` and ``/readyz`` before any other middleware runs."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = probe_response(request.path_info, request.method)
+        return response if response is not None else self.get_response(request)
+
+
+class PrimaryStickinessMiddleware:
+    """Pin reads to the primary during and shortly after any write request.
+
+    Replicas lag behind the primary, so a user redirected after a POST would
+    otherwise not see their own change. A short-lived cookie keeps that user's
+    reads on the primary until the replica has caught up.
+    """
+
+    cookie_name = "smp_use_primary"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        is_write = request.method not in SAFE_METHODS
+        pinned = is_write or self.cookie_name in request.COOKIES
+        with use_primary() if pinned else nullcontext():
+            response = self.get_response(request)
+        if is_write:
+            response.set_cookie(
+                self.cookie_name,
+                "1",
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class MetricsMiddleware:
+    """Record request latency and database query counts, labelled by URL name."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        REQUEST_LATENCY.labels(view, request.method).observe(elapsed)
+        REQUEST_DB_QUERIES.labels(view).observe(queries)
+        return response
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """``AuthenticationMiddleware`` that resolves ``request.user`` through the user cache."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_cached_user(request))
+
+
+class RateLimitMiddleware:
+    """Answer ``429 Too Many Requests`` once a client's bucket for the resolved URL name is empty.
+
+    Must come after ``CachedAuthenticationMiddleware``, since per-user buckets need ``request.user``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limiter = RateLimiter()
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        retry_after = check_rate_limits(self.limiter, request, request.resolver_match.view_name)
+        if not retry_after:
+            return None
+        response = HttpResponse("Too many requests.", status=429, content_type="text/plain")
+        response["Retry-After"] = str(retry_after)
+        return response
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0005_seed_predefined_providers'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='subscriptionhistory',
+            name='event_type',
+            field=models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('status_changed', 'Status changed'), ('renewed', 'Renewed')], max_length=32),
+        ),
+        migrations.AddIndex(
+            model_name='renewalevent',
+            index=models.Index(fields=['is_processed', 'renewal_date'], name='renewal_due_idx'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:12
+
+import uuid
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Frozen copies of BillingCycle.monthly_multiplier and convert_to_base as of this
+# migration, so later changes to the model code leave the backfill as it was.
+def _monthly_multiplier(cycle):
+    interval = Decimal(cycle.interval)
+    mapping = {
+        "days": Decimal("30") / interval,
+        "weeks": Decimal("4.33") / interval,
+        "months": Decimal("1") / interval,
+        "years": Decimal("1") / (interval * Decimal("12")),
+    }
+    return mapping.get(cycle.unit, Decimal("1"))
+
+
+def _monthly_cost_base(subscription):
+    rate = Decimal(str(settings.EXCHANGE_RATES.get(subscription.cost_currency.upper(), 1)))
+    monthly = Decimal(subscription.cost_amount) * _monthly_multiplier(subscription.billing_cycle)
+    return (monthly * rate if rate else Decimal("0")).quantize(Decimal("0.0001"))
+
+
+def backfill_monthly_cost_base(apps, schema_editor):
+    Subscription = apps.get_model("subscriptions", "Subscription")
+    batch = []
+    for subscription in Subscription.objects.select_related("billing_cycle").iterator(chunk_size=1000):
+        subscription.monthly_cost_base = _monthly_cost_base(subscription)
+        batch.append(subscription)
+        if len(batch) == 1000:
+            Subscription.objects.bulk_update(batch, ["monthly_cost_base"])
+            batch = []
+    Subscription.objects.bulk_update(batch, ["monthly_cost_base"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0007_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('currency', models.CharField(max_length=3)),
+                ('effective_date', models.DateField()),
+                ('rate', models.DecimalField(decimal_places=8, help_text='Base currency units per unit of this currency from the effective date on.', max_digits=18)),
+            ],
+            options={
+                'ordering': ['currency', 'effective_date'],
+            },
+        ),
+        migrations.AddField(
+            model_name='subscription',
+            name='monthly_cost_base',
+            field=models.DecimalField(decimal_places=4, default=Decimal('0'), editable=False, help_text='Monthly cost in the base currency, kept in sync for filtering and sorting.', max_digits=14),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['owner', 'monthly_cost_base'], name='subscription_owner_cost_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='exchangerate',
+            constraint=models.UniqueConstraint(fields=('currency', 'effective_date'), name='unique_exchange_rate_per_day'),
+        ),
+        migrations.RunPython(backfill_monthly_cost_base, migrations.RunPython.noop),
+    ]
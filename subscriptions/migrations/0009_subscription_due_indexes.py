@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0008_monthly_cost_base_and_exchange_rates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['owner', 'status', 'next_billing_date'], name='subscription_owner_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['status', 'next_billing_date'], name='subscription_due_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0009_subscription_due_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='provider',
+            index=models.Index(fields=['owner', 'name', 'id'], name='provider_owner_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='provider',
+            index=models.Index(condition=models.Q(('owner__isnull', True)), fields=['name', 'id'], name='provider_shared_name_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:23
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0010_provider_scope_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardRollup',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('providers', models.PositiveBigIntegerField()),
+                ('subscriptions', models.PositiveBigIntegerField()),
+                ('billing_cycles', models.PositiveBigIntegerField()),
+                ('notifications', models.PositiveBigIntegerField()),
+                ('renewals_pending', models.PositiveBigIntegerField()),
+                ('monthly_total', models.DecimalField(decimal_places=4, max_digits=18)),
+                ('annual_total', models.DecimalField(decimal_places=4, max_digits=18)),
+            ],
+            options={
+                'get_latest_by': 'created_at',
+            },
+        ),
+    ]
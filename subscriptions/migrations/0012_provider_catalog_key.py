@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:26
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def assign_catalog_keys(apps, schema_editor):
+    Provider = apps.get_model("subscriptions", "Provider")
+    seen = set()
+    shared = Provider.objects.filter(owner__isnull=True, catalog_key__isnull=True).order_by("created_at")
+    for provider in shared.only("pk", "name"):
+        key = slugify(provider.name)[:100]
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        Provider.objects.filter(pk=provider.pk).update(catalog_key=key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0011_dashboard_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='provider',
+            name='catalog_key',
+            field=models.SlugField(blank=True, editable=False, help_text='Natural key of shared providers loaded from the provider catalog.', max_length=100, null=True, unique=True),
+        ),
+        migrations.RunPython(assign_catalog_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:31
+
+import django.db.models.deletion
+import django.db.models.functions.datetime
+import subscriptions.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0012_provider_catalog_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSubscription',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('cost_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('cost_currency', models.CharField(max_length=3)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('paused', 'Paused'), ('cancelled', 'Cancelled')], max_length=16)),
+                ('start_date', models.DateTimeField()),
+                ('next_billing_date', models.DateTimeField()),
+                ('cancellation_date', models.DateTimeField(blank=True, null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('monthly_cost_base', models.DecimalField(decimal_places=4, max_digits=14)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now())),
+                ('billing_cycle', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_subscriptions', to='subscriptions.billingcycle')),
+                ('owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_subscriptions', to=settings.AUTH_USER_MODEL)),
+                ('provider', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_subscriptions', to='subscriptions.provider')),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+            bases=(subscriptions.models.SubscriptionCostMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name='ArchivedRenewalEvent',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('renewal_date', models.DateTimeField()),
+                ('amount_amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Amount')),
+                ('amount_currency', models.CharField(max_length=3, verbose_name='Currency')),
+                ('is_processed', models.BooleanField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('subscription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renewal_events', to='subscriptions.archivedsubscription')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedNotificationRule',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('timing', models.CharField(choices=[('1_day', '1 day before'), ('3_days', '3 days before'), ('1_week', '1 week before'), ('2_weeks', '2 weeks before')], max_length=16)),
+                ('is_enabled', models.BooleanField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('subscription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_rules', to='subscriptions.archivedsubscription')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedSubscriptionHistory',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('event_type', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('status_changed', 'Status changed'), ('renewed', 'Renewed')], max_length=32)),
+                ('description', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('subscription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='history', to='subscriptions.archivedsubscription')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedsubscription',
+            index=models.Index(fields=['owner', 'name'], name='archived_sub_owner_name_idx'),
+        ),
+    ]
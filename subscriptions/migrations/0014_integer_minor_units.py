@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:02
+
+from decimal import ROUND_HALF_EVEN, Decimal
+
+from django.db import migrations, models
+
+# Frozen copy of the currency exponent table and the half-even to_minor of
+# subscriptions.money as of this migration, so later changes to that module
+# leave the backfill as it was and it rounds exactly as save() did.
+CURRENCY_EXPONENTS = {
+    "ARS": 2,
+    "BHD": 3,
+    "CLP": 0,
+    "EUR": 2,
+    "GBP": 2,
+    "JPY": 0,
+    "KRW": 0,
+    "KWD": 3,
+    "MXN": 2,
+    "USD": 2,
+}
+DEFAULT_EXPONENT = 2
+
+# (model, decimal amount field, currency field, minor-unit field)
+MINOR_UNIT_COLUMNS = [
+    ("Subscription", "cost_amount", "cost_currency", "cost_minor"),
+    ("ArchivedSubscription", "cost_amount", "cost_currency", "cost_minor"),
+    ("RenewalEvent", "amount_amount", "amount_currency", "amount_minor"),
+    ("ArchivedRenewalEvent", "amount_amount", "amount_currency", "amount_minor"),
+]
+
+
+def _to_minor(amount, currency):
+    exponent = CURRENCY_EXPONENTS.get(currency.upper(), DEFAULT_EXPONENT)
+    return int(Decimal(amount).scaleb(exponent).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+def backfill_minor_units(apps, schema_editor):
+    for model_name, amount_field, currency_field, minor_field in MINOR_UNIT_COLUMNS:
+        model = apps.get_model("subscriptions", model_name)
+        batch = []
+        rows = model.objects.only("pk", amount_field, currency_field).iterator(chunk_size=1000)
+        for row in rows:
+            setattr(row, minor_field, _to_minor(getattr(row, amount_field), getattr(row, currency_field)))
+            batch.append(row)
+            if len(batch) == 1000:
+                model.objects.bulk_update(batch, [minor_field])
+                batch = []
+        model.objects.bulk_update(batch, [minor_field])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0013_subscription_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscription',
+            name='cost_minor',
+            field=models.BigIntegerField(default=0, editable=False, help_text='cost_amount in integer minor units of cost_currency.'),
+        ),
+        migrations.AddField(
+            model_name='renewalevent',
+            name='amount_minor',
+            field=models.BigIntegerField(default=0, editable=False, help_text='amount_amount in integer minor units of amount_currency.'),
+        ),
+        migrations.AddField(
+            model_name='archivedsubscription',
+            name='cost_minor',
+            field=models.BigIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='archivedrenewalevent',
+            name='amount_minor',
+            field=models.BigIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_minor_units, migrations.RunPython.noop),
+    ]
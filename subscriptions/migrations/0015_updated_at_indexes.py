@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0014_integer_minor_units'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='renewalevent',
+            index=models.Index(fields=['updated_at'], name='renewal_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['updated_at'], name='subscription_updated_idx'),
+        ),
+    ]
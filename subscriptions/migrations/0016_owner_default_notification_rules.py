@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_rule_owners(apps, schema_editor):
+    for rule_model, subscription_model in (
+        ("NotificationRule", "Subscription"),
+        ("ArchivedNotificationRule", "ArchivedSubscription"),
+    ):
+        owners = apps.get_model("subscriptions", subscription_model).objects.filter(pk=OuterRef("subscription_id"))
+        apps.get_model("subscriptions", rule_model).objects.update(owner_id=Subquery(owners.values("owner_id")[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0015_updated_at_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='notificationrule',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='archivednotificationrule',
+            name='owner',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_notification_rules', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='notificationrule',
+            name='owner',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notification_rules', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_rule_owners, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='notificationrule',
+            name='subscription',
+            field=models.ForeignKey(blank=True, help_text="Leave empty for a default that applies to all of the owner's subscriptions.", null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notification_rules', to='subscriptions.subscription'),
+        ),
+        migrations.AddConstraint(
+            model_name='notificationrule',
+            constraint=models.UniqueConstraint(condition=models.Q(('subscription__isnull', False)), fields=('subscription', 'timing'), name='notification_rule_subscription_timing_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='notificationrule',
+            constraint=models.UniqueConstraint(condition=models.Q(('subscription__isnull', True)), fields=('owner', 'timing'), name='notification_rule_owner_default_uniq'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:26
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_renewal_owners(apps, schema_editor):
+    for event_model, subscription_model in (
+        ("RenewalEvent", "Subscription"),
+        ("ArchivedRenewalEvent", "ArchivedSubscription"),
+    ):
+        owners = apps.get_model("subscriptions", subscription_model).objects.filter(pk=OuterRef("subscription_id"))
+        apps.get_model("subscriptions", event_model).objects.update(owner_id=Subquery(owners.values("owner_id")[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0016_owner_default_notification_rules'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionLog',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('collection', models.CharField(max_length=32)),
+                ('object_id', models.UUIDField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['deleted_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedrenewalevent',
+            name='owner',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_renewal_events', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='renewalevent',
+            name='owner',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Copied from the subscription so per-owner change feeds need no join.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='renewal_events', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_renewal_owners, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='billingcycle',
+            index=models.Index(fields=['owner', 'updated_at'], name='billing_cycle_owner_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationrule',
+            index=models.Index(fields=['owner', 'updated_at'], name='notification_rule_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='provider',
+            index=models.Index(fields=['owner', 'updated_at'], name='provider_owner_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='renewalevent',
+            index=models.Index(fields=['owner', 'updated_at'], name='renewal_owner_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['owner', 'updated_at'], name='subscription_owner_sync_idx'),
+        ),
+        migrations.AddField(
+            model_name='deletionlog',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='deletionlog',
+            index=models.Index(fields=['owner', 'deleted_at'], name='deletion_log_owner_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deletionlog',
+            index=models.Index(fields=['deleted_at'], name='deletion_log_deleted_idx'),
+        ),
+    ]
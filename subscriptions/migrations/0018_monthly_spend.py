@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:38
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0017_sync_indexes_and_deletion_log'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlySpend',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('month', models.DateField(help_text='First day of the month, in the site time zone.')),
+                ('currency', models.CharField(max_length=3)),
+                ('amount_minor', models.BigIntegerField(default=0, help_text='Total in integer minor units of currency.')),
+                ('renewals', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['month'],
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedrenewalevent',
+            name='counted_in_spend',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='renewalevent',
+            name='counted_in_spend',
+            field=models.BooleanField(default=False, editable=False, help_text='Whether this processed renewal is already included in MonthlySpend.'),
+        ),
+        migrations.AddIndex(
+            model_name='renewalevent',
+            index=models.Index(condition=models.Q(('counted_in_spend', False), ('is_processed', True)), fields=['owner', 'renewal_date'], name='renewal_uncounted_idx'),
+        ),
+        migrations.AddField(
+            model_name='monthlyspend',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_spend', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='monthlyspend',
+            name='provider',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_spend', to='subscriptions.provider'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyspend',
+            constraint=models.UniqueConstraint(fields=('owner', 'month', 'provider', 'currency'), name='unique_monthly_spend'),
+        ),
+    ]
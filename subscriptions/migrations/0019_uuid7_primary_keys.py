@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:46
+
+import subscriptions.uuids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0018_monthly_spend'),
+    ]
+
+    # The default is applied in Python, so the tables are unchanged. Only the
+    # migration state moves, which spares SQLite from rebuilding every table.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='billingcycle',
+                    name='id',
+                    field=models.UUIDField(default=subscriptions.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='dashboardrollup',
+                    name='id',
+                    field=models.UUIDField(default=subscriptions.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='deletionlog',
+                    name='id',
+                    field=models.UUIDField(default=subscriptions.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='exchangerate',
+                    name='id',
+                    field=models.UUIDField(default=subscriptions.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='job',
+                    name='id',
+                    field=models.UUIDField(default=subscriptions.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='monthlyspend',
+                    name='id',
+                    field=models.UUIDField(default=subscriptions.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='notificationrule',
+                    name='id',
+                    field=models.UUIDField(default=subscriptions.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='provider',
+                    name='id',
+                    field=models.UUIDField(default=subscriptions.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='renewalevent',
+                    name='id',
+                    field=models.UUIDField(default=subscriptions.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='subscription',
+                    name='id',
+                    field=models.UUIDField(default=subscriptions.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='subscriptionhistory',
+                    name='id',
+                    field=models.UUIDField(default=subscriptions.uuids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
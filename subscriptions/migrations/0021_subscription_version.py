@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0019_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedsubscription',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='subscription',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Incremented by every edit and status change, so a stale edit form can be rejected.'),
+        ),
+    ]
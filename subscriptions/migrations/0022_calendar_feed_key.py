@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:59
+
+import django.db.models.deletion
+import subscriptions.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('subscriptions', '0021_subscription_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarFeedKey',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='calendar_feed_key', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('secret', models.CharField(default=subscriptions.models.new_calendar_feed_secret, max_length=64)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0022_calendar_feed_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='monthlyspend',
+            name='provider',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='monthly_spend', to='subscriptions.provider'),
+        ),
+    ]
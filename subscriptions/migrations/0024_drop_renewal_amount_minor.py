@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:19
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0023_monthly_spend_keeps_deleted_providers'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='archivedrenewalevent',
+            name='amount_minor',
+        ),
+        migrations.RemoveField(
+            model_name='renewalevent',
+            name='amount_minor',
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:23
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0024_drop_renewal_amount_minor'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='archivedsubscription',
+            name='cost_minor',
+        ),
+        migrations.RemoveField(
+            model_name='subscription',
+            name='cost_minor',
+        ),
+    ]
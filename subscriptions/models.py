@@ -1,12 +1,14 @@
+import secrets
 from datetime import timedelta
 from decimal import Decimal
-from uuid import uuid4
 
 from django.conf import settings
 from django.db import models
+from django.db.models.functions import Now
 from django.utils import timezone
 
 from .currency import convert_to_base
+from .uuids import uuid7
 
 
 class TimeStampedModel(models.Model):
@@ -24,6 +26,16 @@ class BillingCycleUnit(models.TextChoices):
     YEARS = "years", "Years"
 
 
+# Billing periods are fixed day counts (a month is 30 days, a year 365), so they
+# translate directly into SQL interval arithmetic.
+BILLING_UNIT_DAYS = {
+    BillingCycleUnit.DAYS: 1,
+    BillingCycleUnit.WEEKS: 7,
+    BillingCycleUnit.MONTHS: 30,
+    BillingCycleUnit.YEARS: 365,
+}
+
+
 class SubscriptionStatus(models.TextChoices):
     ACTIVE = "active", "Active"
     PAUSED = "paused", "Paused"
@@ -37,8 +49,22 @@ class NotificationTiming(models.TextChoices):
     TWO_WEEKS_BEFORE = "2_weeks", "2 weeks before"
 
 
+NOTIFICATION_TIMING_OFFSETS = {
+    NotificationTiming.ONE_DAY_BEFORE: timedelta(days=1),
+    NotificationTiming.THREE_DAYS_BEFORE: timedelta(days=3),
+    NotificationTiming.ONE_WEEK_BEFORE: timedelta(weeks=1),
+    NotificationTiming.TWO_WEEKS_BEFORE: timedelta(weeks=2),
+}
+
+
+class JobStatus(models.TextChoices):
+    QUEUED = "queued", "Queued"
+    RUNNING = "running", "Running"
+    DEAD = "dead", "Dead"
+
+
 class BillingCycle(TimeStampedModel):
-    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         related_name="billing_cycles",
@@ -52,6 +78,9 @@ class BillingCycle(TimeStampedModel):
     class Meta:
         ordering = ["interval", "unit"]
         unique_together = ("owner", "interval", "unit")
+        indexes = [
+            models.Index(fields=["owner", "updated_at"], name="billing_cycle_owner_sync_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"Every {self.interval} {self.unit}"
@@ -69,16 +98,36 @@ class BillingCycle(TimeStampedModel):
     def annual_multiplier(self) -> Decimal:
         return self.monthly_multiplier() * Decimal("12")
 
+    def monthly_multiplier_ratio(self) -> tuple[int, int]:
+        """``monthly_multiplier`` as an exact ``(numerator, denominator)`` pair for integer money math."""
+        interval = self.interval
+        mapping = {
+            BillingCycleUnit.DAYS: (30, interval),
+            BillingCycleUnit.WEEKS: (433, 100 * interval),
+            BillingCycleUnit.MONTHS: (1, interval),
+            BillingCycleUnit.YEARS: (1, 12 * interval),
+        }
+        return mapping.get(self.unit, (1, 1))
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if not adding:
+            self.subscriptions.all().refresh_monthly_cost_base()
+
+    @property
+    def period(self) -> timedelta:
+        return timedelta(days=self.interval * BILLING_UNIT_DAYS.get(self.unit, 0))
+
     def next_date(self, from_date):
-        if self.unit == BillingCycleUnit.DAYS:
-            return from_date + timedelta(days=self.interval)
-        if self.unit == BillingCycleUnit.WEEKS:
-            return from_date + timedelta(weeks=self.interval)
-        if self.unit == BillingCycleUnit.MONTHS:
-            return from_date + timedelta(days=self.interval * 30)
-        if self.unit == BillingCycleUnit.YEARS:
-            return from_date + timedelta(days=self.interval * 365)
-        return from_date
+        return from_date + self.period
+
+    def roll_forward(self, date, reference_date):
+        """The first date after ``reference_date`` reached from ``date`` in whole periods."""
+        period = self.period
+        if not period or date > reference_date:
+            return date
+        return date + period * ((reference_date - date) // period + 1)
 
     def next_due_date(self, start_date, reference_date=None):
         reference = reference_date or timezone.now()
@@ -89,7 +138,7 @@ class BillingCycle(TimeStampedModel):
 
 
 class Provider(TimeStampedModel):
-    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         related_name="providers",
@@ -104,16 +153,72 @@ class Provider(TimeStampedModel):
         blank=True,
         help_text="Direct page where users can cancel with this provider.",
     )
+    catalog_key = models.SlugField(
+        max_length=100,
+        unique=True,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Natural key of shared providers loaded from the provider catalog.",
+    )
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            models.Index(fields=["owner", "name", "id"], name="provider_owner_name_idx"),
+            models.Index(
+                fields=["name", "id"],
+                name="provider_shared_name_idx",
+                condition=models.Q(owner__isnull=True),
+            ),
+            models.Index(fields=["owner", "updated_at"], name="provider_owner_sync_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
 
 
-class Subscription(TimeStampedModel):
-    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+class SubscriptionQuerySet(models.QuerySet):
+    def refresh_monthly_cost_base(self, batch_size: int = 1000) -> int:
+        """Recompute ``monthly_cost_base`` with the same ``Decimal`` arithmetic as ``save()``."""
+        subscriptions = list(
+            self.select_related("billing_cycle").only(
+                "cost_amount", "cost_currency", "billing_cycle__interval", "billing_cycle__unit"
+            )
+        )
+        for subscription in subscriptions:
+            subscription.update_derived_fields()
+        self.bulk_update(subscriptions, ["monthly_cost_base"], batch_size=batch_size)
+        return len(subscriptions)
+
+
+class SubscriptionCostMixin:
+    """Cost helpers shared by live and archived subscriptions."""
+
+    cost_amount: Decimal
+    cost_currency: str
+    billing_cycle: "BillingCycle"
+
+    def monthly_cost_amount(self) -> Decimal:
+        cost = Decimal(self.cost_amount)
+        return cost * self.billing_cycle.monthly_multiplier()
+
+    def annual_cost_amount(self) -> Decimal:
+        cost = Decimal(self.cost_amount)
+        return cost * self.billing_cycle.annual_multiplier()
+
+    def monthly_cost_in_base(self) -> Decimal:
+        return convert_to_base(self.monthly_cost_amount(), self.cost_currency)
+
+    def annual_cost_in_base(self) -> Decimal:
+        return convert_to_base(self.annual_cost_amount(), self.cost_currency)
+
+
+class Subscription(SubscriptionCostMixin, TimeStampedModel):
+    is_archived = False
+    COST_FIELDS = frozenset({"cost_amount", "cost_currency", "billing_cycle"})
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         related_name="subscriptions",
@@ -137,46 +242,117 @@ class Subscription(TimeStampedModel):
     next_billing_date = models.DateTimeField()
     cancellation_date = models.DateTimeField(null=True, blank=True)
     notes = models.TextField(blank=True)
+    monthly_cost_base = models.DecimalField(
+        max_digits=14,
+        decimal_places=4,
+        default=Decimal("0"),
+        editable=False,
+        help_text="Monthly cost in the base currency, kept in sync for filtering and sorting.",
+    )
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        help_text="Incremented by every edit and status change, so a stale edit form can be rejected.",
+    )
+
+    objects = SubscriptionQuerySet.as_manager()
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            models.Index(fields=["owner", "monthly_cost_base"], name="subscription_owner_cost_idx"),
+            models.Index(fields=["owner", "status", "next_billing_date"], name="subscription_owner_due_idx"),
+            models.Index(fields=["status", "next_billing_date"], name="subscription_due_idx"),
+            models.Index(fields=["updated_at"], name="subscription_updated_idx"),
+            models.Index(fields=["owner", "updated_at"], name="subscription_owner_sync_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.provider.name})"
 
-    def monthly_cost_amount(self) -> Decimal:
-        cost = Decimal(self.cost_amount)
-        return cost * self.billing_cycle.monthly_multiplier()
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            self.update_derived_fields()
+        elif self.COST_FIELDS.intersection(update_fields):
+            self.update_derived_fields()
+            kwargs["update_fields"] = {*update_fields, "monthly_cost_base"}
+        if not self._state.adding:
+            # Every save is an edit, so an edit form rendered before it can no longer be applied.
+            self.version += 1
+            if update_fields is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+        super().save(*args, **kwargs)
 
-    def annual_cost_amount(self) -> Decimal:
-        cost = Decimal(self.cost_amount)
-        return cost * self.billing_cycle.annual_multiplier()
+    def update_derived_fields(self) -> None:
+        self.monthly_cost_base = self.monthly_cost_in_base().quantize(Decimal("0.0001"))
 
-    def monthly_cost_in_base(self) -> Decimal:
-        return convert_to_base(self.monthly_cost_amount(), self.cost_currency)
 
-    def annual_cost_in_base(self) -> Decimal:
-        return convert_to_base(self.annual_cost_amount(), self.cost_currency)
+class NotificationRule(TimeStampedModel):
+    """A reminder timing, either an owner-wide default or a per-subscription override.
 
+    A rule without a subscription applies to every subscription of its owner. A
+    rule with one replaces the default of the same timing for that subscription:
+    enabled to add the reminder, disabled to opt out of it.
+    """
 
-class NotificationRule(TimeStampedModel):
-    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="notification_rules",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
     subscription = models.ForeignKey(
-        Subscription, related_name="notification_rules", on_delete=models.CASCADE
+        Subscription,
+        related_name="notification_rules",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        help_text="Leave empty for a default that applies to all of the owner's subscriptions.",
     )
     timing = models.CharField(max_length=16, choices=NotificationTiming.choices)
     is_enabled = models.BooleanField(default=True)
 
     class Meta:
         ordering = ["subscription", "timing"]
-        unique_together = ("subscription", "timing")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["subscription", "timing"],
+                condition=models.Q(subscription__isnull=False),
+                name="notification_rule_subscription_timing_uniq",
+            ),
+            models.UniqueConstraint(
+                fields=["owner", "timing"],
+                condition=models.Q(subscription__isnull=True),
+                name="notification_rule_owner_default_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["owner", "updated_at"], name="notification_rule_sync_idx"),
+        ]
 
     def __str__(self) -> str:
-        return f"{self.subscription} - {self.get_timing_display()}"
+        return f"{self.subscription or 'All subscriptions'} - {self.get_timing_display()}"
+
+    def save(self, *args, **kwargs):
+        if self.subscription_id is not None:
+            self.owner_id = self.subscription.owner_id
+        super().save(*args, **kwargs)
 
 
 class RenewalEvent(TimeStampedModel):
-    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="renewal_events",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Copied from the subscription so per-owner change feeds need no join.",
+    )
     subscription = models.ForeignKey(
         Subscription, related_name="renewal_events", on_delete=models.CASCADE
     )
@@ -184,21 +360,46 @@ class RenewalEvent(TimeStampedModel):
     amount_amount = models.DecimalField("Amount", max_digits=10, decimal_places=2)
     amount_currency = models.CharField("Currency", max_length=3, default="USD")
     is_processed = models.BooleanField(default=False)
+    counted_in_spend = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text="Whether this processed renewal is already included in MonthlySpend.",
+    )
 
     class Meta:
         ordering = ["renewal_date"]
+        indexes = [
+            models.Index(fields=["is_processed", "renewal_date"], name="renewal_due_idx"),
+            models.Index(fields=["updated_at"], name="renewal_updated_idx"),
+            models.Index(fields=["owner", "updated_at"], name="renewal_owner_sync_idx"),
+            # Processed renewals not yet in MonthlySpend, which spend trends read live.
+            models.Index(
+                fields=["owner", "renewal_date"],
+                name="renewal_uncounted_idx",
+                condition=models.Q(is_processed=True, counted_in_spend=False),
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.subscription} on {self.renewal_date:%Y-%m-%d}"
 
+    def save(self, *args, **kwargs):
+        if kwargs.get("update_fields") is None:
+            self.update_derived_fields()
+        super().save(*args, **kwargs)
+
+    def update_derived_fields(self) -> None:
+        self.owner_id = self.subscription.owner_id
+
 
 class SubscriptionHistory(TimeStampedModel):
     class EventType(models.TextChoices):
         CREATED = "created", "Created"
         UPDATED = "updated", "Updated"
         STATUS_CHANGED = "status_changed", "Status changed"
+        RENEWED = "renewed", "Renewed"
 
-    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     subscription = models.ForeignKey(
         Subscription, related_name="history", on_delete=models.CASCADE
     )
@@ -210,3 +411,246 @@ class SubscriptionHistory(TimeStampedModel):
 
     def __str__(self) -> str:
         return f"{self.subscription.name} - {self.get_event_type_display()}"
+
+
+class ArchivedSubscription(SubscriptionCostMixin, models.Model):
+    """A cancelled subscription moved out of the live table; columns mirror ``Subscription``."""
+
+    is_archived = True
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="archived_subscriptions",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    name = models.CharField(max_length=255)
+    provider = models.ForeignKey(
+        Provider, related_name="archived_subscriptions", on_delete=models.PROTECT
+    )
+    cost_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    cost_currency = models.CharField(max_length=3)
+    billing_cycle = models.ForeignKey(
+        BillingCycle, related_name="archived_subscriptions", on_delete=models.PROTECT
+    )
+    status = models.CharField(max_length=16, choices=SubscriptionStatus.choices)
+    start_date = models.DateTimeField()
+    next_billing_date = models.DateTimeField()
+    cancellation_date = models.DateTimeField(null=True, blank=True)
+    notes = models.TextField(blank=True)
+    monthly_cost_base = models.DecimalField(max_digits=14, decimal_places=4)
+    version = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(db_default=Now())
+
+    class Meta:
+        ordering = ["name"]
+        indexes = [
+            models.Index(fields=["owner", "name"], name="archived_sub_owner_name_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.provider.name})"
+
+
+class ArchivedNotificationRule(models.Model):
+    id = models.UUIDField(primary_key=True, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="archived_notification_rules",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    subscription = models.ForeignKey(
+        ArchivedSubscription, related_name="notification_rules", on_delete=models.CASCADE
+    )
+    timing = models.CharField(max_length=16, choices=NotificationTiming.choices)
+    is_enabled = models.BooleanField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+
+class ArchivedRenewalEvent(models.Model):
+    id = models.UUIDField(primary_key=True, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="archived_renewal_events",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    subscription = models.ForeignKey(
+        ArchivedSubscription, related_name="renewal_events", on_delete=models.CASCADE
+    )
+    renewal_date = models.DateTimeField()
+    amount_amount = models.DecimalField("Amount", max_digits=10, decimal_places=2)
+    amount_currency = models.CharField("Currency", max_length=3)
+    is_processed = models.BooleanField()
+    counted_in_spend = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+
+class ArchivedSubscriptionHistory(models.Model):
+    id = models.UUIDField(primary_key=True, editable=False)
+    subscription = models.ForeignKey(
+        ArchivedSubscription, related_name="history", on_delete=models.CASCADE
+    )
+    event_type = models.CharField(max_length=32, choices=SubscriptionHistory.EventType.choices)
+    description = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-created_at"]
+
+
+class DeletionLog(models.Model):
+    """Tombstone for a deleted row, read by ``/sync`` so clients can drop their copy.
+
+    Rows stay small on purpose: the synced collection name and the deleted id.
+    Tombstones older than ``sync.TOMBSTONE_RETENTION`` are pruned, and a cursor
+    older than that gets a full resync instead.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="+",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        db_index=False,
+    )
+    collection = models.CharField(max_length=32)
+    object_id = models.UUIDField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["deleted_at"]
+        indexes = [
+            models.Index(fields=["owner", "deleted_at"], name="deletion_log_owner_sync_idx"),
+            models.Index(fields=["deleted_at"], name="deletion_log_deleted_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.collection} {self.object_id} deleted at {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class MonthlySpend(TimeStampedModel):
+    """Processed renewal amounts per owner, month, provider and currency.
+
+    Renewals are added as the worker processes them, and ``compact_renewals``
+    folds the rest in before deleting old processed events, so spend trends
+    read a few rows per month instead of every renewal.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, related_name="monthly_spend", on_delete=models.CASCADE)
+    month = models.DateField(help_text="First day of the month, in the site time zone.")
+    # Deleting a provider keeps the spend it recorded, just without the provider.
+    provider = models.ForeignKey(
+        Provider, related_name="monthly_spend", on_delete=models.SET_NULL, null=True, blank=True
+    )
+    currency = models.CharField(max_length=3)
+    amount_minor = models.BigIntegerField(default=0, help_text="Total in integer minor units of currency.")
+    renewals = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["month"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["owner", "month", "provider", "currency"], name="unique_monthly_spend"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.owner} {self.month:%Y-%m} {self.provider} {self.currency}"
+
+
+class ExchangeRate(TimeStampedModel):
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    currency = models.CharField(max_length=3)
+    effective_date = models.DateField()
+    rate = models.DecimalField(
+        max_digits=18,
+        decimal_places=8,
+        help_text="Base currency units per unit of this currency from the effective date on.",
+    )
+
+    class Meta:
+        ordering = ["currency", "effective_date"]
+        constraints = [
+            models.UniqueConstraint(fields=["currency", "effective_date"], name="unique_exchange_rate_per_day"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.currency} {self.rate} from {self.effective_date}"
+
+
+class DashboardRollup(TimeStampedModel):
+    """Exact system-wide dashboard figures, recomputed in the background for superusers."""
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    providers = models.PositiveBigIntegerField()
+    subscriptions = models.PositiveBigIntegerField()
+    billing_cycles = models.PositiveBigIntegerField()
+    notifications = models.PositiveBigIntegerField()
+    renewals_pending = models.PositiveBigIntegerField()
+    monthly_total = models.DecimalField(max_digits=18, decimal_places=4)
+    annual_total = models.DecimalField(max_digits=18, decimal_places=4)
+
+    class Meta:
+        get_latest_by = "created_at"
+
+    def __str__(self) -> str:
+        return f"Dashboard rollup at {self.created_at:%Y-%m-%d %H:%M}"
+
+
+def new_calendar_feed_secret() -> str:
+    return secrets.token_hex(16)
+
+
+class CalendarFeedKey(TimeStampedModel):
+    """Per-user secret mixed into the calendar feed token; replacing it revokes every issued feed URL."""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        primary_key=True,
+        related_name="calendar_feed_key",
+        on_delete=models.CASCADE,
+    )
+    secret = models.CharField(max_length=64, default=new_calendar_feed_secret)
+
+    def __str__(self) -> str:
+        return f"Calendar feed key of user {self.user_id}"
+
+
+class Job(TimeStampedModel):
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    name = models.CharField(max_length=255, help_text="Dotted path of the callable to run.")
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=16, choices=JobStatus.choices, default=JobStatus.QUEUED)
+    priority = models.SmallIntegerField(default=0, help_text="Higher priorities run first.")
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    last_error = models.TextField(blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-priority", "run_at"]
+        indexes = [
+            models.Index(
+                fields=["-priority", "run_at"],
+                name="job_ready_idx",
+                condition=models.Q(status=JobStatus.QUEUED),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.get_status_display()})"
@@ -0,0 +1,104 @@
+"""Integer minor-unit money.
+
+Amounts are held as integer minor units (cents for USD, yen for JPY) and
+every multiplication by a non-integer factor ends in one explicit
+rounding step, so arithmetic is exact up to that step, reproducible, and
+allocates no ``Decimal`` objects.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import ROUND_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, Decimal
+
+# ISO 4217 minor-unit exponents; currencies not listed use DEFAULT_EXPONENT.
+CURRENCY_EXPONENTS = {
+    "ARS": 2,
+    "BHD": 3,
+    "CLP": 0,
+    "EUR": 2,
+    "GBP": 2,
+    "JPY": 0,
+    "KRW": 0,
+    "KWD": 3,
+    "MXN": 2,
+    "USD": 2,
+}
+DEFAULT_EXPONENT = 2
+# Exchange rates are fixed-point integers with the 8 decimal places of ExchangeRate.rate.
+RATE_SCALE = 10**8
+
+
+def currency_exponent(currency: str) -> int:
+    return CURRENCY_EXPONENTS.get(currency.upper(), DEFAULT_EXPONENT)
+
+
+def divide_rounded(numerator: int, denominator: int, rounding: str = ROUND_HALF_EVEN) -> int:
+    """Integer division with ``decimal`` rounding semantics (half-even, half-up or toward zero)."""
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if rounding == ROUND_HALF_EVEN:
+        if remainder * 2 > denominator or (remainder * 2 == denominator and quotient % 2):
+            quotient += 1
+    elif rounding == ROUND_HALF_UP:
+        if remainder * 2 >= denominator:
+            quotient += 1
+    elif rounding != ROUND_DOWN:
+        raise ValueError(f"Unsupported rounding mode: {rounding}")
+    return quotient if numerator >= 0 else -quotient
+
+
+def to_minor(amount: Decimal | str | int, currency: str, rounding: str = ROUND_HALF_EVEN) -> int:
+    return int(Decimal(amount).scaleb(currency_exponent(currency)).to_integral_value(rounding=rounding))
+
+
+def fixed_rate(rate: Decimal | float | str) -> int:
+    """Convert an exchange rate to a ``RATE_SCALE`` fixed-point integer."""
+    return int(Decimal(str(rate)).scaleb(8).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+@dataclass(frozen=True, slots=True)
+class Money:
+    minor: int
+    currency: str
+
+    @classmethod
+    def from_decimal(cls, amount: Decimal | str | int, currency: str, rounding: str = ROUND_HALF_EVEN) -> Money:
+        return cls(to_minor(amount, currency, rounding), currency.upper())
+
+    @property
+    def exponent(self) -> int:
+        return currency_exponent(self.currency)
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.minor).scaleb(-self.exponent)
+
+    def _check_currency(self, other: Money) -> None:
+        if other.currency != self.currency:
+            raise ValueError(f"Cannot combine {self.currency} and {other.currency} amounts.")
+
+    def __add__(self, other: Money) -> Money:
+        self._check_currency(other)
+        return Money(self.minor + other.minor, self.currency)
+
+    def __sub__(self, other: Money) -> Money:
+        self._check_currency(other)
+        return Money(self.minor - other.minor, self.currency)
+
+    def __neg__(self) -> Money:
+        return Money(-self.minor, self.currency)
+
+    def multiply(self, numerator: int, denominator: int = 1, rounding: str = ROUND_HALF_EVEN) -> Money:
+        """Multiply by the exact ratio ``numerator / denominator``, rounding once to a minor unit."""
+        return Money(divide_rounded(self.minor * numerator, denominator, rounding), self.currency)
+
+    def convert(self, rate: int, currency: str, rounding: str = ROUND_HALF_EVEN) -> Money:
+        """Convert with a ``RATE_SCALE`` fixed-point rate (target units per source unit)."""
+        shift = currency_exponent(currency) - self.exponent
+        numerator = self.minor * rate * 10 ** max(shift, 0)
+        denominator = RATE_SCALE * 10 ** max(-shift, 0)
+        return Money(divide_rounded(numerator, denominator, rounding), currency.upper())
+
+    def __str__(self) -> str:
+        return f"{self.to_decimal()} {self.currency}"
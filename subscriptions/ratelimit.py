@@ -0,0 +1,156 @@
+"""Per-user and per-IP token buckets for expensive endpoints.
+
+``settings.RATE_LIMITS`` maps URL names to rates such as ``"60/min"``: a bucket
+holds that many tokens and refills at that rate, and every request takes one.
+Bucket state lives in the shared cache as two keys, an epoch and a counter of
+tokens taken since it. A request costs one ``get_many`` and one atomic
+``incr``, so concurrent workers never hand out the same token twice. Once a
+client is refused, its worker remembers until when and refuses further
+requests in process, without touching the cache.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from ipaddress import ip_address, ip_network
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import RATE_LIMITED
+
+PERIODS = {"s": 1, "min": 60, "h": 3600, "day": 86400}
+# Bucket keys outlive a full refill; an expired bucket simply starts full again.
+MIN_KEY_TIMEOUT = 3600
+# Refusals remembered per process before expired entries are swept.
+MAX_LOCAL_BLOCKS = 10000
+
+
+@dataclass(frozen=True)
+class Rate:
+    capacity: int
+    period: float
+
+    @property
+    def per_second(self) -> float:
+        return self.capacity / self.period
+
+
+@lru_cache(maxsize=None)
+def parse_rate(value: str) -> Rate:
+    """Parse ``"<tokens>/<period>"``, where period is ``s``, ``min``, ``h`` or ``day``."""
+    tokens, _, unit = value.partition("/")
+    if unit not in PERIODS:
+        raise ValueError(f"Unknown rate period in {value!r}.")
+    return Rate(int(tokens), PERIODS[unit])
+
+
+class RateLimiter:
+    """Token buckets in the shared cache, with an in-process record of refused clients."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._blocked: dict[str, float] = {}
+
+    def take(self, key: str, rate: Rate) -> float:
+        """Take a token from bucket ``key``; return 0 if granted, else seconds until one is available."""
+        now = self.clock()
+        blocked_until = self._blocked.get(key)
+        if blocked_until is not None:
+            if now < blocked_until:
+                return blocked_until - now
+            del self._blocked[key]
+
+        epoch_key, taken_key = f"ratelimit:{key}:epoch", f"ratelimit:{key}:taken"
+        state = cache.get_many([epoch_key, taken_key])
+        epoch, taken = state.get(epoch_key), state.get(taken_key)
+        if epoch is None or taken is None or (now - epoch) * rate.per_second - taken >= rate.capacity:
+            # New, expired or full bucket: restart it full. Concurrent restarts
+            # can hand out a few extra tokens, but only to a client under its limit.
+            epoch = now - rate.period
+            cache.set_many({epoch_key: epoch, taken_key: 0}, max(MIN_KEY_TIMEOUT, math.ceil(rate.period * 2)))
+        try:
+            taken = cache.incr(taken_key)
+        except ValueError:
+            # Evicted between the two calls: grant this one rather than fail the request.
+            return 0
+        excess = taken - (now - epoch) * rate.per_second
+        if excess <= 0:
+            return 0
+        # Refused requests do not use up tokens.
+        cache.decr(taken_key)
+        retry_after = excess / rate.per_second
+        if len(self._blocked) >= MAX_LOCAL_BLOCKS:
+            self._blocked = {name: until for name, until in self._blocked.items() if until > now}
+        self._blocked[key] = now + retry_after
+        return retry_after
+
+    def refund(self, key: str) -> None:
+        """Return a token granted by ``take``, e.g. when another bucket refused the same request."""
+        try:
+            cache.decr(f"ratelimit:{key}:taken")
+        except ValueError:
+            pass
+
+
+def client_ip(request) -> str:
+    """The client address, read from ``X-Forwarded-For`` only behind ``RATE_LIMIT_PROXY_HOPS`` trusted proxies.
+
+    Each proxy appends the address it received the request from, so the client
+    is the entry that many places from the right; entries further left are
+    whatever the client sent. A shorter header means the request skipped the
+    proxies, and the peer address is used.
+    """
+    hops = settings.RATE_LIMIT_PROXY_HOPS
+    if hops:
+        forwarded = [part.strip() for part in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if part.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+@lru_cache(maxsize=None)
+def _exempt_networks(networks: tuple[str, ...]) -> tuple:
+    return tuple(ip_network(network, strict=False) for network in networks)
+
+
+def is_exempt(request) -> bool:
+    user = request.user
+    if user.is_authenticated and user.get_username() in settings.RATE_LIMIT_EXEMPT_USERS:
+        return True
+    try:
+        address = ip_address(client_ip(request))
+    except ValueError:
+        return False
+    return any(address in network for network in _exempt_networks(tuple(settings.RATE_LIMIT_EXEMPT_IPS)))
+
+
+def check_rate_limits(limiter: RateLimiter, request, view_name: str) -> int:
+    """Seconds the client must wait before calling ``view_name`` again, or 0 to let the request through.
+
+    The rule's ``user`` rate applies to signed-in users and its ``ip`` rate to
+    every request; both buckets must have a token.
+    """
+    rule = settings.RATE_LIMITS.get(view_name)
+    if not rule or is_exempt(request):
+        return 0
+    buckets = []
+    if "user" in rule and request.user.is_authenticated:
+        buckets.append(("user", f"{view_name}:user:{request.user.pk}", rule["user"]))
+    if "ip" in rule:
+        buckets.append(("ip", f"{view_name}:ip:{client_ip(request)}", rule["ip"]))
+    granted: list[str] = []
+    for scope, key, rate in buckets:
+        wait = limiter.take(key, parse_rate(rate))
+        if wait:
+            # The request is refused, so it costs no token in the buckets that granted one either.
+            for granted_key in granted:
+                limiter.refund(granted_key)
+            RATE_LIMITED.labels(view_name, scope).inc()
+            return math.ceil(wait)
+        granted.append(key)
+    return 0
@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+PRIMARY_DB = "default"
+REPLICA_DB = "replica"
+
+_use_primary: ContextVar[bool] = ContextVar("subscriptions_use_primary", default=False)
+
+
+@contextmanager
+def use_primary():
+    """Route every read in this context to the primary database."""
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Send reads to the replica unless the caller needs to see its own writes."""
+
+    def db_for_read(self, model, **hints):
+        # Reads inside a transaction on the primary (workers, select_for_update,
+        # read-modify-write code paths) must see that transaction's state.
+        if _use_primary.get() or connections[PRIMARY_DB].in_atomic_block:
+            return PRIMARY_DB
+        return REPLICA_DB
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY_DB
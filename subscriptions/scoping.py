@@ -0,0 +1,17 @@
+"""Per-user queryset scoping shared by the views and the batch API."""
+
+from django.db.models import Q
+
+
+def scope_queryset_for_user(queryset, user, owner_lookup: str = "owner"):
+    if user.is_superuser:
+        return queryset
+    return queryset.filter(**{owner_lookup: user})
+
+
+def scope_owned_or_shared_queryset(queryset, user, owner_lookup: str = "owner"):
+    if user.is_superuser:
+        return queryset
+    # Both sides of the OR are indexed on owner, so SQLite plans it as a
+    # multi-index OR of two index searches rather than a table scan.
+    return queryset.filter(Q(**{owner_lookup: user}) | Q(**{f"{owner_lookup}__isnull": True}))
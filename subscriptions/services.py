@@ -1,14 +1,59 @@
 from __future__ import annotations
 
+import heapq
+from bisect import bisect_right
 from dataclasses import dataclass
-from datetime import timedelta
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
-from typing import Iterable
+from itertools import islice
+from typing import Any, Iterable, Iterator
 
+from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import (
+    BooleanField,
+    Case,
+    Count,
+    DateField,
+    DateTimeField,
+    Exists,
+    ExpressionWrapper,
+    F,
+    Func,
+    Model,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import TruncMonth
 from django.utils import timezone
 
-from .models import RenewalEvent, Subscription
+from .archive import DEPENDENT_TABLES, delete_rows
+from .caching import bump_data_version, get_data_version
+from .metrics import record_cache_lookup
+from .money import RATE_SCALE, currency_exponent, divide_rounded, fixed_rate
+from .models import (
+    BILLING_UNIT_DAYS,
+    NOTIFICATION_TIMING_OFFSETS,
+    BillingCycle,
+    DashboardRollup,
+    ExchangeRate,
+    MonthlySpend,
+    NotificationRule,
+    Provider,
+    RenewalEvent,
+    Subscription,
+    SubscriptionHistory,
+    SubscriptionStatus,
+)
+from .spend import add_monthly_spend, month_of
+from .sync import record_deletions
 
 
 @dataclass
@@ -17,16 +62,312 @@ class SubscriptionCostSummary:
     annual_total: Decimal
 
 
+# Cost totals are accumulated in 10**-SUMMARY_PRECISION base-currency units.
+SUMMARY_PRECISION = 6
+# Decimal places of Subscription.cost_amount: scaling by this keeps every stored amount an exact integer.
+COST_AMOUNT_PLACES = 2
+
+
 def summarize_costs(subscriptions: Iterable[Subscription]) -> SubscriptionCostSummary:
-    monthly = Decimal("0")
-    annual = Decimal("0")
+    """Total monthly and annual cost in the base currency using integer arithmetic.
+
+    ``cost_amount`` is scaled to an integer at its own two decimal places, not
+    the currency's minor units, so a fractional JPY amount is not rounded away
+    and the totals agree with ``monthly_cost_base``. Each subscription's share
+    is rounded half-even to 10**-SUMMARY_PRECISION base units once, then summed
+    exactly, so totals never depend on iteration order.
+    """
+    monthly = 0
+    annual = 0
+    scales: dict[str, int] = {}
+    denominator_scale = RATE_SCALE * 10**COST_AMOUNT_PLACES
     for subscription in subscriptions:
-        monthly += subscription.monthly_cost_in_base()
-        annual += subscription.annual_cost_in_base()
-    return SubscriptionCostSummary(monthly_total=monthly, annual_total=annual)
+        currency = subscription.cost_currency.upper()
+        scale = scales.get(currency)
+        if scale is None:
+            scale = scales[currency] = fixed_rate(settings.EXCHANGE_RATES.get(currency, 1)) * 10**SUMMARY_PRECISION
+        numerator, denominator = subscription.billing_cycle.monthly_multiplier_ratio()
+        numerator *= int(Decimal(subscription.cost_amount).scaleb(COST_AMOUNT_PLACES)) * scale
+        denominator *= denominator_scale
+        monthly += divide_rounded(numerator, denominator)
+        annual += divide_rounded(numerator * 12, denominator)
+    return SubscriptionCostSummary(
+        monthly_total=Decimal(monthly).scaleb(-SUMMARY_PRECISION),
+        annual_total=Decimal(annual).scaleb(-SUMMARY_PRECISION),
+    )
+
+
+@dataclass
+class SpendingLine:
+    label: str
+    subscriptions: int
+    monthly_total: Decimal
+    annual_total: Decimal
+
+
+@dataclass
+class SpendingBreakdown:
+    by_category: list[SpendingLine]
+    by_provider: list[SpendingLine]
+    by_currency: list[SpendingLine]
+    by_status: list[SpendingLine]
+
+    @property
+    def dimensions(self) -> list[tuple[str, list[SpendingLine]]]:
+        return [
+            ("Category", self.by_category),
+            ("Provider", self.by_provider),
+            ("Currency", self.by_currency),
+            ("Status", self.by_status),
+        ]
+
+
+# Short, so a version bump lost to an unshared cache or an eviction leaves totals stale for minutes only.
+SPENDING_CACHE_TIMEOUT = 60 * 10
+
+
+def _spending_lines(groups: dict[Any, list]) -> list[SpendingLine]:
+    lines = [
+        SpendingLine(label=label, subscriptions=count, monthly_total=monthly, annual_total=monthly * 12)
+        for label, count, monthly in groups.values()
+    ]
+    return sorted(lines, key=lambda line: (-line.monthly_total, line.label))
+
+
+def compute_spending_breakdown(user_id) -> SpendingBreakdown:
+    """Per-category, provider, currency and status totals from a single GROUP BY over the stored base cost.
+
+    Providers are grouped by id, so two providers sharing a name stay separate lines.
+    """
+    rows = (
+        Subscription.objects.filter(owner_id=user_id)
+        .values("provider_id", "provider__name", "provider__category", "cost_currency", "status")
+        .annotate(count=Count("pk"), monthly=Sum("monthly_cost_base"))
+        .order_by()
+    )
+    dimensions: dict[str, dict[Any, list]] = {"category": {}, "provider": {}, "currency": {}, "status": {}}
+    for row in rows:
+        labels = {"status": (row["status"], SubscriptionStatus(row["status"]).label)}
+        if row["status"] == SubscriptionStatus.ACTIVE:
+            # Where the money goes: only active subscriptions are billed.
+            labels["category"] = (row["provider__category"], row["provider__category"])
+            labels["provider"] = (row["provider_id"], row["provider__name"])
+            currency = row["cost_currency"].upper()
+            labels["currency"] = (currency, currency)
+        for dimension, (key, label) in labels.items():
+            group = dimensions[dimension].setdefault(key, [label, 0, Decimal("0")])
+            group[1] += row["count"]
+            group[2] += row["monthly"]
+    return SpendingBreakdown(
+        by_category=_spending_lines(dimensions["category"]),
+        by_provider=_spending_lines(dimensions["provider"]),
+        by_currency=_spending_lines(dimensions["currency"]),
+        by_status=_spending_lines(dimensions["status"]),
+    )
+
+
+def spending_breakdown(user_id) -> SpendingBreakdown:
+    """Cached ``compute_spending_breakdown``; any write to the user's data invalidates it."""
+    cache_key = f"subscriptions:spending:{user_id}:{get_data_version(user_id)}"
+    breakdown = cache.get(cache_key)
+    record_cache_lookup("spending_breakdown", breakdown is not None)
+    if breakdown is None:
+        breakdown = compute_spending_breakdown(user_id)
+        cache.set(cache_key, breakdown, SPENDING_CACHE_TIMEOUT)
+    return breakdown
+
+
+def recompute_monthly_cost_base(batch_size: int = 5000) -> int:
+    """Refresh ``Subscription.monthly_cost_base`` in primary-key chunks, e.g. after exchange rates change."""
+    updated = 0
+    last_pk = None
+    while True:
+        queryset = Subscription.objects.order_by("pk")
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        pks = list(queryset.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            bump_data_version()
+            return updated
+        updated += Subscription.objects.filter(pk__in=pks).refresh_monthly_cost_base()
+        last_pk = pks[-1]
+
+
+class HistoricalRateConverter:
+    """Converts amounts to the base currency with the rate in effect on a given date.
+
+    Each currency's rate series is loaded once and resolved by binary search, so
+    converting many amounts costs one query plus ``O(log n)`` per amount.
+    """
+
+    def __init__(self, currencies: Iterable[str]):
+        self._dates: dict[str, list] = {}
+        self._rates: dict[str, list[Decimal]] = {}
+        rates = (
+            ExchangeRate.objects.filter(currency__in={currency.upper() for currency in currencies})
+            .order_by("currency", "effective_date")
+            .values_list("currency", "effective_date", "rate")
+        )
+        for currency, effective_date, rate in rates:
+            self._dates.setdefault(currency, []).append(effective_date)
+            self._rates.setdefault(currency, []).append(rate)
+
+    def rate_for(self, currency: str, on_date) -> Decimal:
+        currency = currency.upper()
+        dates = self._dates.get(currency)
+        if not dates:
+            return Decimal(str(settings.EXCHANGE_RATES.get(currency, 1)))
+        # Dates before the first recorded rate use the earliest rate available.
+        index = max(bisect_right(dates, on_date) - 1, 0)
+        return self._rates[currency][index]
 
+    def convert(self, amount: Decimal, currency: str, on_date) -> Decimal:
+        return amount * self.rate_for(currency, on_date)
 
-def upcoming_renewals(days: int = 30, user: AbstractBaseUser | None = None) -> list[RenewalEvent]:
+
+def convert_renewal_amounts(events: QuerySet[RenewalEvent] | Iterable[RenewalEvent]) -> list[Decimal]:
+    """Convert renewal amounts to the base currency using the rate at each renewal date."""
+    if isinstance(events, QuerySet):
+        rows = list(events.values_list("amount_amount", "amount_currency", "renewal_date"))
+    else:
+        rows = [(event.amount_amount, event.amount_currency, event.renewal_date) for event in events]
+    converter = HistoricalRateConverter({currency for _, currency, _ in rows})
+    return [converter.convert(amount, currency, renewal_date.date()) for amount, currency, renewal_date in rows]
+
+
+@dataclass
+class SpendMonth:
+    month: date
+    total: Decimal
+    renewals: int
+
+
+def _months(first: date, last: date) -> list[date]:
+    months = []
+    while first <= last:
+        months.append(first)
+        first = (first + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def monthly_spend_trend(user_id, months: int = 12, now=None) -> list[SpendMonth]:
+    """Base-currency spend for each of the last ``months`` months, oldest first.
+
+    Snapshots give one row per month and currency; processed renewals not yet
+    counted are grouped the same way in the database, summing their Decimal
+    amounts. Each month is converted at the rate in effect on its first day.
+    """
+    last = month_of(now or timezone.now())
+    first = last
+    for _ in range(months - 1):
+        first = (first - timedelta(days=1)).replace(day=1)
+    snapshots = (
+        MonthlySpend.objects.filter(owner_id=user_id, month__gte=first)
+        .values("month", "currency")
+        .annotate(amount=Sum("amount_minor"), count=Sum("renewals"))
+        .order_by()
+    )
+    start = timezone.make_aware(datetime.combine(first, time.min))
+    uncounted = (
+        RenewalEvent.objects.filter(
+            owner_id=user_id, is_processed=True, counted_in_spend=False, renewal_date__gte=start
+        )
+        .annotate(month=TruncMonth("renewal_date", output_field=DateField()))
+        .values("month", currency=F("amount_currency"))
+        .annotate(amount=Sum("amount_amount"), count=Count("pk"))
+        .order_by()
+    )
+    rows = [
+        *(
+            (row["month"], row["currency"], Decimal(row["amount"]).scaleb(-currency_exponent(row["currency"])), row["count"])
+            for row in snapshots
+        ),
+        *((row["month"], row["currency"], row["amount"], row["count"]) for row in uncounted),
+    ]
+    converter = HistoricalRateConverter({currency for _, currency, _, _ in rows})
+    trend = {month: SpendMonth(month, Decimal("0"), 0) for month in _months(first, last)}
+    for month, currency, amount, count in rows:
+        line = trend.get(month)
+        if line is None:
+            continue
+        line.total += converter.convert(amount, currency, month)
+        line.renewals += count
+    return list(trend.values())
+
+
+@dataclass
+class ProjectedRenewal:
+    """A renewal computed from a subscription's billing schedule rather than a stored event."""
+
+    subscription: Subscription
+    renewal_date: datetime
+
+    @property
+    def amount_amount(self) -> Decimal:
+        return self.subscription.cost_amount
+
+    @property
+    def amount_currency(self) -> str:
+        return self.subscription.cost_currency
+
+
+def _billing_schedule(subscription: Subscription, start: datetime, until: datetime) -> Iterator[ProjectedRenewal]:
+    renewal_date = start
+    while renewal_date <= until:
+        yield ProjectedRenewal(subscription=subscription, renewal_date=renewal_date)
+        next_date = subscription.billing_cycle.next_date(renewal_date)
+        if next_date <= renewal_date:
+            return
+        renewal_date = next_date
+
+
+def merge_billing_schedules(queryset: QuerySet[Subscription], days: int, limit: int) -> list[ProjectedRenewal]:
+    """Merge the billing schedules of active subscriptions into the next ``limit`` renewals.
+
+    A subscription whose ``next_billing_date`` has passed but not yet been rolled
+    over by ``rollover_billing_dates`` is projected from its first date after now.
+    Every other subscription's first renewal is its ``next_billing_date``, so the
+    first ``limit`` renewals can only come from the past-due ones and the
+    ``limit`` billed soonest. Past-due rows sort first, and reading stops after the
+    ``limit``-th upcoming one.
+    """
+    now = timezone.now()
+    limit_date = now + timedelta(days=days)
+    queryset = queryset.select_related("billing_cycle", "provider").filter(
+        status=SubscriptionStatus.ACTIVE,
+        next_billing_date__lte=limit_date,
+    )
+    schedules = []
+    upcoming = 0
+    for subscription in queryset.order_by("next_billing_date").iterator(chunk_size=max(limit, 1)):
+        if upcoming >= limit:
+            break
+        start = subscription.next_billing_date
+        if start < now:
+            start = subscription.billing_cycle.roll_forward(start, now)
+            if start < now:
+                continue
+        else:
+            upcoming += 1
+        schedules.append(_billing_schedule(subscription, start, limit_date))
+    merged = heapq.merge(*schedules, key=lambda renewal: renewal.renewal_date)
+    return list(islice(merged, limit))
+
+
+def projected_renewals(
+    days: int = 30, user: AbstractBaseUser | None = None, limit: int = 25
+) -> list[ProjectedRenewal]:
+    queryset = Subscription.objects.all()
+    if user is not None and not user.is_superuser:
+        queryset = queryset.filter(owner=user)
+    return merge_billing_schedules(queryset, days=days, limit=limit)
+
+
+def upcoming_renewals(
+    days: int = 30, user: AbstractBaseUser | None = None, mode: str = "events"
+) -> list[RenewalEvent] | list[ProjectedRenewal]:
+    if mode == "projected":
+        return projected_renewals(days=days, user=user)
     limit_date = timezone.now() + timedelta(days=days)
     queryset = RenewalEvent.objects.select_related("subscription").filter(
         is_processed=False,
@@ -35,3 +376,413 @@ def upcoming_renewals(days: int = 30, user: AbstractBaseUser | None = None) -> l
     if user is not None and not user.is_superuser:
         queryset = queryset.filter(subscription__owner=user)
     return list(queryset.order_by("renewal_date")[:25])
+
+
+def _rule_applies(timing, subscription_ref: str, owner_ref: str) -> Q:
+    """Whether ``timing`` notifies for the outer subscription: its own enabled rule, or the
+    owner's enabled default when the subscription has no rule of its own for that timing."""
+    own_rules = NotificationRule.objects.filter(subscription_id=OuterRef(subscription_ref), timing=timing)
+    default_rule = NotificationRule.objects.filter(
+        owner_id=OuterRef(owner_ref), subscription__isnull=True, timing=timing, is_enabled=True
+    )
+    return Q(Exists(own_rules.filter(is_enabled=True))) | (Q(Exists(default_rule)) & ~Q(Exists(own_rules)))
+
+
+def effective_notification_timings(subscriptions: QuerySet[Subscription]) -> dict:
+    """Map each subscription id to the timings that notify for it, in a single query."""
+    flags = {
+        f"notifies_{timing}": ExpressionWrapper(_rule_applies(timing, "pk", "owner_id"), output_field=BooleanField())
+        for timing in NOTIFICATION_TIMING_OFFSETS
+    }
+    rows = subscriptions.order_by().annotate(**flags).values("pk", *flags)
+    return {row["pk"]: [timing for timing in NOTIFICATION_TIMING_OFFSETS if row[f"notifies_{timing}"]] for row in rows}
+
+
+@dataclass
+class DueNotification:
+    event: RenewalEvent
+    timing: Any
+    notify_at: datetime
+
+
+def due_notifications(start: datetime, end: datetime) -> list[DueNotification]:
+    """Reminders falling in ``[start, end)`` for unprocessed renewal events, under the effective rules.
+
+    Owner defaults and per-subscription overrides are resolved in the query with
+    EXISTS / NOT EXISTS, so defaults never have to be copied onto each subscription.
+    """
+    due: list[DueNotification] = []
+    for timing, offset in NOTIFICATION_TIMING_OFFSETS.items():
+        events = (
+            RenewalEvent.objects.select_related("subscription")
+            .filter(is_processed=False, renewal_date__gte=start + offset, renewal_date__lt=end + offset)
+            .filter(_rule_applies(timing, "subscription_id", "subscription__owner_id"))
+        )
+        due.extend(DueNotification(event, timing, event.renewal_date - offset) for event in events)
+    return sorted(due, key=lambda notification: notification.notify_at)
+
+
+def _claim_due_renewals(now, batch_size: int) -> list[RenewalEvent]:
+    queryset = (
+        RenewalEvent.objects.select_related("subscription__billing_cycle")
+        .filter(is_processed=False, renewal_date__lte=now)
+        .order_by("renewal_date")
+    )
+    features = connection.features
+    if features.has_select_for_update_skip_locked:
+        lock_options: dict = {"skip_locked": True}
+        if features.has_select_for_update_of:
+            lock_options["of"] = ("self",)
+        events = list(queryset.select_for_update(**lock_options)[:batch_size])
+        RenewalEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+            is_processed=True, counted_in_spend=True, updated_at=now
+        )
+        return events
+
+    # Without SKIP LOCKED (SQLite) each row is claimed with a conditional
+    # UPDATE, so a second worker can never process the same event twice.
+    claimed = []
+    for event in queryset[:batch_size]:
+        if RenewalEvent.objects.filter(pk=event.pk, is_processed=False).update(
+            is_processed=True, counted_in_spend=True, updated_at=now
+        ):
+            claimed.append(event)
+    return claimed
+
+
+def process_due_renewals(batch_size: int = 100, now=None) -> int:
+    """Process one batch of due renewal events and return how many were claimed."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        events = _claim_due_renewals(now, batch_size)
+        next_dates: dict = {}
+        for event in events:
+            event.is_processed = event.counted_in_spend = True
+            next_date = event.subscription.billing_cycle.next_date(event.renewal_date)
+            current = next_dates.get(event.subscription_id)
+            if current is None or next_date > current:
+                next_dates[event.subscription_id] = next_date
+        for subscription_id, next_date in next_dates.items():
+            Subscription.objects.filter(
+                pk=subscription_id, next_billing_date__lt=next_date
+            ).update(next_billing_date=next_date, updated_at=now)
+        SubscriptionHistory.objects.bulk_create(
+            SubscriptionHistory(
+                subscription_id=event.subscription_id,
+                event_type=SubscriptionHistory.EventType.RENEWED,
+                description=f"Renewal on {event.renewal_date:%Y-%m-%d} processed",
+            )
+            for event in events
+        )
+        add_monthly_spend(
+            (
+                (event.owner_id, event.renewal_date, event.subscription.provider_id, event.amount_currency, event.amount_amount)
+                for event in events
+            ),
+            now=now,
+        )
+    for owner_id in {event.subscription.owner_id for event in events}:
+        bump_data_version(owner_id)
+    return len(events)
+
+
+class _RollForward(Func):
+    """PostgreSQL: ``date`` advanced by whole steps of ``days`` days to just after ``now``."""
+
+    output_field = DateTimeField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        (date_sql, date_params), (days_sql, days_params), (now_sql, now_params) = (
+            compiler.compile(expression) for expression in self.get_source_expressions()
+        )
+        step = f"make_interval(days => ({days_sql})::integer)"
+        elapsed = f"extract(epoch from ({now_sql}::timestamptz - {date_sql}))"
+        sql = f"({date_sql} + {step} * (floor({elapsed} / extract(epoch from {step})) + 1))"
+        return sql, (*date_params, *days_params, *now_params, *date_params, *days_params)
+
+
+def _stale_billing_dates(now) -> QuerySet[Subscription]:
+    # Served by subscription_due_idx (status, next_billing_date).
+    return Subscription.objects.filter(status=SubscriptionStatus.ACTIVE, next_billing_date__lte=now)
+
+
+def _roll_forward_in_database(stale: QuerySet[Subscription], pks: list, now) -> int:
+    interval = Subquery(BillingCycle.objects.filter(pk=OuterRef("billing_cycle_id")).order_by().values("interval")[:1])
+    updated = 0
+    for unit, unit_days in BILLING_UNIT_DAYS.items():
+        updated += stale.filter(pk__in=pks, billing_cycle__unit=unit).update(
+            next_billing_date=_RollForward(F("next_billing_date"), interval * unit_days, Value(now)),
+            updated_at=now,
+        )
+    return updated
+
+
+def _roll_forward_in_python(stale: QuerySet[Subscription], pks: list, now) -> int:
+    rows = list(stale.filter(pk__in=pks).values_list("pk", "next_billing_date", "billing_cycle_id"))
+    cycles = BillingCycle.objects.in_bulk({cycle_id for _, _, cycle_id in rows})
+    meta = Subscription._meta
+
+    def prep(name, value):
+        return meta.get_field(name).get_db_prep_value(value, connection)
+
+    params = []
+    for pk, billing_date, cycle_id in rows:
+        rolled = cycles[cycle_id].roll_forward(billing_date, now)
+        if rolled != billing_date:
+            params.append(
+                (
+                    prep("next_billing_date", rolled),
+                    prep("updated_at", now),
+                    prep("id", pk),
+                    prep("next_billing_date", billing_date),
+                    prep("billing_cycle", cycle_id),
+                    prep("status", SubscriptionStatus.ACTIVE),
+                )
+            )
+    if not params:
+        return 0
+    # One prepared statement for the whole chunk: building a CASE per row through
+    # the ORM costs far more than the UPDATEs. Each row is a compare-and-set, so a
+    # subscription edited since it was read keeps the web request's values.
+    quote = connection.ops.quote_name
+    column = {name: quote(meta.get_field(name).column) for name in ("next_billing_date", "updated_at", "billing_cycle", "status")}
+    sql = (
+        f"UPDATE {quote(meta.db_table)} SET {column['next_billing_date']} = %s, {column['updated_at']} = %s "
+        f"WHERE {quote(meta.pk.column)} = %s AND {column['next_billing_date']} = %s "
+        f"AND {column['billing_cycle']} = %s AND {column['status']} = %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+        return cursor.rowcount
+
+
+def rollover_billing_dates(batch_size: int = 1000, now=None) -> int:
+    """Advance every active subscription whose ``next_billing_date`` has passed, in chunked bulk UPDATEs.
+
+    Each UPDATE re-checks the row, so subscriptions paused, cancelled or rescheduled
+    by a concurrent request are left alone.
+    """
+    now = now or timezone.now()
+    stale = _stale_billing_dates(now)
+    roll_forward = _roll_forward_in_database if connection.vendor == "postgresql" else _roll_forward_in_python
+    updated = 0
+    last_pk = None
+    while True:
+        remaining = stale if last_pk is None else stale.filter(pk__gt=last_pk)
+        chunk = list(remaining.order_by("pk").values_list("pk", "owner_id")[:batch_size])
+        if not chunk:
+            return updated
+        last_pk = chunk[-1][0]
+        with transaction.atomic():
+            updated += roll_forward(stale, [pk for pk, _ in chunk], now)
+        for owner_id in {owner_id for _, owner_id in chunk}:
+            bump_data_version(owner_id)
+
+
+def estimated_count(model: type[Model]) -> int:
+    """Row count from planner statistics where available, exact COUNT(*) otherwise."""
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been vacuumed or analyzed.
+        if row and row[0] >= 0:
+            return row[0]
+    return model._default_manager.count()
+
+
+def refresh_dashboard_rollup() -> DashboardRollup:
+    """Recompute exact system-wide dashboard figures; run from the job queue."""
+    monthly_total = Subscription.objects.filter(status=SubscriptionStatus.ACTIVE).aggregate(
+        total=Sum("monthly_cost_base")
+    )["total"] or Decimal("0")
+    rollup = DashboardRollup.objects.create(
+        providers=Provider.objects.count(),
+        subscriptions=Subscription.objects.count(),
+        billing_cycles=BillingCycle.objects.count(),
+        notifications=NotificationRule.objects.count(),
+        renewals_pending=RenewalEvent.objects.filter(is_processed=False).count(),
+        monthly_total=monthly_total,
+        annual_total=monthly_total * 12,
+    )
+    DashboardRollup.objects.exclude(pk=rollup.pk).delete()
+    return rollup
+
+
+@dataclass(frozen=True)
+class StatusTransition:
+    from_statuses: tuple
+    to_status: Any
+    action_name: str
+
+
+STATUS_TRANSITIONS = {
+    "pause": StatusTransition((SubscriptionStatus.ACTIVE,), SubscriptionStatus.PAUSED, "paused"),
+    "resume": StatusTransition((SubscriptionStatus.PAUSED,), SubscriptionStatus.ACTIVE, "resumed"),
+    "cancel": StatusTransition(
+        (SubscriptionStatus.ACTIVE, SubscriptionStatus.PAUSED), SubscriptionStatus.CANCELLED, "cancelled"
+    ),
+}
+
+
+def change_status(subscription: Subscription, action: str, now: datetime | None = None) -> bool:
+    """Apply a pause/resume/cancel transition to one subscription with a conditional UPDATE.
+
+    The row only changes while its status is still one the transition starts
+    from, so of two concurrent requests exactly one applies, without a row
+    lock. Only the columns the transition sets are written, and ``version`` is
+    incremented so an edit form rendered before the change is rejected.
+    ``subscription`` supplies the key, the owner and, to resume, the billing
+    cycle; it is not modified. Returns whether the transition applied.
+    """
+    transition = STATUS_TRANSITIONS[action]
+    now = now or timezone.now()
+    conditions: dict[str, Any] = {"pk": subscription.pk, "status__in": transition.from_statuses}
+    updates: dict[str, Any] = {"status": transition.to_status, "updated_at": now, "version": F("version") + 1}
+    if action == "resume":
+        # The next billing date comes from the cycle read with the row; an edit may have changed it since.
+        conditions["billing_cycle_id"] = subscription.billing_cycle_id
+        updates["next_billing_date"] = subscription.billing_cycle.next_date(now)
+    elif action == "cancel":
+        updates["cancellation_date"] = now
+    with transaction.atomic():
+        if not Subscription.objects.filter(**conditions).update(**updates):
+            return False
+        if action == "cancel":
+            delete_pending_renewals([subscription.pk])
+        SubscriptionHistory.objects.create(
+            subscription_id=subscription.pk,
+            event_type=SubscriptionHistory.EventType.STATUS_CHANGED,
+            description=f"Subscription {transition.action_name}",
+        )
+    bump_data_version(subscription.owner_id)
+    return True
+
+
+def update_subscription(subscription: Subscription, fields: Iterable[str], version: int) -> bool:
+    """Write ``fields`` of ``subscription`` if its row is still at ``version``.
+
+    One UPDATE sets those columns, plus ``monthly_cost_base`` when a cost
+    field is among them, and increments ``version``. It matches nothing once an
+    edit or status change has landed since ``version`` was read, so the caller
+    can report the conflict instead of overwriting it. On success the instance
+    carries the new version.
+    """
+    fields = set(fields)
+    if Subscription.COST_FIELDS.intersection(fields):
+        subscription.update_derived_fields()
+        fields |= {"monthly_cost_base"}
+    values = {name: getattr(subscription, name) for name in fields}
+    now = timezone.now()
+    if not Subscription.objects.filter(pk=subscription.pk, version=version).update(
+        **values, updated_at=now, version=version + 1
+    ):
+        return False
+    subscription.updated_at = now
+    subscription.version = version + 1
+    bump_data_version(subscription.owner_id)
+    return True
+
+
+def _versions_match(subscriptions: list[Subscription], offset: int = 0) -> Q:
+    """Rows of ``subscriptions`` still at the version they were read with, plus ``offset``."""
+    by_version: dict[int, list] = {}
+    for subscription in subscriptions:
+        by_version.setdefault(subscription.version + offset, []).append(subscription.pk)
+    match = Q(pk__in=[])
+    for version, pks in by_version.items():
+        match |= Q(pk__in=pks, version=version)
+    return match
+
+
+def _resume_at_read_versions(subscriptions: list[Subscription], now) -> list:
+    """Resume ``subscriptions`` with one UPDATE that skips rows changed since they were read.
+
+    Like ``update_subscription``, each row is matched at the version it was read
+    with, so an edit or status change landing in between is not overwritten.
+    Returns the primary keys actually resumed.
+    """
+    if not subscriptions:
+        return []
+    next_dates = Case(
+        *(When(pk=subscription.pk, then=Value(subscription.billing_cycle.next_date(now))) for subscription in subscriptions),
+        output_field=DateTimeField(),
+    )
+    Subscription.objects.filter(_versions_match(subscriptions), status=SubscriptionStatus.PAUSED).update(
+        status=SubscriptionStatus.ACTIVE, next_billing_date=next_dates, updated_at=now, version=F("version") + 1
+    )
+    return list(
+        Subscription.objects.filter(_versions_match(subscriptions, offset=1), updated_at=now).values_list("pk", flat=True)
+    )
+
+
+def bulk_change_status(queryset: QuerySet[Subscription], action: str, batch_size: int = 1000) -> int:
+    """Apply a pause/resume/cancel transition to every eligible subscription in ``queryset``."""
+    transition = STATUS_TRANSITIONS[action]
+    pks = list(queryset.filter(status__in=transition.from_statuses).values_list("pk", flat=True))
+    changed = 0
+    for start in range(0, len(pks), batch_size):
+        chunk = pks[start:start + batch_size]
+        now = timezone.now()
+        with transaction.atomic():
+            eligible = Subscription.objects.filter(pk__in=chunk, status__in=transition.from_statuses)
+            if action == "resume":
+                changed_pks = _resume_at_read_versions(list(eligible.select_related("billing_cycle")), now)
+            else:
+                changed_pks = list(eligible.values_list("pk", flat=True))
+                updates = {"status": transition.to_status, "updated_at": now, "version": F("version") + 1}
+                if action == "cancel":
+                    updates["cancellation_date"] = now
+                Subscription.objects.filter(pk__in=changed_pks).update(**updates)
+                if action == "cancel":
+                    delete_pending_renewals(changed_pks)
+            SubscriptionHistory.objects.bulk_create(
+                SubscriptionHistory(
+                    subscription_id=pk,
+                    event_type=SubscriptionHistory.EventType.STATUS_CHANGED,
+                    description=f"Subscription {transition.action_name}",
+                )
+                for pk in changed_pks
+            )
+        for owner_id in set(Subscription.objects.filter(pk__in=changed_pks).values_list("owner_id", flat=True)):
+            bump_data_version(owner_id)
+        changed += len(changed_pks)
+    return changed
+
+
+def delete_pending_renewals(subscription_ids) -> int:
+    """Delete the unprocessed renewal events of the given subscriptions with one DELETE.
+
+    Pending renewals were never counted in monthly spend, so only the sync
+    tombstones that ``post_delete`` would write are needed; callers bump the
+    owners' data versions.
+    """
+    pending = RenewalEvent.objects.filter(subscription_id__in=subscription_ids, is_processed=False)
+    record_deletions(pending)
+    return delete_rows(pending)
+
+
+def delete_subscriptions(subscriptions: QuerySet[Subscription]) -> int:
+    """Delete subscriptions with their notification rules, renewal events and history.
+
+    Django's collector would load every dependent row, history included, and
+    send a signal per row. Here each dependent table gets one DELETE, then the
+    subscriptions one more, on every database, and no dependent row is read
+    into Python. Spend already counted in ``MonthlySpend`` stays, as it does
+    with the collector.
+    """
+    rows = list(subscriptions.order_by().values_list("pk", "owner_id"))
+    if not rows:
+        return 0
+    pks = [pk for pk, _ in rows]
+    with transaction.atomic():
+        live = Subscription.objects.filter(pk__in=pks)
+        for model, _ in DEPENDENT_TABLES:
+            dependents = model.objects.filter(subscription_id__in=pks)
+            record_deletions(dependents)
+            delete_rows(dependents)
+        record_deletions(live)
+        deleted = delete_rows(live)
+    for owner_id in {owner_id for _, owner_id in rows}:
+        bump_data_version(owner_id)
+    return deleted
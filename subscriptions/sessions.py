@@ -0,0 +1,73 @@
+"""Request-path session and user resolution.
+
+Sessions use the ``cached_db`` engine, so a request reads its session from the
+cache and only falls back to the database on a miss. The authenticated user row
+is cached for ``USER_CACHE_TIMEOUT`` seconds on top of that; saving, deleting or
+logging out a user drops the entry, and the session hash is still checked on
+every request, so a password change ends other sessions immediately. A cached
+user that is no longer active is refused, as ``ModelBackend`` would refuse it.
+A queryset ``update()`` sends no ``post_save``, so code that deactivates users
+that way should call ``invalidate_cached_user`` for them. Invalidation only
+reaches other workers through a shared cache, so ``settings.py`` installs
+``cached_db`` and ``CachedAuthenticationMiddleware`` only when one is configured.
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+from .metrics import record_cache_lookup
+
+USER_CACHE_TIMEOUT = 300
+
+
+def _user_cache_key(user_id) -> str:
+    return f"subscriptions:user:{user_id}"
+
+
+def invalidate_cached_user(user_id) -> None:
+    cache.delete(_user_cache_key(user_id))
+
+
+def get_cached_user(request):
+    """``django.contrib.auth.get_user`` with the user row served from the cache when possible."""
+    try:
+        user_id = request.session[SESSION_KEY]
+        backend_path = request.session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    cache_key = _user_cache_key(user_id)
+    if backend_path in settings.AUTHENTICATION_BACKENDS:
+        user = cache.get(cache_key)
+        record_cache_lookup("user", user is not None)
+        session_hash = request.session.get(HASH_SESSION_KEY)
+        if user is not None and session_hash and constant_time_compare(session_hash, user.get_session_auth_hash()):
+            if not getattr(user, "is_active", True):
+                invalidate_cached_user(user_id)
+                return AnonymousUser()
+            user.backend = backend_path
+            return user
+    # Cache miss, or a hash that only verifies against SECRET_KEY_FALLBACKS or not
+    # at all: Django's own lookup decides, rotating or flushing the session as needed.
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(cache_key, user, USER_CACHE_TIMEOUT)
+    return user
+
+
+def purge_expired_sessions(batch_size: int = 1000) -> int:
+    """Delete expired sessions in batches so a large backlog never holds one long lock."""
+    expired = Session.objects.filter(expire_date__lt=timezone.now())
+    purged = 0
+    while True:
+        keys = list(expired.values_list("session_key", flat=True)[:batch_size])
+        if not keys:
+            return purged
+        purged += Session.objects.filter(session_key__in=keys).delete()[0]
@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .caching import bump_data_version
+from .models import BillingCycle, NotificationRule, Provider, RenewalEvent, Subscription
+from .sessions import invalidate_cached_user
+from .spend import uncount_renewal
+from .sync import record_deletion
+
+
+@receiver(post_save, sender=Provider)
+@receiver(post_delete, sender=Provider)
+@receiver(post_save, sender=BillingCycle)
+@receiver(post_delete, sender=BillingCycle)
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+@receiver(post_save, sender=NotificationRule)
+@receiver(post_delete, sender=NotificationRule)
+def bump_owner_data_version(sender, instance, **kwargs):
+    bump_data_version(instance.owner_id)
+
+
+@receiver(post_save, sender=RenewalEvent)
+@receiver(post_delete, sender=RenewalEvent)
+def bump_subscription_owner_data_version(sender, instance, **kwargs):
+    if sender._meta.get_field("subscription").is_cached(instance):
+        owner_id = instance.subscription.owner_id
+    else:
+        owner_id = (
+            Subscription.objects.filter(pk=instance.subscription_id).values_list("owner_id", flat=True).first()
+        )
+    bump_data_version(owner_id)
+
+
+@receiver(pre_save, sender=RenewalEvent)
+def release_changed_spend(sender, instance, raw=False, **kwargs):
+    if not raw:
+        uncount_renewal(instance)
+
+
+@receiver(pre_delete, sender=RenewalEvent)
+def release_deleted_spend(sender, instance, origin=None, **kwargs):
+    # Spend already paid stays in the trend when its subscription is deleted.
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin is None or model is RenewalEvent:
+        uncount_renewal(instance, deleting=True)
+
+
+@receiver(post_delete, sender=Provider)
+@receiver(post_delete, sender=BillingCycle)
+@receiver(post_delete, sender=Subscription)
+@receiver(post_delete, sender=NotificationRule)
+@receiver(post_delete, sender=RenewalEvent)
+def record_sync_tombstone(sender, instance, origin=None, **kwargs):
+    record_deletion(instance, origin)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def drop_cached_user(sender, instance, **kwargs):
+    # Covers password changes and deactivation, which both save the user.
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def drop_cached_user_on_logout(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_cached_user(user.pk)
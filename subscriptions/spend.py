@@ -0,0 +1,148 @@
+"""Monthly spend snapshots built from processed renewal events.
+
+``MonthlySpend`` holds one row per owner, month, provider and currency. The
+renewal worker adds each event it processes and marks it ``counted_in_spend``;
+renewals marked processed by hand stay uncounted until ``compact_renewals``
+folds them in. Compaction then deletes processed events older than the
+retention window, so the renewal table only keeps recent history while trends
+stay complete: ``services.monthly_spend_trend`` reads the snapshots plus the
+few processed events not yet counted.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, QuerySet
+from django.utils import timezone
+
+from .archive import delete_rows
+from .caching import bump_data_version
+from .models import MonthlySpend, RenewalEvent
+from .money import Money
+from .sync import record_deletions
+
+RETENTION_DAYS = 365
+
+# (owner_id, renewal_date, provider_id, currency, amount) of one renewal. Minor units are derived from
+# the Decimal amount here, so renewals written without save() are still counted correctly.
+SPEND_FIELDS = ("owner_id", "renewal_date", "subscription__provider_id", "amount_currency", "amount_amount")
+
+
+def month_of(moment) -> date:
+    """First day of ``moment``'s month in the current time zone, matching ``TruncMonth``."""
+    return timezone.localtime(moment).date().replace(day=1)
+
+
+def add_monthly_spend(rows: Iterable[tuple], sign: int = 1, now=None) -> None:
+    """Add (or with ``sign=-1`` remove) renewals given as ``SPEND_FIELDS`` tuples.
+
+    Amounts are summed as ``Money`` in each currency's minor units per snapshot
+    row first, then each row is incremented in place; a missing row is
+    inserted, falling back to the increment if a concurrent transaction
+    inserted it first. Call it inside a transaction.
+    """
+    now = now or timezone.now()
+    totals: dict[tuple, tuple[Money, int]] = {}
+    for owner_id, renewal_date, provider_id, currency, amount in rows:
+        # Renewals of ownerless subscriptions appear in no one's trend.
+        if owner_id is None:
+            continue
+        money = Money.from_decimal(amount, currency)
+        group = (owner_id, month_of(renewal_date), provider_id, money.currency)
+        total, renewals = totals.get(group, (Money(0, money.currency), 0))
+        totals[group] = (total + money if sign > 0 else total - money, renewals + sign)
+    for (owner_id, month, provider_id, currency), (total, renewals) in totals.items():
+        amount = total.minor
+        key = {"owner_id": owner_id, "month": month, "provider_id": provider_id, "currency": currency}
+        snapshot = MonthlySpend.objects.filter(**key)
+        increment = {"amount_minor": F("amount_minor") + amount, "renewals": F("renewals") + renewals, "updated_at": now}
+        if snapshot.update(**increment):
+            if renewals < 0:
+                snapshot.filter(renewals__lte=0).delete()
+            continue
+        if renewals < 0:
+            continue
+        try:
+            with transaction.atomic():
+                MonthlySpend.objects.create(**key, amount_minor=amount, renewals=renewals)
+        except IntegrityError:
+            snapshot.update(**increment)
+
+
+def _locked(queryset: QuerySet[RenewalEvent]) -> QuerySet[RenewalEvent]:
+    # A concurrent writer waits here and then sees the updated counted_in_spend flag.
+    if connection.features.has_select_for_update_of:
+        return queryset.select_for_update(of=("self",))
+    return queryset.select_for_update()
+
+
+def count_renewals(events: QuerySet[RenewalEvent], now=None) -> int:
+    """Fold the processed, not yet counted renewals in ``events`` into the snapshots."""
+    rows = list(_locked(events.filter(is_processed=True, counted_in_spend=False)).values_list("pk", *SPEND_FIELDS))
+    if not rows:
+        return 0
+    RenewalEvent.objects.filter(pk__in=[row[0] for row in rows]).update(counted_in_spend=True)
+    add_monthly_spend((row[1:] for row in rows), now=now)
+    return len(rows)
+
+
+def uncount_renewal(event: RenewalEvent, deleting: bool = False) -> None:
+    """Take a counted renewal back out of the snapshots before it is changed or deleted.
+
+    The stored row is the source of truth, since ``event`` may be stale, and its
+    values are subtracted, so this must run while the row still holds them.
+    Saving a counted renewal without changing its spend keeps it counted. A
+    renewal still processed afterwards is read live by trends and counted again
+    by the next compaction.
+    """
+    if event._state.adding:
+        return
+    counted = RenewalEvent.objects.filter(pk=event.pk, counted_in_spend=True)
+    stored = next(iter(_locked(counted).values_list(*SPEND_FIELDS, "is_processed")), None)
+    event.counted_in_spend = stored is not None
+    if stored is None:
+        return
+    if not deleting:
+        current = (
+            event.owner_id,
+            month_of(event.renewal_date),
+            event.subscription.provider_id,
+            event.amount_currency.upper(),
+            Decimal(event.amount_amount),
+            event.is_processed,
+        )
+        if current == (stored[0], month_of(stored[1]), stored[2], stored[3].upper(), stored[4], stored[5]):
+            return
+    counted.update(counted_in_spend=False)
+    add_monthly_spend([stored[:-1]], sign=-1)
+    event.counted_in_spend = False
+
+
+def compact_renewal_events(older_than_days: int = RETENTION_DAYS, batch_size: int = 1000, now=None) -> int:
+    """Fold processed renewals older than ``older_than_days`` into the snapshots and delete them."""
+    now = now or timezone.now()
+    eligible = RenewalEvent.objects.filter(
+        is_processed=True, renewal_date__lt=now - timedelta(days=older_than_days)
+    ).order_by("pk")
+    compacted = 0
+    last_pk = None
+    while True:
+        remaining = eligible if last_pk is None else eligible.filter(pk__gt=last_pk)
+        chunk = list(remaining.values_list("pk", "owner_id")[:batch_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1][0]
+        with transaction.atomic():
+            # Re-checked inside the transaction: a renewal reopened meanwhile stays.
+            events = eligible.filter(pk__in=[pk for pk, _ in chunk]).order_by()
+            count_renewals(events, now=now)
+            record_deletions(events)
+            # Nothing references renewal events, so skip the collector's per-row fetch and signals.
+            compacted += delete_rows(events)
+        for owner_id in {owner_id for _, owner_id in chunk}:
+            bump_data_version(owner_id)
+    return compacted
@@ -0,0 +1,184 @@
+"""Incremental sync for API clients.
+
+``GET /sync/?since=<cursor>`` returns the signed-in user's rows changed after
+the cursor, together with tombstones for rows deleted since, in one stream
+ordered by (change time, id) across every collection. Each page ends with the
+cursor of its last entry, so a client pages until ``has_more`` is false and
+keeps the final cursor for next time. A sync with nothing new is a single
+UNION of ``(owner, updated_at)`` index range probes.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from uuid import UUID
+
+from django.contrib.auth import get_user_model
+from django.db.models import F, Model, Q, QuerySet, Value
+from django.utils import timezone
+
+from .models import BillingCycle, DeletionLog, NotificationRule, Provider, RenewalEvent, Subscription
+
+COLLECTIONS: dict[str, type[Model]] = {
+    "providers": Provider,
+    "billing_cycles": BillingCycle,
+    "subscriptions": Subscription,
+    "notification_rules": NotificationRule,
+    "renewal_events": RenewalEvent,
+}
+COLLECTION_NAMES = {model: name for name, model in COLLECTIONS.items()}
+# Catalog providers and billing cycles have no owner and are visible to everyone.
+SHARED_COLLECTIONS = frozenset({"providers", "billing_cycles"})
+DELETIONS = "deleted"
+
+PAGE_SIZE = 500
+MAX_PAGE_SIZE = 1000
+# updated_at is stamped before the transaction commits, so a slow transaction can
+# land behind a cursor that was already handed out. Holding back the newest rows
+# for a few seconds keeps every committed change ahead of the cursors in use.
+SETTLE_DELAY = timedelta(seconds=10)
+TOMBSTONE_RETENTION = timedelta(days=90)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+class CursorExpired(Exception):
+    """The cursor predates the oldest retained tombstone; the client must sync from scratch."""
+
+
+@dataclass(frozen=True)
+class SyncCursor:
+    changed_at: datetime
+    id: UUID
+
+    def encode(self) -> str:
+        return f"{(self.changed_at - EPOCH) // timedelta(microseconds=1)}-{self.id.hex}"
+
+    @classmethod
+    def decode(cls, value: str) -> SyncCursor:
+        """Parse an encoded cursor, raising ``ValueError`` for anything malformed."""
+        micros, _, hex_id = value.partition("-")
+        return cls(EPOCH + timedelta(microseconds=int(micros)), UUID(hex=hex_id))
+
+
+@dataclass(frozen=True)
+class SyncPage:
+    changes: dict[str, list[dict]]
+    deleted: list[dict]
+    cursor: SyncCursor | None
+    has_more: bool
+
+    def as_json(self) -> dict:
+        return {
+            "changes": self.changes,
+            "deleted": self.deleted,
+            "cursor": self.cursor.encode() if self.cursor else None,
+            "has_more": self.has_more,
+        }
+
+
+def _after(cursor: SyncCursor | None, time_field: str) -> Q:
+    if cursor is None:
+        return Q()
+    # The redundant >= bound keeps the (owner, updated_at) index usable as a plain range scan.
+    return Q(**{f"{time_field}__gte": cursor.changed_at}) & (
+        Q(**{f"{time_field}__gt": cursor.changed_at}) | Q(**{time_field: cursor.changed_at, "pk__gt": cursor.id})
+    )
+
+
+def _owned_by(owner_id) -> Q:
+    # Separate arms for owned and shared rows: "owner = X OR owner IS NULL" defeats the index.
+    return Q(owner__isnull=True) if owner_id is None else Q(owner_id=owner_id)
+
+
+def _change_entries(user_id, cursor: SyncCursor | None, horizon: datetime) -> QuerySet:
+    """(changed_at, id, source) for every change after ``cursor``, as one UNION ALL."""
+    arms = []
+    for name, model in COLLECTIONS.items():
+        for owner_id in (user_id, None) if name in SHARED_COLLECTIONS else (user_id,):
+            arms.append(
+                model._default_manager.filter(_owned_by(owner_id), _after(cursor, "updated_at"), updated_at__lte=horizon)
+                .annotate(changed_at=F("updated_at"), source=Value(name))
+                .order_by()
+                .values_list("changed_at", "id", "source")
+            )
+    for owner_id in (user_id, None):
+        arms.append(
+            DeletionLog.objects.filter(_owned_by(owner_id), _after(cursor, "deleted_at"), deleted_at__lte=horizon)
+            .annotate(changed_at=F("deleted_at"), source=Value(DELETIONS))
+            .order_by()
+            .values_list("changed_at", "id", "source")
+        )
+    return arms[0].union(*arms[1:], all=True).order_by("changed_at", "id")
+
+
+def sync_changes(user_id, cursor: SyncCursor | None = None, limit: int = PAGE_SIZE, now=None) -> SyncPage:
+    """One page of changes and deletions visible to ``user_id`` after ``cursor``."""
+    now = now or timezone.now()
+    if cursor is not None and cursor.changed_at < now - TOMBSTONE_RETENTION:
+        raise CursorExpired
+    entries = list(_change_entries(user_id, cursor, now - SETTLE_DELAY)[: limit + 1])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    ids = defaultdict(list)
+    for _, pk, source in entries:
+        ids[source].append(pk)
+    changes: dict[str, list[dict]] = {name: [] for name in COLLECTIONS}
+    for name, model in COLLECTIONS.items():
+        if ids[name]:
+            fields = [field.attname for field in model._meta.concrete_fields]
+            changes[name] = list(
+                model._default_manager.filter(pk__in=ids[name]).order_by("updated_at", "pk").values(*fields)
+            )
+    deleted = []
+    if ids[DELETIONS]:
+        tombstones = DeletionLog.objects.filter(pk__in=ids[DELETIONS]).order_by("deleted_at", "pk")
+        deleted = [
+            {"collection": collection, "id": object_id}
+            for collection, object_id in tombstones.values_list("collection", "object_id")
+        ]
+    next_cursor = SyncCursor(entries[-1][0], entries[-1][1]) if entries else cursor
+    return SyncPage(changes=changes, deleted=deleted, cursor=next_cursor, has_more=has_more)
+
+
+def _deleted_with_owner(origin) -> bool:
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, get_user_model())
+
+
+def record_deletion(instance: Model, origin=None) -> None:
+    """Write a tombstone for a deleted synced row; connected to ``post_delete``."""
+    # Deleting an account removes its tombstones too, so there is nothing to record.
+    if origin is not None and _deleted_with_owner(origin):
+        return
+    DeletionLog.objects.create(
+        owner_id=instance.owner_id,
+        collection=COLLECTION_NAMES[type(instance)],
+        object_id=instance.pk,
+    )
+
+
+def record_deletions(queryset: QuerySet) -> None:
+    """Write tombstones for rows about to be removed without ``post_delete`` signals."""
+    collection = COLLECTION_NAMES.get(queryset.model)
+    if collection is None:
+        return
+    now = timezone.now()
+    DeletionLog.objects.bulk_create(
+        DeletionLog(owner_id=owner_id, collection=collection, object_id=pk, deleted_at=now)
+        for pk, owner_id in queryset.order_by().values_list("pk", "owner_id").iterator()
+    )
+
+
+def prune_deletion_log(batch_size: int = 1000, now=None) -> int:
+    """Delete tombstones older than ``TOMBSTONE_RETENTION`` in batches."""
+    expired = DeletionLog.objects.filter(deleted_at__lt=(now or timezone.now()) - TOMBSTONE_RETENTION)
+    pruned = 0
+    while True:
+        pks = list(expired.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return pruned
+        pruned += DeletionLog.objects.filter(pk__in=pks).delete()[0]
@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..jobs import work_batch
+from ..models import (
+    BillingCycle,
+    BillingCycleUnit,
+    DashboardRollup,
+    NotificationRule,
+    NotificationTiming,
+    Provider,
+    RenewalEvent,
+    Subscription,
+    SubscriptionHistory,
+    SubscriptionStatus,
+)
+from .test_sessions import cached_sessions
+
+
+class AdminTestMixin:
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser("root", "root@test.local", "pass1234")
+        self.client.force_login(self.admin)
+        provider = Provider.objects.create(name="Netflix", category="Streaming")
+        cycle = BillingCycle.objects.create(interval=1, unit=BillingCycleUnit.MONTHS)
+        now = timezone.now()
+        self.subscriptions = [
+            Subscription.objects.create(
+                owner=self.admin,
+                name=f"Plan {index}",
+                provider=provider,
+                cost_amount="10.00",
+                cost_currency="USD",
+                billing_cycle=cycle,
+                start_date=now,
+                next_billing_date=now + timedelta(days=5),
+            )
+            for index in range(3)
+        ]
+        NotificationRule.objects.create(subscription=self.subscriptions[0], timing=NotificationTiming.ONE_DAY_BEFORE)
+        RenewalEvent.objects.create(
+            subscription=self.subscriptions[0],
+            renewal_date=now + timedelta(days=5),
+            amount_amount="10.00",
+            amount_currency="USD",
+        )
+
+
+class ScalableAdminTests(AdminTestMixin, TestCase):
+    def test_changelists_render_for_every_model(self):
+        for model in (Provider, BillingCycle, Subscription, NotificationRule, RenewalEvent, SubscriptionHistory):
+            with self.subTest(model=model.__name__):
+                url = reverse(f"admin:subscriptions_{model._meta.model_name}_changelist")
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    @cached_sessions
+    def test_subscription_changelist_does_not_query_per_row(self):
+        url = reverse("admin:subscriptions_subscription_changelist")
+        self.client.get(url)
+        # Count and rows only; the session and user come from the cache.
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+    def test_bulk_pause_and_cancel_actions(self):
+        url = reverse("admin:subscriptions_subscription_changelist")
+        selected = [str(subscription.pk) for subscription in self.subscriptions[:2]]
+
+        self.client.post(url, {"action": "pause_subscriptions", "_selected_action": selected})
+        self.client.post(url, {"action": "cancel_subscriptions", "_selected_action": [str(self.subscriptions[0].pk)]})
+
+        statuses = dict(Subscription.objects.values_list("name", "status"))
+        self.assertEqual(statuses["Plan 0"], SubscriptionStatus.CANCELLED)
+        self.assertEqual(statuses["Plan 1"], SubscriptionStatus.PAUSED)
+        self.assertEqual(statuses["Plan 2"], SubscriptionStatus.ACTIVE)
+        self.assertFalse(RenewalEvent.objects.filter(subscription=self.subscriptions[0]).exists())
+        self.assertEqual(
+            SubscriptionHistory.objects.filter(event_type=SubscriptionHistory.EventType.STATUS_CHANGED).count(), 3
+        )
+
+
+class GlobalDashboardTests(AdminTestMixin, TestCase):
+    def test_superuser_dashboard_labels_approximate_figures(self):
+        response = self.client.get(reverse("subscriptions:dashboard"))
+
+        self.assertTrue(response.context["approximate"])
+        self.assertEqual(response.context["subscriptions"], 3)
+        self.assertIsNone(response.context["monthly_total"])
+        self.assertContains(response, "&asymp;")
+        self.assertContains(response, "totals have not been computed yet")
+
+    def test_refresh_computes_rollup_in_the_background(self):
+        response = self.client.post(reverse("subscriptions:dashboard-refresh"))
+        self.assertRedirects(response, reverse("subscriptions:dashboard"))
+        self.assertFalse(DashboardRollup.objects.exists())
+
+        self.assertEqual(work_batch(), 1)
+
+        response = self.client.get(reverse("subscriptions:dashboard"))
+        rollup = response.context["rollup"]
+        self.assertEqual(rollup.renewals_pending, 1)
+        self.assertEqual(response.context["monthly_total"], rollup.monthly_total)
+        self.assertEqual(rollup.annual_total, rollup.monthly_total * 12)
+        self.assertContains(response, "exact as of")
+
+    def test_refresh_is_superuser_only(self):
+        user = get_user_model().objects.create_user("regular", password="pass1234")
+        self.client.force_login(user)
+
+        response = self.client.post(reverse("subscriptions:dashboard-refresh"))
+
+        self.assertEqual(response.status_code, 403)
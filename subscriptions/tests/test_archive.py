@@ -0,0 +1,146 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import archive_cancelled_subscriptions, restore_archived_subscription
+from ..models import (
+    ArchivedSubscription,
+    BillingCycle,
+    BillingCycleUnit,
+    NotificationRule,
+    NotificationTiming,
+    Provider,
+    RenewalEvent,
+    Subscription,
+    SubscriptionHistory,
+    SubscriptionStatus,
+)
+from ..views import SubscriptionListView
+
+
+class SubscriptionArchiveTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("archivist", password="pass1234")
+        self.provider = Provider.objects.create(name="Netflix", category="Streaming")
+        self.cycle = BillingCycle.objects.create(interval=1, unit=BillingCycleUnit.MONTHS)
+        self.now = timezone.now()
+        self.old = self.create("Old plan", SubscriptionStatus.CANCELLED, self.now - timedelta(days=200))
+        self.recent = self.create("Recent plan", SubscriptionStatus.CANCELLED, self.now - timedelta(days=5))
+        self.active = self.create("Active plan", SubscriptionStatus.ACTIVE, None)
+        NotificationRule.objects.create(subscription=self.old, timing=NotificationTiming.ONE_WEEK_BEFORE)
+        RenewalEvent.objects.create(
+            subscription=self.old,
+            renewal_date=self.now - timedelta(days=230),
+            amount_amount="9.99",
+            amount_currency="USD",
+            is_processed=True,
+        )
+        self.history = SubscriptionHistory.objects.create(
+            subscription=self.old,
+            event_type=SubscriptionHistory.EventType.STATUS_CHANGED,
+            description="Subscription cancelled",
+        )
+
+    def create(self, name, status, cancellation_date):
+        return Subscription.objects.create(
+            owner=self.user,
+            name=name,
+            provider=self.provider,
+            cost_amount="9.99",
+            cost_currency="USD",
+            billing_cycle=self.cycle,
+            status=status,
+            start_date=self.now - timedelta(days=365),
+            next_billing_date=self.now + timedelta(days=10),
+            cancellation_date=cancellation_date,
+        )
+
+    def test_archives_only_long_cancelled_subscriptions_with_dependents(self):
+        self.assertEqual(archive_cancelled_subscriptions(older_than_days=90, batch_size=1), 1)
+
+        self.assertFalse(Subscription.objects.filter(pk=self.old.pk).exists())
+        self.assertEqual(set(Subscription.objects.values_list("name", flat=True)), {"Recent plan", "Active plan"})
+        self.assertFalse(NotificationRule.objects.exists())
+        self.assertFalse(RenewalEvent.objects.exists())
+        self.assertFalse(SubscriptionHistory.objects.exists())
+
+        archived = ArchivedSubscription.objects.get(pk=self.old.pk)
+        self.assertEqual(archived.monthly_cost_base, self.old.monthly_cost_base)
+        self.assertEqual(archived.created_at, self.old.created_at)
+        self.assertIsNotNone(archived.archived_at)
+        self.assertEqual(archived.notification_rules.count(), 1)
+        self.assertTrue(archived.renewal_events.get().is_processed)
+        self.assertEqual(archived.history.get().created_at, self.history.created_at)
+
+    def test_restore_moves_rows_back_unchanged(self):
+        archive_cancelled_subscriptions(older_than_days=90)
+
+        restored = restore_archived_subscription(ArchivedSubscription.objects.get(pk=self.old.pk))
+
+        self.assertEqual(restored.pk, self.old.pk)
+        self.assertEqual(restored.created_at, self.old.created_at)
+        self.assertEqual(restored.status, SubscriptionStatus.CANCELLED)
+        self.assertEqual(restored.notification_rules.count(), 1)
+        self.assertEqual(restored.renewal_events.count(), 1)
+        self.assertEqual(restored.history.get().created_at, self.history.created_at)
+        self.assertFalse(ArchivedSubscription.objects.exists())
+
+    def test_cancelled_list_and_detail_read_the_archive(self):
+        archive_cancelled_subscriptions(older_than_days=90)
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse("subscriptions:subscription-list"), {"status": "cancelled"})
+        self.assertEqual([sub.name for sub in response.context["object_list"]], ["Old plan", "Recent plan"])
+        self.assertContains(response, "Archived")
+
+        all_live = self.client.get(reverse("subscriptions:subscription-list"))
+        self.assertNotContains(all_live, "Old plan")
+
+        detail = self.client.get(reverse("subscriptions:subscription-detail", args=[self.old.pk]))
+        self.assertEqual(detail.status_code, 200)
+        self.assertContains(detail, "Restore from archive")
+        self.assertContains(detail, "Subscription cancelled")
+
+    def test_cancelled_list_is_ordered_and_paginated_across_both_tables(self):
+        archive_cancelled_subscriptions(older_than_days=90)
+        self.client.force_login(self.user)
+        url = reverse("subscriptions:subscription-list")
+
+        with patch.object(SubscriptionListView, "archive_page_size", 1):
+            pages = [
+                self.client.get(url, {"status": "cancelled", "order": "-name", "page": page}) for page in (1, 2)
+            ]
+
+        self.assertEqual([[sub.name for sub in page.context["object_list"]] for page in pages], [["Recent plan"], ["Old plan"]])
+        self.assertTrue(pages[1].context["object_list"][0].is_archived)
+        self.assertContains(pages[0], "Page 1 of 2")
+        self.assertContains(pages[1], "Page 2 of 2")
+
+    def test_only_the_cancelled_list_is_paginated(self):
+        archive_cancelled_subscriptions(older_than_days=90)
+        self.client.force_login(self.user)
+
+        with patch.object(SubscriptionListView, "archive_page_size", 1):
+            response = self.client.get(reverse("subscriptions:subscription-list"))
+
+        self.assertFalse(response.context["is_paginated"])
+        self.assertEqual(len(response.context["object_list"]), Subscription.objects.filter(owner=self.user).count())
+
+    def test_restore_view_is_scoped_to_owner(self):
+        archive_cancelled_subscriptions(older_than_days=90)
+        url = reverse("subscriptions:subscription-restore", args=[self.old.pk])
+        outsider = get_user_model().objects.create_user("outsider", password="pass1234")
+        self.client.force_login(outsider)
+
+        self.assertEqual(self.client.post(url).status_code, 404)
+        self.assertEqual(self.client.get(reverse("subscriptions:subscription-detail", args=[self.old.pk])).status_code, 404)
+
+        self.client.force_login(self.user)
+        response = self.client.post(url)
+
+        self.assertRedirects(response, reverse("subscriptions:subscription-detail", args=[self.old.pk]))
+        self.assertTrue(Subscription.objects.filter(pk=self.old.pk).exists())
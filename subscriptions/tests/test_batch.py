@@ -0,0 +1,178 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..batch import BatchError, apply_batch
+from ..models import (
+    BillingCycle,
+    BillingCycleUnit,
+    NotificationRule,
+    NotificationTiming,
+    Provider,
+    RenewalEvent,
+    Subscription,
+    SubscriptionHistory,
+)
+
+
+class ApplyBatchTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="batcher", password="safe-pass")
+        self.other = get_user_model().objects.create_user(username="batch-other", password="safe-pass")
+        self.provider = Provider.objects.create(owner=self.user, name="Spotify", category="Music")
+        self.cycle = BillingCycle.objects.create(owner=self.user, interval=1, unit=BillingCycleUnit.MONTHS)
+        self.other_cycle = BillingCycle.objects.create(owner=self.other, interval=1, unit=BillingCycleUnit.YEARS)
+
+    def subscription_data(self, name, **extra):
+        return {
+            "name": name,
+            "provider": str(self.provider.pk),
+            "cost_amount": "9.99",
+            "billing_cycle": str(self.cycle.pk),
+            "start_date": "2024-01-01",
+            **extra,
+        }
+
+    def test_creates_rows_that_reference_each_other_in_grouped_writes(self):
+        operations = []
+        for number in range(3):
+            operations.append(
+                {"op": "create", "type": "subscription", "ref": f"s{number}", "data": self.subscription_data(f"Plan {number}")}
+            )
+            for timing in (NotificationTiming.ONE_DAY_BEFORE, NotificationTiming.ONE_WEEK_BEFORE):
+                operations.append(
+                    {"op": "create", "type": "notification_rule", "data": {"subscription": f"$s{number}", "timing": timing}}
+                )
+        operations.append(
+            {
+                "op": "create",
+                "type": "renewal_event",
+                "data": {"subscription": "$s0", "renewal_date": "2026-03-01", "amount_amount": "9.99"},
+            }
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            applied, results = apply_batch(self.user, operations)
+
+        # Form validation still reads per operation, but each model is written with one INSERT.
+        inserts = [query["sql"].split()[2] for query in queries if query["sql"].startswith("INSERT")]
+        self.assertEqual(
+            inserts,
+            [
+                '"subscriptions_subscription"',
+                '"subscriptions_subscriptionhistory"',
+                '"subscriptions_notificationrule"',
+                '"subscriptions_renewalevent"',
+            ],
+        )
+
+        self.assertTrue(applied)
+        self.assertEqual([result["status"] for result in results], ["created"] * len(operations))
+        subscriptions = Subscription.objects.filter(owner=self.user)
+        self.assertEqual(subscriptions.count(), 3)
+        self.assertTrue(all(subscription.monthly_cost_base == Decimal("9.9900") for subscription in subscriptions))
+        self.assertEqual(NotificationRule.objects.filter(owner=self.user, subscription__in=subscriptions).count(), 6)
+        event = RenewalEvent.objects.get()
+        self.assertEqual(
+            (event.subscription.name, event.owner_id, event.amount_amount), ("Plan 0", self.user.pk, Decimal("9.99"))
+        )
+        self.assertEqual(SubscriptionHistory.objects.filter(event_type=SubscriptionHistory.EventType.CREATED).count(), 3)
+        self.assertEqual(results[0]["id"], str(subscriptions.get(name="Plan 0").pk))
+
+    def test_partial_updates_keep_other_fields_and_record_history(self):
+        subscription = Subscription.objects.create(
+            owner=self.user,
+            name="Music",
+            provider=self.provider,
+            cost_amount=Decimal("5.00"),
+            billing_cycle=self.cycle,
+            start_date=timezone.now(),
+            next_billing_date=timezone.now(),
+        )
+
+        applied, results = apply_batch(
+            self.user, [{"op": "update", "type": "subscription", "id": str(subscription.pk), "data": {"cost_amount": "7.50"}}]
+        )
+
+        self.assertTrue(applied)
+        subscription.refresh_from_db()
+        self.assertEqual(
+            (subscription.name, subscription.cost_amount, subscription.monthly_cost_base),
+            ("Music", Decimal("7.50"), Decimal("7.5000")),
+        )
+        self.assertEqual(subscription.history.get().description, "Updated fields: cost_amount")
+        self.assertEqual(subscription.version, 2)
+
+    def test_any_invalid_operation_rolls_back_the_whole_batch(self):
+        operations = [
+            {"op": "create", "type": "subscription", "ref": "ok", "data": self.subscription_data("Fine")},
+            {
+                "op": "create",
+                "type": "subscription",
+                "ref": "bad",
+                "data": self.subscription_data("Foreign cycle", billing_cycle=str(self.other_cycle.pk)),
+            },
+            {"op": "create", "type": "notification_rule", "data": {"subscription": "$bad", "timing": "1_day"}},
+            {"op": "create", "type": "notification_rule", "data": {"timing": "3_days"}},
+            {"op": "create", "type": "notification_rule", "data": {"timing": "3_days"}},
+        ]
+
+        applied, results = apply_batch(self.user, operations)
+
+        self.assertFalse(applied)
+        self.assertEqual(
+            [result["status"] for result in results], ["not_applied", "invalid", "invalid", "not_applied", "invalid"]
+        )
+        self.assertIn("billing_cycle", results[1]["errors"])
+        self.assertEqual(results[2]["errors"], {"subscription": ["Refers to operation 'bad', which failed."]})
+        self.assertEqual(results[4]["errors"], {"__all__": ["Duplicates operation 3 in this batch."]})
+        self.assertFalse(Subscription.objects.exists())
+        self.assertFalse(NotificationRule.objects.exists())
+
+    def test_cannot_update_other_users_rows(self):
+        rule = NotificationRule.objects.create(owner=self.other, timing=NotificationTiming.ONE_DAY_BEFORE)
+
+        applied, results = apply_batch(
+            self.user, [{"op": "update", "type": "notification_rule", "id": str(rule.pk), "data": {"is_enabled": False}}]
+        )
+
+        self.assertFalse(applied)
+        self.assertEqual(results[0]["errors"], {"id": ["Not found."]})
+
+    def test_rejects_malformed_payloads(self):
+        for operations in (
+            {"op": "create"},
+            [{"op": "delete", "type": "subscription"}],
+            [{"op": "create", "type": "subscription", "ref": "a"}, {"op": "create", "type": "subscription", "ref": "a"}],
+            [{"op": "update", "type": "subscription", "id": "not-a-uuid"}],
+        ):
+            with self.subTest(operations=operations), self.assertRaises(BatchError):
+                apply_batch(self.user, operations)
+
+
+class BatchViewTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="batch-api", password="safe-pass")
+        self.url = reverse("subscriptions:batch")
+
+    def post(self, payload):
+        return self.client.post(self.url, json.dumps(payload), content_type="application/json")
+
+    def test_requires_login(self):
+        self.assertEqual(self.post({"operations": []}).status_code, 401)
+
+    def test_reports_results_and_rejects_bad_json(self):
+        self.client.force_login(self.user)
+
+        response = self.post({"operations": [{"op": "create", "type": "notification_rule", "data": {"timing": "1_week"}}]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["status"], "created")
+        self.assertEqual(self.client.post(self.url, "nope", content_type="application/json").status_code, 400)
+        self.assertEqual(self.post({"operations": "nope"}).status_code, 400)
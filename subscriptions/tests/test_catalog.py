@@ -0,0 +1,80 @@
+import csv
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from ..catalog import load_provider_catalog
+from ..models import Provider
+
+CATALOG = [
+    {"key": "acme-tv", "name": "Acme TV", "category": "Streaming", "website": "https://acme.example/"},
+    {"name": "Cloud Box", "category": "Cloud Storage", "cancellation_url": "https://box.example/cancel"},
+]
+
+
+class ProviderCatalogTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write_json(self, rows):
+        path = Path(self.tmpdir.name) / "providers.json"
+        path.write_text(json.dumps(rows), encoding="utf-8")
+        return str(path)
+
+    def load(self, path):
+        out = StringIO()
+        call_command("load_providers", path, chunk_size=1, stdout=out)
+        return out.getvalue()
+
+    def test_seeded_providers_are_keyed_so_the_shipped_catalog_is_unchanged(self):
+        output = self.load("subscriptions/data/providers.json")
+
+        self.assertIn("0 inserted, 0 updated, 5 unchanged", output)
+        self.assertEqual(Provider.objects.filter(owner__isnull=True).count(), 5)
+
+    def test_loads_then_reloading_unchanged_catalog_writes_nothing(self):
+        path = self.write_json(CATALOG)
+
+        self.assertIn("2 inserted, 0 updated, 0 unchanged", self.load(path))
+        with self.assertNumQueries(2):
+            result = load_provider_catalog(CATALOG, chunk_size=1)
+
+        self.assertEqual((result.inserted, result.updated, result.unchanged), (0, 0, 2))
+        box = Provider.objects.get(catalog_key="cloud-box")
+        self.assertIsNone(box.owner)
+        self.assertEqual(box.cancellation_url, "https://box.example/cancel")
+
+    def test_changed_urls_update_rows_in_place(self):
+        load_provider_catalog(CATALOG)
+        original = Provider.objects.get(catalog_key="acme-tv")
+
+        path = Path(self.tmpdir.name) / "providers.csv"
+        with path.open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=["key", "name", "category", "website", "cancellation_url"])
+            writer.writeheader()
+            writer.writerow({**CATALOG[0], "website": "https://acme.example/new", "cancellation_url": ""})
+            writer.writerow({"name": "Cloud Box", "category": "Cloud Storage", "website": "",
+                             "cancellation_url": "https://box.example/cancel"})
+
+        self.assertIn("0 inserted, 1 updated, 1 unchanged", self.load(str(path)))
+        updated = Provider.objects.get(catalog_key="acme-tv")
+        self.assertEqual(updated.pk, original.pk)
+        self.assertEqual(updated.website, "https://acme.example/new")
+
+    def test_providers_outside_the_catalog_are_left_alone(self):
+        Provider.objects.create(name="Acme TV", category="Personal")
+
+        load_provider_catalog(CATALOG)
+
+        self.assertEqual(Provider.objects.filter(name="Acme TV").count(), 2)
+        self.assertTrue(Provider.objects.filter(name="Acme TV", catalog_key__isnull=True).exists())
+
+    def test_invalid_entry_raises_command_error(self):
+        with self.assertRaisesMessage(CommandError, "Catalog entry 2 needs a name and a category."):
+            self.load(self.write_json([CATALOG[0], {"name": "No Category"}]))
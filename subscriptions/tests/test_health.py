@@ -0,0 +1,42 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from .. import health
+
+
+class HealthCheckTests(TestCase):
+    def setUp(self):
+        health._migrations_checked = None
+
+    def test_liveness_runs_no_queries_and_skips_the_middleware_stack(self):
+        with self.assertNumQueries(0):
+            response = self.client.get("/healthz", HTTP_HOST="10.0.0.7:5000")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"status": "ok", "checks": {}})
+        self.assertNotIn("sessionid", response.cookies)
+        self.assertNotIn("X-Frame-Options", response)
+
+    def test_readiness_checks_the_database_and_caches_the_migration_check(self):
+        response = self.client.get("/readyz/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["checks"], {"database": "ok", "migrations": "ok"})
+        with patch.object(health, "MigrationExecutor") as executor:
+            self.client.get("/readyz")
+        executor.assert_not_called()
+
+    def test_readiness_fails_with_pending_migrations_or_a_broken_database(self):
+        with patch.object(health.MigrationExecutor, "migration_plan", return_value=[("migration", False)]):
+            response = self.client.get("/readyz")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["checks"]["migrations"], "failed")
+
+        with patch.object(health.connections["default"], "cursor", side_effect=RuntimeError("down")):
+            response = self.client.get("/readyz")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {"status": "unavailable", "checks": {"database": "failed", "migrations": "failed"}})
+
+    def test_other_methods_fall_through_to_the_site(self):
+        self.assertEqual(self.client.post("/healthz").status_code, 404)
@@ -0,0 +1,121 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from threading import Barrier
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from ..jobs import claim_jobs, enqueue, release_stale_jobs, run_job, work_batch
+from ..models import Job, JobStatus
+
+calls: list[dict] = []
+
+
+def record_call(**kwargs):
+    calls.append(kwargs)
+
+
+def always_fail(**kwargs):
+    raise RuntimeError("boom")
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_stores_dotted_path_and_payload(self):
+        job = enqueue(record_call, priority=5, value=1)
+
+        self.assertEqual(job.name, f"{__name__}.record_call")
+        self.assertEqual(job.payload, {"value": 1})
+        self.assertEqual(job.status, JobStatus.QUEUED)
+
+    def test_claim_orders_by_priority_and_skips_future_jobs(self):
+        low = enqueue(record_call, priority=0)
+        high = enqueue(record_call, priority=10)
+        enqueue(record_call, priority=20, run_at=timezone.now() + timedelta(hours=1))
+
+        claimed = claim_jobs(batch_size=10)
+
+        self.assertEqual([job.pk for job in claimed], [high.pk, low.pk])
+        self.assertEqual(Job.objects.filter(status=JobStatus.RUNNING).count(), 2)
+        self.assertEqual(claim_jobs(batch_size=10), [])
+
+    def test_successful_job_runs_once_and_is_deleted(self):
+        enqueue(record_call, value="x")
+
+        self.assertEqual(work_batch(), 1)
+        self.assertEqual(work_batch(), 0)
+
+        self.assertEqual(calls, [{"value": "x"}])
+        self.assertFalse(Job.objects.exists())
+
+    def test_failed_job_is_retried_with_backoff_then_dead_lettered(self):
+        job = enqueue(always_fail, max_attempts=2)
+
+        [claimed] = claim_jobs()
+        self.assertFalse(run_job(claimed))
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn("boom", job.last_error)
+
+        with patch("subscriptions.jobs.timezone.now", return_value=job.run_at):
+            [claimed] = claim_jobs()
+        run_job(claimed)
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.DEAD)
+        self.assertEqual(job.attempts, 2)
+
+    def test_release_stale_jobs_requeues_abandoned_running_jobs(self):
+        job = enqueue(record_call)
+        claim_jobs()
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(release_stale_jobs(timedelta(minutes=10)), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.QUEUED)
+
+    def test_release_stale_jobs_dead_letters_jobs_out_of_attempts(self):
+        job = enqueue(record_call, max_attempts=1)
+        retried = enqueue(record_call, max_attempts=2)
+        claim_jobs()
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(release_stale_jobs(timedelta(minutes=10)), (1, 1))
+        job.refresh_from_db()
+        retried.refresh_from_db()
+        self.assertEqual((job.status, job.locked_at), (JobStatus.DEAD, None))
+        self.assertIn("Worker stopped", job.last_error)
+        self.assertEqual(retried.status, JobStatus.QUEUED)
+
+
+class ConcurrentClaimTests(TransactionTestCase):
+    worker_count = 2
+
+    def test_concurrent_workers_never_claim_the_same_job(self):
+        # SKIP LOCKED is what keeps claims apart; SQLite serializes writers instead of running them together.
+        if connection.vendor != "postgresql":
+            self.skipTest("Needs PostgreSQL to run claims concurrently.")
+        jobs = [enqueue(record_call, value=index) for index in range(50)]
+        barrier = Barrier(self.worker_count)
+
+        def worker():
+            try:
+                barrier.wait()
+                claimed = []
+                while batch := claim_jobs(batch_size=5):
+                    claimed.extend(job.pk for job in batch)
+                return claimed
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.worker_count) as executor:
+            results = list(executor.map(lambda _: worker(), range(self.worker_count)))
+
+        claimed = [pk for result in results for pk in result]
+        self.assertEqual(len(claimed), len(set(claimed)))
+        self.assertEqual(set(claimed), {job.pk for job in jobs})
+        self.assertFalse(Job.objects.exclude(attempts=1).exists())
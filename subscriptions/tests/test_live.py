@@ -0,0 +1,148 @@
+import asyncio
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..live import ChangePoller, DashboardHub, encode_event, hub, route_dashboard_events
+from ..models import BillingCycle, BillingCycleUnit, Provider, RenewalEvent, Subscription, SubscriptionStatus
+
+
+class ChangePollerTests(TestCase):
+    def setUp(self):
+        self.poller = ChangePoller(now=timezone.now() - timedelta(seconds=1))
+        self.user = get_user_model().objects.create_user(username="live-user", password="safe-pass")
+        self.other = get_user_model().objects.create_user(username="live-other", password="safe-pass")
+        provider = Provider.objects.create(owner=self.user, name="Provider", category="Software")
+        cycle = BillingCycle.objects.create(owner=self.user, interval=1, unit=BillingCycleUnit.MONTHS)
+        self.subscription = Subscription.objects.create(
+            owner=self.user,
+            name="Music",
+            provider=provider,
+            cost_amount=Decimal("10.00"),
+            cost_currency="USD",
+            billing_cycle=cycle,
+            status=SubscriptionStatus.ACTIVE,
+            start_date=timezone.now(),
+            next_billing_date=timezone.now() + timedelta(days=3),
+        )
+        self.event = RenewalEvent.objects.create(
+            subscription=self.subscription,
+            renewal_date=timezone.now() + timedelta(days=3),
+            amount_amount=Decimal("10.00"),
+        )
+
+    def events(self, messages, user_id):
+        return [message.decode().split("\n", 1)[0] for owner_id, message in messages if owner_id == user_id]
+
+    def test_reports_each_change_once_to_connected_owners_only(self):
+        first = self.poller.poll({self.user.pk, self.other.pk}, set())
+
+        self.assertEqual(self.events(first, self.user.pk), ["event: renewal.upcoming", "event: totals"])
+        self.assertEqual(self.events(first, self.other.pk), [])
+        self.assertEqual(self.poller.poll({self.user.pk}, set()), [])
+
+        RenewalEvent.objects.filter(pk=self.event.pk).update(is_processed=True, updated_at=timezone.now())
+
+        self.assertEqual(self.events(self.poller.poll({self.user.pk}, set()), self.user.pk), ["event: renewal.processed"])
+
+    def test_totals_only_sent_when_they_change_or_on_resync(self):
+        self.poller.poll({self.user.pk}, set())
+
+        self.assertEqual(self.poller.poll({self.user.pk}, {self.user.pk}), [])
+
+        self.subscription.delete()
+        messages = self.poller.poll({self.user.pk}, {self.user.pk})
+
+        totals = {"monthly_total": "0.00", "annual_total": "0.00", "currency": "USD"}
+        self.assertEqual(messages, [(self.user.pk, encode_event("totals", totals))])
+
+
+class DashboardHubTests(TestCase):
+    async def test_single_poller_fans_out_to_each_owners_clients(self):
+        calls = []
+
+        async def poll(user_ids, resync_ids):
+            calls.append(set(user_ids))
+            return [(1, b"event: totals\n\n")] if len(calls) == 1 else []
+
+        hub = DashboardHub(poll=poll, poll_interval=0.001)
+        first, second, other = hub.subscribe(1), hub.subscribe(1), hub.subscribe(2)
+
+        self.assertEqual(await asyncio.wait_for(first.get(), 1), b"event: totals\n\n")
+        self.assertEqual(second.get_nowait(), b"event: totals\n\n")
+        self.assertTrue(other.empty())
+        self.assertEqual(calls[0], {1, 2})
+
+        for user_id, queue in ((1, first), (1, second), (2, other)):
+            hub.unsubscribe(user_id, queue)
+        self.assertEqual(hub.connections, 0)
+        self.assertIsNone(hub._task)
+
+
+class DashboardEventsViewTests(TestCase):
+    def test_requires_login(self):
+        self.assertEqual(self.client.get(reverse("subscriptions:dashboard-events")).status_code, 401)
+
+    def test_declines_to_stream_under_wsgi(self):
+        user = get_user_model().objects.create_user(username="wsgi-user", password="safe-pass")
+        self.client.force_login(user)
+
+        self.assertEqual(self.client.get(reverse("subscriptions:dashboard-events")).status_code, 204)
+
+
+class DashboardEventsApplicationTests(TestCase):
+    async def call(self, scope, disconnect):
+        requested = False
+        sent = []
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        async def django_application(scope, receive, send):
+            sent.append({"type": "django"})
+
+        application = route_dashboard_events(django_application)
+        return sent, asyncio.ensure_future(application(scope, receive, send))
+
+    def scope(self, path, cookie=""):
+        return {"type": "http", "method": "GET", "path": path, "headers": [(b"cookie", cookie.encode())]}
+
+    async def test_streams_to_session_authenticated_clients_until_they_disconnect(self):
+        user = await get_user_model().objects.acreate_user(username="asgi-user", password="safe-pass")
+        await self.async_client.aforce_login(user)
+        cookie = f"sessionid={self.async_client.cookies['sessionid'].value}"
+        disconnect = asyncio.Event()
+
+        sent, task = await self.call(self.scope(reverse("subscriptions:dashboard-events"), cookie), disconnect)
+        while len(sent) < 2:
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(sent[0]["status"], 200)
+        self.assertIn((b"content-type", b"text/event-stream"), sent[0]["headers"])
+        self.assertEqual(sent[1]["body"], b"retry: 5000\n\n")
+        self.assertEqual(hub.connections, 1)
+
+        disconnect.set()
+        await asyncio.wait_for(task, 1)
+        self.assertEqual(hub.connections, 0)
+
+    async def test_rejects_anonymous_clients_and_passes_other_paths_to_django(self):
+        sent, task = await self.call(self.scope(reverse("subscriptions:dashboard-events")), asyncio.Event())
+        await asyncio.wait_for(task, 1)
+        self.assertEqual(sent[0]["status"], 401)
+
+        sent, task = await self.call(self.scope(reverse("subscriptions:dashboard")), asyncio.Event())
+        await asyncio.wait_for(task, 1)
+        self.assertEqual(sent, [{"type": "django"}])
@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from prometheus_client import REGISTRY
+
+from ..checks import check_metrics_token
+from ..metrics import collect_domain_metrics
+from ..models import (
+    BillingCycle,
+    BillingCycleUnit,
+    NotificationRule,
+    NotificationTiming,
+    Provider,
+    RenewalEvent,
+    Subscription,
+)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("observer", password="pass1234")
+        provider = Provider.objects.create(name="Netflix", category="Streaming")
+        cycle = BillingCycle.objects.create(interval=1, unit=BillingCycleUnit.MONTHS)
+        now = timezone.now()
+        for currency in ("usd", "USD", "EUR"):
+            subscription = Subscription.objects.create(
+                owner=self.user,
+                name=f"Plan {currency}",
+                provider=provider,
+                cost_amount="10.00",
+                cost_currency=currency,
+                billing_cycle=cycle,
+                start_date=now,
+                next_billing_date=now + timedelta(days=5),
+            )
+        NotificationRule.objects.create(subscription=subscription, timing=NotificationTiming.ONE_DAY_BEFORE)
+        NotificationRule.objects.create(
+            subscription=subscription, timing=NotificationTiming.ONE_WEEK_BEFORE, is_enabled=False
+        )
+        for days in (-2, 3):
+            RenewalEvent.objects.create(
+                subscription=subscription,
+                renewal_date=now + timedelta(days=days),
+                amount_amount="10.00",
+                amount_currency="EUR",
+            )
+
+    def test_collector_sets_domain_gauges(self):
+        collect_domain_metrics()
+
+        self.assertEqual(sample("smp_renewal_backlog"), 2)
+        self.assertEqual(sample("smp_overdue_renewals"), 1)
+        self.assertEqual(sample("smp_enabled_notification_rules"), 1)
+        self.assertEqual(sample("smp_active_subscriptions", currency="USD"), 2)
+        self.assertEqual(sample("smp_active_subscriptions", currency="EUR"), 1)
+
+        Subscription.objects.filter(cost_currency="EUR").delete()
+        collect_domain_metrics()
+        self.assertEqual(sample("smp_active_subscriptions", currency="EUR"), 0)
+
+    def test_requests_record_latency_and_query_counts_by_url_name(self):
+        labels = {"view": "subscriptions:dashboard"}
+        before = sample("smp_request_db_queries_count", **labels)
+        self.client.force_login(self.user)
+
+        self.client.get(reverse("subscriptions:dashboard"))
+
+        self.assertEqual(sample("smp_request_db_queries_count", **labels), before + 1)
+        self.assertGreater(sample("smp_request_db_queries_sum", **labels), 0)
+        self.assertGreater(sample("smp_request_duration_seconds_count", method="GET", **labels), 0)
+
+    def test_cache_lookups_are_counted(self):
+        self.client.force_login(self.user)
+        url = self.client.get(reverse("subscriptions:dashboard")).context["calendar_feed_url"]
+        misses = sample("smp_cache_lookups_total", cache="calendar_feed", result="miss")
+        hits = sample("smp_cache_lookups_total", cache="calendar_feed", result="hit")
+
+        b"".join(self.client.get(url).streaming_content)
+        self.client.get(url)
+
+        self.assertEqual(sample("smp_cache_lookups_total", cache="calendar_feed", result="miss"), misses + 1)
+        self.assertEqual(sample("smp_cache_lookups_total", cache="calendar_feed", result="hit"), hits + 1)
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    def test_metrics_endpoint_serves_prometheus_text(self):
+        collect_domain_metrics()
+
+        response = self.client.get(reverse("subscriptions:metrics"), headers={"Authorization": "Bearer scrape-secret"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertContains(response, "smp_renewal_backlog 2.0")
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    def test_metrics_endpoint_requires_token_when_configured(self):
+        url = reverse("subscriptions:metrics")
+
+        self.assertEqual(self.client.get(url).status_code, 401)
+        response = self.client.get(url, headers={"Authorization": "Bearer scrape-secret"})
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN="", DEBUG=False)
+    def test_metrics_endpoint_is_closed_without_a_token_outside_debug(self):
+        self.assertEqual(self.client.get(reverse("subscriptions:metrics")).status_code, 403)
+        self.assertEqual([message.id for message in check_metrics_token(None)], ["subscriptions.W002"])
+
+    @override_settings(METRICS_TOKEN="", DEBUG=True)
+    def test_metrics_endpoint_is_open_without_a_token_in_debug(self):
+        self.assertEqual(self.client.get(reverse("subscriptions:metrics")).status_code, 200)
@@ -143,3 +143,36 @@ class SubscriptionModelTests(TestCase):
 
         self.assertEqual(subscription.monthly_cost_amount(), Decimal("15.00"))
         self.assertEqual(subscription.annual_cost_amount(), Decimal("180.00"))
+
+    def test_monthly_cost_base_is_kept_current_on_save(self):
+        self.assertEqual(self.subscription.monthly_cost_base, Decimal("15.0000"))
+
+        self.subscription.cost_amount = Decimal("10.00")
+        self.subscription.cost_currency = "EUR"
+        self.subscription.save(update_fields=["cost_amount", "cost_currency"])
+
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.monthly_cost_base, Decimal("10.8000"))
+
+    def test_billing_cycle_edit_recomputes_monthly_cost_base(self):
+        self.cycle.unit = BillingCycleUnit.YEARS
+        self.cycle.save()
+
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.monthly_cost_base, Decimal("1.2500"))
+
+    def test_bulk_refresh_matches_save_to_the_last_digit(self):
+        # 12.34 EUR every 3 weeks gives a monthly cost with a repeating decimal expansion.
+        self.cycle.interval = 3
+        self.cycle.unit = BillingCycleUnit.WEEKS
+        self.cycle.save()
+        self.subscription.cost_amount = Decimal("12.34")
+        self.subscription.cost_currency = "EUR"
+        self.subscription.save()
+        saved = Subscription.objects.get(pk=self.subscription.pk).monthly_cost_base
+
+        Subscription.objects.filter(pk=self.subscription.pk).update(monthly_cost_base=0)
+        Subscription.objects.filter(pk=self.subscription.pk).refresh_monthly_cost_base()
+
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.monthly_cost_base, saved)
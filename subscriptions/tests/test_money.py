@@ -0,0 +1,36 @@
+from decimal import ROUND_DOWN, ROUND_HALF_UP, Decimal
+
+from django.test import SimpleTestCase
+
+from ..money import Money, divide_rounded, fixed_rate, to_minor
+
+
+class MoneyTests(SimpleTestCase):
+    def test_minor_units_follow_currency_exponent(self):
+        self.assertEqual(to_minor("12.34", "usd"), 1234)
+        self.assertEqual(to_minor("1500", "JPY"), 1500)
+        self.assertEqual(to_minor("1.234", "KWD"), 1234)
+        self.assertEqual(Money.from_decimal("19.99", "eur"), Money(1999, "EUR"))
+        self.assertEqual(Money(1999, "EUR").to_decimal(), Decimal("19.99"))
+
+    def test_divide_rounded_modes(self):
+        self.assertEqual([divide_rounded(n, 2) for n in (1, 3, 5, -1, -3)], [0, 2, 2, 0, -2])
+        self.assertEqual([divide_rounded(n, 2, ROUND_HALF_UP) for n in (1, 3, -1)], [1, 2, -1])
+        self.assertEqual(divide_rounded(29, 10, ROUND_DOWN), 2)
+        with self.assertRaises(ValueError):
+            divide_rounded(1, 2, "ROUND_CEILING")
+
+    def test_multiply_rounds_once(self):
+        # 10.00 every 7 days -> 30/7 of it per month = 42.857... -> 42.86
+        self.assertEqual(Money(1000, "USD").multiply(30, 7), Money(4286, "USD"))
+
+    def test_convert_between_exponents(self):
+        rate = fixed_rate("0.0067")  # USD per JPY
+        self.assertEqual(Money(1500, "JPY").convert(rate, "USD"), Money(1005, "USD"))
+        self.assertEqual(Money(1005, "USD").convert(fixed_rate("149.25"), "JPY"), Money(1500, "JPY"))
+
+    def test_mixing_currencies_is_rejected(self):
+        self.assertEqual(Money(100, "USD") + Money(5, "USD") - Money(50, "USD"), Money(55, "USD"))
+        with self.assertRaises(ValueError):
+            Money(100, "USD") + Money(100, "EUR")
+
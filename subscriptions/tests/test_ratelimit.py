@@ -0,0 +1,150 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve, reverse
+
+from ..checks import check_shared_cache
+from ..middleware import RateLimitMiddleware
+from ..ratelimit import RateLimiter, parse_rate
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class RateLimiterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(clock=self.clock)
+        self.rate = parse_rate("3/min")
+
+    def test_bucket_allows_a_burst_then_refills_one_token_at_a_time(self):
+        self.assertEqual([self.limiter.take("key", self.rate) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(self.limiter.take("key", self.rate), 20)
+
+        self.clock.advance(19)
+        self.assertAlmostEqual(self.limiter.take("key", self.rate), 1)
+        self.clock.advance(1)
+        self.assertEqual(self.limiter.take("key", self.rate), 0)
+        self.assertAlmostEqual(self.limiter.take("key", self.rate), 20)
+
+    def test_idle_bucket_refills_only_up_to_its_capacity(self):
+        self.limiter.take("key", self.rate)
+        self.clock.advance(3600)
+
+        self.assertEqual([self.limiter.take("key", self.rate) for _ in range(3)], [0, 0, 0])
+        self.assertGreater(self.limiter.take("key", self.rate), 0)
+
+    def test_buckets_are_shared_through_the_cache_and_refusals_cost_no_tokens(self):
+        other_worker = RateLimiter(clock=self.clock)
+        self.limiter.take("key", self.rate)
+        self.limiter.take("key", self.rate)
+        other_worker.take("key", self.rate)
+
+        self.assertGreater(self.limiter.take("key", self.rate), 0)
+        self.assertGreater(other_worker.take("key", self.rate), 0)
+        self.clock.advance(20)
+        self.assertEqual(other_worker.take("key", self.rate), 0)
+
+    def test_refused_clients_are_refused_without_the_cache(self):
+        for _ in range(4):
+            self.limiter.take("key", self.rate)
+
+        # With the cache emptied, only the in-process record can refuse.
+        cache.clear()
+        self.assertGreater(self.limiter.take("key", self.rate), 0)
+        self.clock.advance(20)
+        self.assertEqual(self.limiter.take("key", self.rate), 0)
+
+    def test_rejects_unknown_periods(self):
+        with self.assertRaises(ValueError):
+            parse_rate("10/week")
+
+
+@override_settings(
+    RATE_LIMITS={"subscriptions:dashboard": {"user": "2/min", "ip": "3/min"}},
+    RATE_LIMIT_EXEMPT_USERS=["ops"],
+    RATE_LIMIT_EXEMPT_IPS=["10.0.0.0/8"],
+)
+class RateLimitMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = FakeClock()
+        self.middleware = RateLimitMiddleware(lambda request: HttpResponse("ok"))
+        self.middleware.limiter = RateLimiter(clock=self.clock)
+        self.factory = RequestFactory()
+        self.user = get_user_model().objects.create_user(username="busy", password="safe-pass")
+
+    def get(self, name="subscriptions:dashboard", user=None, ip="192.0.2.1", **headers):
+        request = self.factory.get(reverse(name), REMOTE_ADDR=ip, **headers)
+        request.user = user or AnonymousUser()
+        request.resolver_match = resolve(request.path)
+        return self.middleware.process_view(request, None, (), {})
+
+    def test_returns_429_with_retry_after_once_the_user_bucket_is_empty(self):
+        self.assertIsNone(self.get(user=self.user))
+        self.assertIsNone(self.get(user=self.user))
+
+        response = self.get(user=self.user)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "30")
+        self.clock.advance(30)
+        self.assertIsNone(self.get(user=self.user))
+
+    def test_ip_bucket_covers_anonymous_requests(self):
+        for _ in range(3):
+            self.assertIsNone(self.get())
+
+        self.assertEqual(self.get().status_code, 429)
+        self.assertIsNone(self.get(ip="192.0.2.2"))
+
+    def test_exempt_users_ips_and_unlisted_views_are_not_limited(self):
+        ops = get_user_model().objects.create_user(username="ops", password="safe-pass")
+
+        for _ in range(5):
+            self.assertIsNone(self.get(user=ops))
+            self.assertIsNone(self.get(ip="10.1.2.3"))
+            self.assertIsNone(self.get("subscriptions:provider-list"))
+
+    def test_refusal_by_the_ip_bucket_returns_the_user_token(self):
+        for _ in range(3):
+            self.assertIsNone(self.get())
+        self.assertEqual(self.get(user=self.user).status_code, 429)
+
+        # The refused request left both of the user's tokens in place.
+        self.assertIsNone(self.get(user=self.user, ip="192.0.2.2"))
+        self.assertIsNone(self.get(user=self.user, ip="192.0.2.3"))
+
+    def test_forwarded_address_is_ignored_without_trusted_proxies(self):
+        for index in range(3):
+            self.assertIsNone(self.get(ip="203.0.113.9", HTTP_X_FORWARDED_FOR=f"192.0.2.{index}"))
+
+        self.assertEqual(self.get(ip="203.0.113.9", HTTP_X_FORWARDED_FOR="192.0.2.99").status_code, 429)
+
+    @override_settings(RATE_LIMIT_PROXY_HOPS=1)
+    def test_clients_behind_a_trusted_proxy_get_their_own_ip_bucket(self):
+        for _ in range(3):
+            self.assertIsNone(self.get(ip="203.0.113.9", HTTP_X_FORWARDED_FOR="spoofed, 192.0.2.1"))
+
+        self.assertEqual(self.get(ip="203.0.113.9", HTTP_X_FORWARDED_FOR="192.0.2.1").status_code, 429)
+        self.assertIsNone(self.get(ip="203.0.113.9", HTTP_X_FORWARDED_FOR="192.0.2.1, 192.0.2.2"))
+
+
+class SharedCacheCheckTests(TestCase):
+    @override_settings(SHARED_CACHE=False)
+    def test_warns_on_deploy_without_a_shared_cache(self):
+        self.assertEqual([message.id for message in check_shared_cache(None)], ["subscriptions.W001"])
+
+    @override_settings(SHARED_CACHE=True)
+    def test_passes_with_a_shared_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
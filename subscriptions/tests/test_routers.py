@@ -0,0 +1,102 @@
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.conf import settings
+from django.db import connections, router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ..middleware import PrimaryStickinessMiddleware
+from ..models import Provider, Subscription
+from ..routers import PRIMARY_DB, REPLICA_DB, use_primary
+
+
+@override_settings(DATABASE_ROUTERS=["subscriptions.routers.PrimaryReplicaRouter"], REPLICA_STICKY_SECONDS=15)
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.read_db = None
+
+        def view(request):
+            self.read_db = Subscription.objects.all().db
+            return HttpResponse("ok")
+
+        self.middleware = PrimaryStickinessMiddleware(view)
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        self.assertEqual(Subscription.objects.all().db, REPLICA_DB)
+        self.assertEqual(router.db_for_write(Subscription), PRIMARY_DB)
+        self.assertTrue(router.allow_migrate(PRIMARY_DB, "subscriptions"))
+        self.assertFalse(router.allow_migrate(REPLICA_DB, "subscriptions"))
+
+    def test_reads_inside_a_primary_transaction_stay_on_primary(self):
+        with patch.object(connections[PRIMARY_DB], "in_atomic_block", True):
+            self.assertEqual(Subscription.objects.all().db, PRIMARY_DB)
+
+    def test_use_primary_pins_reads(self):
+        with use_primary():
+            self.assertEqual(Subscription.objects.all().db, PRIMARY_DB)
+        self.assertEqual(Subscription.objects.all().db, REPLICA_DB)
+
+    def test_get_request_reads_from_replica_without_sticky_cookie(self):
+        response = self.middleware(self.factory.get("/subscriptions/"))
+
+        self.assertEqual(self.read_db, REPLICA_DB)
+        self.assertNotIn(PrimaryStickinessMiddleware.cookie_name, response.cookies)
+
+    def test_post_reads_from_primary_and_sets_short_lived_cookie(self):
+        response = self.middleware(self.factory.post("/subscriptions/add/"))
+
+        self.assertEqual(self.read_db, PRIMARY_DB)
+        cookie = response.cookies[PrimaryStickinessMiddleware.cookie_name]
+        self.assertEqual(cookie["max-age"], 15)
+
+    def test_requests_after_a_write_stay_on_primary_while_cookie_lives(self):
+        request = self.factory.get("/subscriptions/")
+        request.COOKIES[PrimaryStickinessMiddleware.cookie_name] = "1"
+
+        self.middleware(request)
+
+        self.assertEqual(self.read_db, PRIMARY_DB)
+        self.assertEqual(Subscription.objects.all().db, REPLICA_DB)
+
+
+@skipUnless(REPLICA_DB in settings.DATABASES, "No replica database configured.")
+@override_settings(DATABASE_ROUTERS=["subscriptions.routers.PrimaryReplicaRouter"], REPLICA_STICKY_SECONDS=15)
+class ReplicaQueryRoutingTests(TransactionTestCase):
+    # Not TestCase: its wrapping transaction on the primary would pin every read there.
+    databases = {PRIMARY_DB, REPLICA_DB}
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        Provider.objects.create(name="Shared", category="Software")
+        self.middleware = PrimaryStickinessMiddleware(
+            lambda request: HttpResponse(Provider.objects.filter(name="Shared").values_list("name", flat=True))
+        )
+
+    def serve(self, request):
+        """The response, and how many queries the primary and the replica ran for it."""
+        with CaptureQueriesContext(connections[PRIMARY_DB]) as primary, CaptureQueriesContext(
+            connections[REPLICA_DB]
+        ) as replica:
+            response = self.middleware(request)
+        return response, len(primary), len(replica)
+
+    def test_get_reads_hit_the_replica(self):
+        response, primary, replica = self.serve(self.factory.get("/providers/"))
+
+        self.assertEqual(response.content, b"Shared")
+        self.assertEqual((primary, replica), (0, 1))
+
+    def test_write_request_and_the_sticky_follow_up_read_hit_the_primary(self):
+        response, primary, replica = self.serve(self.factory.post("/providers/add/"))
+        self.assertEqual((primary, replica), (1, 0))
+
+        follow_up = self.factory.get("/providers/")
+        follow_up.COOKIES[PrimaryStickinessMiddleware.cookie_name] = response.cookies[
+            PrimaryStickinessMiddleware.cookie_name
+        ].value
+        _, primary, replica = self.serve(follow_up)
+
+        self.assertEqual((primary, replica), (1, 0))
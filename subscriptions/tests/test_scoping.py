@@ -0,0 +1,32 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from ..models import Provider
+from ..scoping import scope_owned_or_shared_queryset
+
+
+class OwnedOrSharedScopingTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="scoped-user", password="safe-pass")
+        other = get_user_model().objects.create_user(username="other-user", password="safe-pass")
+        self.own = Provider.objects.create(owner=self.user, name="Own", category="Software")
+        self.shared = Provider.objects.create(name="Shared", category="Software")
+        self.other = Provider.objects.create(owner=other, name="Other", category="Software")
+
+    def test_returns_own_and_shared_providers_only(self):
+        providers = set(scope_owned_or_shared_queryset(Provider.objects.all(), self.user))
+
+        self.assertTrue({self.own, self.shared} <= providers)
+        self.assertNotIn(self.other, providers)
+        self.assertEqual({provider.owner_id for provider in providers}, {self.user.pk, None})
+
+    @skipUnless(connection.vendor == "sqlite", "Plan text is SQLite's.")
+    def test_both_branches_are_index_searches(self):
+        plan = scope_owned_or_shared_queryset(Provider.objects.order_by("name"), self.user).explain()
+
+        self.assertIn("MULTI-INDEX OR", plan)
+        self.assertEqual(plan.count("SEARCH subscriptions_provider USING"), 2)
+        self.assertNotIn("SCAN subscriptions_provider", plan)
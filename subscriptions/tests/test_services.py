@@ -1,20 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from decimal import Decimal
+from threading import Barrier
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from ..models import (
     BillingCycle,
     BillingCycleUnit,
+    DeletionLog,
+    ExchangeRate,
+    NotificationRule,
+    NotificationTiming,
     Provider,
     RenewalEvent,
     Subscription,
+    SubscriptionHistory,
     SubscriptionStatus,
 )
-from ..services import summarize_costs, upcoming_renewals
+from ..services import (
+    _resume_at_read_versions,
+    change_status,
+    compute_spending_breakdown,
+    convert_renewal_amounts,
+    delete_subscriptions,
+    due_notifications,
+    effective_notification_timings,
+    process_due_renewals,
+    projected_renewals,
+    recompute_monthly_cost_base,
+    rollover_billing_dates,
+    spending_breakdown,
+    summarize_costs,
+    upcoming_renewals,
+    update_subscription,
+)
 
 
 class CostSummaryServiceTests(TestCase):
@@ -27,6 +53,26 @@ class CostSummaryServiceTests(TestCase):
         self.assertEqual(summary.monthly_total, Decimal("0"))
         self.assertEqual(summary.annual_total, Decimal("0"))
 
+    @override_settings(EXCHANGE_RATES={"USD": 1.0, "JPY": 0.0067})
+    def test_summarize_costs_keeps_fractions_of_currencies_without_minor_units(self):
+        provider = Provider.objects.create(owner=self.user, name="Provider", category="Software")
+        cycle = BillingCycle.objects.create(owner=self.user, interval=1, unit=BillingCycleUnit.MONTHS)
+        subscription = Subscription.objects.create(
+            owner=self.user,
+            name="Imported",
+            provider=provider,
+            cost_amount=Decimal("1000.50"),
+            cost_currency="JPY",
+            billing_cycle=cycle,
+            start_date=timezone.now(),
+            next_billing_date=timezone.now(),
+        )
+
+        summary = summarize_costs(Subscription.objects.select_related("billing_cycle"))
+
+        self.assertEqual(summary.monthly_total, Decimal("6.703350"))
+        self.assertEqual(summary.monthly_total.quantize(Decimal("0.0001")), subscription.monthly_cost_base)
+
     def test_summarize_costs_aggregates_converted_monthly_and_annual_totals(self):
         provider = Provider.objects.create(owner=self.user, name="Provider", category="Software")
         monthly_cycle = BillingCycle.objects.create(
@@ -68,6 +114,84 @@ class CostSummaryServiceTests(TestCase):
         self.assertEqual(summary.annual_total.quantize(Decimal("0.01")), Decimal("141.60"))
 
 
+class MonthlyCostBaseServiceTests(TestCase):
+    def test_recompute_applies_changed_exchange_rates_in_batches(self):
+        user = get_user_model().objects.create_user(username="rate-user", password="safe-pass")
+        provider = Provider.objects.create(owner=user, name="Provider", category="Software")
+        yearly_cycle = BillingCycle.objects.create(owner=user, interval=1, unit=BillingCycleUnit.YEARS)
+        for name in ("One", "Two", "Three"):
+            Subscription.objects.create(
+                owner=user,
+                name=name,
+                provider=provider,
+                cost_amount=Decimal("120.00"),
+                cost_currency="EUR",
+                billing_cycle=yearly_cycle,
+                start_date=timezone.now(),
+                next_billing_date=timezone.now() + timedelta(days=365),
+            )
+
+        with override_settings(EXCHANGE_RATES={"USD": 1.0, "EUR": 1.5}):
+            updated = recompute_monthly_cost_base(batch_size=2)
+
+        self.assertEqual(updated, 3)
+        self.assertEqual(
+            set(Subscription.objects.values_list("monthly_cost_base", flat=True)),
+            {Decimal("15.0000")},
+        )
+
+
+class HistoricalRateConversionTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username="history-user", password="safe-pass")
+        provider = Provider.objects.create(owner=user, name="Provider", category="Software")
+        cycle = BillingCycle.objects.create(owner=user, interval=1, unit=BillingCycleUnit.MONTHS)
+        self.subscription = Subscription.objects.create(
+            owner=user,
+            name="Sub",
+            provider=provider,
+            cost_amount=Decimal("10.00"),
+            cost_currency="EUR",
+            billing_cycle=cycle,
+            start_date=timezone.now(),
+            next_billing_date=timezone.now(),
+        )
+        ExchangeRate.objects.create(currency="EUR", effective_date=datetime(2025, 1, 1).date(), rate=Decimal("1.10"))
+        ExchangeRate.objects.create(currency="EUR", effective_date=datetime(2025, 6, 1).date(), rate=Decimal("1.20"))
+
+    def _event(self, year, month, day, currency="EUR"):
+        return RenewalEvent.objects.create(
+            subscription=self.subscription,
+            renewal_date=timezone.make_aware(datetime(year, month, day)),
+            amount_amount=Decimal("10.00"),
+            amount_currency=currency,
+        )
+
+    def test_uses_rate_in_effect_at_each_renewal_date(self):
+        events = [
+            self._event(2024, 12, 1),
+            self._event(2025, 3, 1),
+            self._event(2025, 6, 1),
+            self._event(2025, 9, 1, currency="GBP"),
+        ]
+
+        amounts = convert_renewal_amounts(events)
+
+        self.assertEqual(
+            amounts,
+            [Decimal("11.0000"), Decimal("11.0000"), Decimal("12.0000"), Decimal("10.00") * Decimal("1.27")],
+        )
+
+    def test_converts_querysets_with_a_single_rate_query(self):
+        self._event(2025, 3, 1)
+        self._event(2025, 7, 1)
+
+        with self.assertNumQueries(2):
+            amounts = convert_renewal_amounts(RenewalEvent.objects.order_by("renewal_date"))
+
+        self.assertEqual(amounts, [Decimal("11.0000"), Decimal("12.0000")])
+
+
 class UpcomingRenewalsServiceTests(TestCase):
     def setUp(self):
         self.user = get_user_model().objects.create_user(username="renew-user", password="safe-pass")
@@ -214,3 +338,570 @@ class UpcomingRenewalsServiceTests(TestCase):
 
         self.assertEqual(len(renewals), 25)
         self.assertLessEqual(renewals[0].renewal_date, renewals[-1].renewal_date)
+
+
+class ProcessDueRenewalsServiceTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="process-user", password="safe-pass")
+        provider = Provider.objects.create(owner=self.user, name="Provider", category="Software")
+        cycle = BillingCycle.objects.create(owner=self.user, interval=1, unit=BillingCycleUnit.MONTHS)
+        self.now = timezone.make_aware(datetime(2026, 3, 1, 12, 0, 0))
+        self.subscription = Subscription.objects.create(
+            owner=self.user,
+            name="Monthly",
+            provider=provider,
+            cost_amount=Decimal("10.00"),
+            cost_currency="USD",
+            billing_cycle=cycle,
+            status=SubscriptionStatus.ACTIVE,
+            start_date=self.now - timedelta(days=60),
+            next_billing_date=self.now - timedelta(days=1),
+        )
+
+    def test_marks_due_events_processed_and_advances_next_billing_date(self):
+        due = RenewalEvent.objects.create(
+            subscription=self.subscription,
+            renewal_date=self.now - timedelta(days=1),
+            amount_amount=Decimal("10.00"),
+        )
+        future = RenewalEvent.objects.create(
+            subscription=self.subscription,
+            renewal_date=self.now + timedelta(days=29),
+            amount_amount=Decimal("10.00"),
+        )
+
+        processed = process_due_renewals(now=self.now)
+
+        self.assertEqual(processed, 1)
+        due.refresh_from_db()
+        future.refresh_from_db()
+        self.subscription.refresh_from_db()
+        self.assertTrue(due.is_processed)
+        self.assertFalse(future.is_processed)
+        self.assertEqual(self.subscription.next_billing_date, self.now + timedelta(days=29))
+        self.assertTrue(
+            self.subscription.history.filter(event_type=SubscriptionHistory.EventType.RENEWED).exists()
+        )
+
+    def test_does_not_move_next_billing_date_backwards(self):
+        later = self.now + timedelta(days=90)
+        Subscription.objects.filter(pk=self.subscription.pk).update(next_billing_date=later)
+        RenewalEvent.objects.create(
+            subscription=self.subscription,
+            renewal_date=self.now - timedelta(days=1),
+            amount_amount=Decimal("10.00"),
+        )
+
+        process_due_renewals(now=self.now)
+
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.next_billing_date, later)
+
+    def test_processes_backlog_in_batches(self):
+        for day in range(1, 6):
+            RenewalEvent.objects.create(
+                subscription=self.subscription,
+                renewal_date=self.now - timedelta(days=day),
+                amount_amount=Decimal("10.00"),
+            )
+
+        self.assertEqual(process_due_renewals(batch_size=2, now=self.now), 2)
+        self.assertEqual(process_due_renewals(batch_size=2, now=self.now), 2)
+        self.assertEqual(process_due_renewals(batch_size=2, now=self.now), 1)
+        self.assertEqual(process_due_renewals(batch_size=2, now=self.now), 0)
+
+
+class ParallelRenewalWorkersTests(TransactionTestCase):
+    worker_count = 4
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username="parallel-user", password="safe-pass")
+        provider = Provider.objects.create(owner=user, name="Provider", category="Software")
+        cycle = BillingCycle.objects.create(owner=user, interval=1, unit=BillingCycleUnit.MONTHS)
+        self.now = timezone.now()
+        for index in range(10):
+            subscription = Subscription.objects.create(
+                owner=user,
+                name=f"Sub {index}",
+                provider=provider,
+                cost_amount=Decimal("5.00"),
+                billing_cycle=cycle,
+                start_date=self.now - timedelta(days=60),
+                next_billing_date=self.now,
+            )
+            for day in range(1, 5):
+                RenewalEvent.objects.create(
+                    subscription=subscription,
+                    renewal_date=self.now - timedelta(days=day),
+                    amount_amount=Decimal("5.00"),
+                )
+
+    def assert_processed_exactly_once(self, results):
+        self.assertEqual(sum(results), 40)
+        self.assertFalse(RenewalEvent.objects.filter(is_processed=False).exists())
+        self.assertEqual(
+            SubscriptionHistory.objects.filter(event_type=SubscriptionHistory.EventType.RENEWED).count(),
+            40,
+        )
+
+    @skipUnlessDBFeature("has_select_for_update_skip_locked")
+    def test_parallel_workers_process_each_event_exactly_once(self):
+        def worker():
+            processed = 0
+            try:
+                while batch := process_due_renewals(batch_size=3, now=self.now):
+                    processed += batch
+            finally:
+                connection.close()
+            return processed
+
+        with ThreadPoolExecutor(max_workers=self.worker_count) as executor:
+            results = list(executor.map(lambda _: worker(), range(self.worker_count)))
+
+        self.assert_processed_exactly_once(results)
+
+    def test_interleaved_workers_process_each_event_exactly_once(self):
+        results = [0] * self.worker_count
+        active = set(range(self.worker_count))
+        while active:
+            for worker in sorted(active):
+                batch = process_due_renewals(batch_size=3, now=self.now)
+                results[worker] += batch
+                if not batch:
+                    active.discard(worker)
+
+        self.assert_processed_exactly_once(results)
+
+
+class ProjectedRenewalsServiceTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="projected-user", password="safe-pass")
+        self.provider = Provider.objects.create(owner=self.user, name="Provider", category="Software")
+        self.fixed_now = timezone.make_aware(datetime(2026, 2, 1, 12, 0, 0))
+
+    def _subscription(self, name, interval, unit, first_renewal_in_days, **extra):
+        cycle, _ = BillingCycle.objects.get_or_create(owner=self.user, interval=interval, unit=unit)
+        return Subscription.objects.create(
+            owner=self.user,
+            name=name,
+            provider=self.provider,
+            cost_amount=Decimal("5.00"),
+            billing_cycle=cycle,
+            start_date=self.fixed_now - timedelta(days=30),
+            next_billing_date=self.fixed_now + timedelta(days=first_renewal_in_days),
+            **extra,
+        )
+
+    def test_merges_billing_schedules_in_date_order_within_horizon(self):
+        weekly = self._subscription("Weekly", 1, BillingCycleUnit.WEEKS, 2)
+        monthly = self._subscription("Monthly", 1, BillingCycleUnit.MONTHS, 10)
+        self._subscription("Later", 1, BillingCycleUnit.MONTHS, 40)
+        self._subscription("Paused", 1, BillingCycleUnit.DAYS, 1, status=SubscriptionStatus.PAUSED)
+
+        with patch("subscriptions.services.timezone.now", return_value=self.fixed_now):
+            renewals = projected_renewals(days=30, user=self.user)
+
+        self.assertEqual(
+            [(renewal.subscription.name, (renewal.renewal_date - self.fixed_now).days) for renewal in renewals],
+            [("Weekly", 2), ("Weekly", 9), ("Monthly", 10), ("Weekly", 16), ("Weekly", 23), ("Weekly", 30)],
+        )
+        self.assertEqual(renewals[0].amount_amount, weekly.cost_amount)
+        self.assertEqual(renewals[2].amount_currency, monthly.cost_currency)
+
+    def test_stops_after_limit_and_only_loads_soonest_subscriptions(self):
+        for index in range(5):
+            self._subscription(f"Daily {index}", 1, BillingCycleUnit.DAYS, index + 1)
+
+        with patch("subscriptions.services.timezone.now", return_value=self.fixed_now):
+            with self.assertNumQueries(1):
+                renewals = projected_renewals(days=30, user=self.user, limit=3)
+
+        self.assertEqual([renewal.subscription.name for renewal in renewals], ["Daily 0", "Daily 0", "Daily 1"])
+
+    def test_projects_past_due_subscriptions_from_their_next_date_after_now(self):
+        self._subscription("Weekly", 1, BillingCycleUnit.WEEKS, -10)
+        self._subscription("Monthly", 1, BillingCycleUnit.MONTHS, 5)
+
+        with patch("subscriptions.services.timezone.now", return_value=self.fixed_now):
+            with self.assertNumQueries(1):
+                renewals = projected_renewals(days=14, user=self.user)
+
+        self.assertEqual(
+            [(renewal.subscription.name, (renewal.renewal_date - self.fixed_now).days) for renewal in renewals],
+            [("Weekly", 4), ("Monthly", 5), ("Weekly", 11)],
+        )
+
+
+class SpendingBreakdownServiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username="spending-user", password="safe-pass")
+        self.cycle = BillingCycle.objects.create(owner=self.user, interval=1, unit=BillingCycleUnit.MONTHS)
+        self.streaming = Provider.objects.create(owner=self.user, name="Streamer", category="Streaming")
+        self.software = Provider.objects.create(owner=self.user, name="Editor", category="Software")
+
+    def create_subscription(self, provider, amount, currency="USD", status=SubscriptionStatus.ACTIVE, owner=None):
+        return Subscription.objects.create(
+            owner=owner or self.user,
+            name=f"{provider.name} {amount}",
+            provider=provider,
+            cost_amount=Decimal(amount),
+            cost_currency=currency,
+            billing_cycle=self.cycle,
+            status=status,
+            start_date=timezone.now(),
+            next_billing_date=timezone.now() + timedelta(days=10),
+        )
+
+    def test_groups_active_totals_by_category_provider_and_currency(self):
+        self.create_subscription(self.streaming, "10.00")
+        self.create_subscription(self.streaming, "5.00", currency="eur")
+        self.create_subscription(self.software, "20.00")
+        self.create_subscription(self.software, "99.00", status=SubscriptionStatus.CANCELLED)
+        other = get_user_model().objects.create_user(username="other-spender", password="safe-pass")
+        self.create_subscription(self.software, "50.00", owner=other)
+
+        with self.assertNumQueries(1):
+            breakdown = compute_spending_breakdown(self.user.pk)
+
+        by_provider = {line.label: line for line in breakdown.by_provider}
+        self.assertEqual(by_provider["Editor"].monthly_total, Decimal("20.00"))
+        self.assertEqual(by_provider["Editor"].annual_total, Decimal("240.00"))
+        self.assertEqual(by_provider["Streamer"].subscriptions, 2)
+        self.assertEqual([line.label for line in breakdown.by_category], ["Software", "Streaming"])
+        self.assertEqual(
+            {line.label: line.subscriptions for line in breakdown.by_currency},
+            {"USD": 2, "EUR": 1},
+        )
+        self.assertEqual(
+            {line.label: line.subscriptions for line in breakdown.by_status},
+            {"Active": 3, "Cancelled": 1},
+        )
+
+    def test_keeps_providers_sharing_a_name_apart(self):
+        catalog = Provider.objects.create(name="Streamer", category="Streaming")
+        self.create_subscription(self.streaming, "10.00")
+        self.create_subscription(catalog, "4.00")
+
+        breakdown = compute_spending_breakdown(self.user.pk)
+
+        self.assertEqual(
+            [(line.label, line.monthly_total) for line in breakdown.by_provider],
+            [("Streamer", Decimal("10.00")), ("Streamer", Decimal("4.00"))],
+        )
+        self.assertEqual([line.subscriptions for line in breakdown.by_category], [2])
+
+    def test_cached_until_the_users_data_changes(self):
+        self.create_subscription(self.streaming, "10.00")
+        spending_breakdown(self.user.pk)
+
+        with self.assertNumQueries(0):
+            cached = spending_breakdown(self.user.pk)
+        self.assertEqual(cached.by_provider[0].monthly_total, Decimal("10.00"))
+
+        self.create_subscription(self.software, "30.00")
+
+        self.assertEqual(spending_breakdown(self.user.pk).by_provider[0].label, "Editor")
+
+
+class NotificationRuleResolutionTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="rules-user", password="safe-pass")
+        provider = Provider.objects.create(owner=self.user, name="Provider", category="Software")
+        cycle = BillingCycle.objects.create(owner=self.user, interval=1, unit=BillingCycleUnit.MONTHS)
+        self.now = timezone.now()
+        self.renewal_date = self.now + timedelta(days=3, hours=1)
+        self.plain, self.opted_out, self.extra = [
+            Subscription.objects.create(
+                owner=self.user,
+                name=name,
+                provider=provider,
+                cost_amount=Decimal("5.00"),
+                billing_cycle=cycle,
+                status=SubscriptionStatus.ACTIVE,
+                start_date=self.now,
+                next_billing_date=self.renewal_date,
+            )
+            for name in ("Plain", "Opted out", "Extra")
+        ]
+        for subscription in (self.plain, self.opted_out, self.extra):
+            RenewalEvent.objects.create(
+                subscription=subscription, renewal_date=self.renewal_date, amount_amount=Decimal("5.00")
+            )
+        NotificationRule.objects.create(owner=self.user, timing=NotificationTiming.THREE_DAYS_BEFORE)
+        NotificationRule.objects.create(
+            subscription=self.opted_out, timing=NotificationTiming.THREE_DAYS_BEFORE, is_enabled=False
+        )
+        NotificationRule.objects.create(subscription=self.extra, timing=NotificationTiming.ONE_DAY_BEFORE)
+
+    def test_owner_defaults_apply_unless_the_subscription_overrides_them(self):
+        timings = effective_notification_timings(Subscription.objects.filter(owner=self.user))
+
+        self.assertEqual(timings[self.plain.pk], [NotificationTiming.THREE_DAYS_BEFORE])
+        self.assertEqual(timings[self.opted_out.pk], [])
+        self.assertEqual(
+            timings[self.extra.pk], [NotificationTiming.ONE_DAY_BEFORE, NotificationTiming.THREE_DAYS_BEFORE]
+        )
+
+    def test_due_notifications_resolve_defaults_and_overrides_in_the_query(self):
+        with self.assertNumQueries(len(NotificationTiming)):
+            due = due_notifications(self.now, self.now + timedelta(hours=2))
+
+        self.assertEqual(
+            sorted((notification.event.subscription.name, notification.timing) for notification in due),
+            [("Extra", NotificationTiming.THREE_DAYS_BEFORE), ("Plain", NotificationTiming.THREE_DAYS_BEFORE)],
+        )
+        self.assertEqual(due[0].notify_at, self.renewal_date - timedelta(days=3))
+
+        later = due_notifications(self.now + timedelta(days=2), self.now + timedelta(days=2, hours=2))
+        self.assertEqual([notification.event.subscription for notification in later], [self.extra])
+
+
+class RolloverBillingDatesTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="rollover-user", password="safe-pass")
+        self.provider = Provider.objects.create(owner=self.user, name="Provider", category="Software")
+        self.now = timezone.now()
+
+    def create_subscription(self, next_billing_date, unit=BillingCycleUnit.WEEKS, status=SubscriptionStatus.ACTIVE):
+        cycle, _ = BillingCycle.objects.get_or_create(owner=self.user, interval=2, unit=unit)
+        return Subscription.objects.create(
+            owner=self.user,
+            name=f"{unit} {next_billing_date:%Y%m%d}",
+            provider=self.provider,
+            cost_amount=Decimal("5.00"),
+            billing_cycle=cycle,
+            status=status,
+            start_date=next_billing_date - timedelta(days=400),
+            next_billing_date=next_billing_date,
+        )
+
+    def test_advances_stale_active_subscriptions_by_whole_periods(self):
+        weekly = self.create_subscription(self.now - timedelta(days=30))
+        yearly = self.create_subscription(self.now - timedelta(days=1), unit=BillingCycleUnit.YEARS)
+        paused = self.create_subscription(self.now - timedelta(days=30), status=SubscriptionStatus.PAUSED)
+        upcoming = self.create_subscription(self.now + timedelta(days=3))
+
+        self.assertEqual(rollover_billing_dates(batch_size=1, now=self.now), 2)
+
+        weekly.refresh_from_db()
+        yearly.refresh_from_db()
+        self.assertEqual(weekly.next_billing_date, self.now - timedelta(days=30) + timedelta(weeks=6))
+        self.assertEqual(yearly.next_billing_date, self.now - timedelta(days=1) + timedelta(days=730))
+        self.assertEqual(Subscription.objects.get(pk=paused.pk).next_billing_date, paused.next_billing_date)
+        self.assertEqual(Subscription.objects.get(pk=upcoming.pk).next_billing_date, upcoming.next_billing_date)
+        self.assertEqual(rollover_billing_dates(now=self.now), 0)
+
+    def test_keeps_dates_rescheduled_by_a_concurrent_write(self):
+        subscription = self.create_subscription(self.now - timedelta(days=30))
+        roll_forward = BillingCycle.roll_forward
+
+        def reschedule_then_roll_forward(cycle, date, reference_date):
+            Subscription.objects.filter(pk=subscription.pk).update(next_billing_date=self.now - timedelta(days=2))
+            return roll_forward(cycle, date, reference_date)
+
+        with patch.object(BillingCycle, "roll_forward", reschedule_then_roll_forward):
+            self.assertEqual(rollover_billing_dates(now=self.now), 0)
+
+        subscription.refresh_from_db()
+        self.assertEqual(subscription.next_billing_date, self.now - timedelta(days=2))
+
+
+class DeleteSubscriptionsTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="delete-user", password="safe-pass")
+        self.provider = Provider.objects.create(owner=self.user, name="Provider", category="Software")
+        self.cycle = BillingCycle.objects.create(owner=self.user, interval=1, unit=BillingCycleUnit.MONTHS)
+
+    def create_subscription(self, name, history=0):
+        subscription = Subscription.objects.create(
+            owner=self.user,
+            name=name,
+            provider=self.provider,
+            cost_amount=Decimal("5.00"),
+            billing_cycle=self.cycle,
+            start_date=timezone.now(),
+            next_billing_date=timezone.now() + timedelta(days=10),
+        )
+        NotificationRule.objects.create(subscription=subscription, timing=NotificationTiming.ONE_DAY_BEFORE)
+        RenewalEvent.objects.create(subscription=subscription, renewal_date=timezone.now(), amount_amount=Decimal("5.00"))
+        SubscriptionHistory.objects.bulk_create(
+            SubscriptionHistory(subscription=subscription, event_type=SubscriptionHistory.EventType.UPDATED)
+            for _ in range(history)
+        )
+        return subscription
+
+    def test_deletes_dependents_without_loading_them(self):
+        small = self.create_subscription("Small", history=1)
+        large = self.create_subscription("Large", history=500)
+        kept = self.create_subscription("Kept", history=3)
+
+        with CaptureQueriesContext(connection) as small_queries:
+            self.assertEqual(delete_subscriptions(Subscription.objects.filter(pk=small.pk)), 1)
+        with CaptureQueriesContext(connection) as large_queries:
+            delete_subscriptions(Subscription.objects.filter(pk=large.pk))
+
+        self.assertEqual(len(large_queries), len(small_queries))
+        history_reads = [query for query in large_queries if query["sql"].startswith("SELECT") and "history" in query["sql"]]
+        self.assertEqual(history_reads, [])
+        deletes = [query["sql"] for query in large_queries if query["sql"].startswith("DELETE")]
+        for model in (NotificationRule, RenewalEvent, SubscriptionHistory, Subscription):
+            self.assertEqual(sum(f'"{model._meta.db_table}"' in sql.split(" WHERE")[0] for sql in deletes), 1, model)
+
+        self.assertEqual(list(Subscription.objects.values_list("pk", flat=True)), [kept.pk])
+        self.assertEqual(SubscriptionHistory.objects.exclude(subscription=kept).count(), 0)
+        self.assertEqual(RenewalEvent.objects.count(), 1)
+        self.assertEqual(
+            set(DeletionLog.objects.values_list("collection", flat=True)),
+            {"subscriptions", "notification_rules", "renewal_events"},
+        )
+        self.assertEqual(DeletionLog.objects.filter(collection="subscriptions").count(), 2)
+
+    def test_deleting_nothing_is_a_no_op(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(delete_subscriptions(Subscription.objects.none()), 0)
+
+
+class StatusTransitionTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="transition-user", password="safe-pass")
+        provider = Provider.objects.create(owner=self.user, name="Provider", category="Software")
+        self.cycle = BillingCycle.objects.create(owner=self.user, interval=1, unit=BillingCycleUnit.MONTHS)
+        self.subscription = Subscription.objects.create(
+            owner=self.user,
+            name="Sub",
+            provider=provider,
+            cost_amount=Decimal("5.00"),
+            billing_cycle=self.cycle,
+            start_date=timezone.now() - timedelta(days=30),
+            next_billing_date=timezone.now() + timedelta(days=1),
+        )
+
+    def test_transition_is_a_single_conditional_update_of_its_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(change_status(self.subscription, "pause"))
+
+        updates = [query["sql"] for query in queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"status" IN', updates[0])
+        self.assertNotIn('"notes"', updates[0])
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.status, SubscriptionStatus.PAUSED)
+        self.assertEqual(self.subscription.version, 2)
+
+    def test_transition_read_before_a_concurrent_one_does_not_apply(self):
+        first = Subscription.objects.get(pk=self.subscription.pk)
+        second = Subscription.objects.get(pk=self.subscription.pk)
+
+        self.assertTrue(change_status(first, "cancel"))
+        self.assertFalse(change_status(second, "pause"))
+
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.status, SubscriptionStatus.CANCELLED)
+        self.assertEqual(self.subscription.version, 2)
+        self.assertEqual(
+            SubscriptionHistory.objects.filter(event_type=SubscriptionHistory.EventType.STATUS_CHANGED).count(), 1
+        )
+
+    def test_only_the_first_of_two_identical_transitions_applies(self):
+        first = Subscription.objects.get(pk=self.subscription.pk)
+        second = Subscription.objects.get(pk=self.subscription.pk)
+
+        self.assertEqual([change_status(first, "pause"), change_status(second, "pause")], [True, False])
+        self.assertEqual(SubscriptionHistory.objects.filter(subscription=self.subscription).count(), 1)
+
+    def test_resume_does_not_apply_after_the_billing_cycle_changed(self):
+        change_status(self.subscription, "pause")
+        stale = Subscription.objects.select_related("billing_cycle").get(pk=self.subscription.pk)
+        yearly = BillingCycle.objects.create(owner=self.user, interval=1, unit=BillingCycleUnit.YEARS)
+        Subscription.objects.filter(pk=self.subscription.pk).update(billing_cycle=yearly)
+
+        self.assertFalse(change_status(stale, "resume"))
+
+    def test_update_writes_changed_fields_only_at_the_expected_version(self):
+        editor = Subscription.objects.get(pk=self.subscription.pk)
+        change_status(self.subscription, "pause")
+        editor.notes = "stale edit"
+
+        self.assertFalse(update_subscription(editor, ["notes"], editor.version))
+
+        editor.cost_amount = Decimal("7.00")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(update_subscription(editor, ["cost_amount"], 2))
+
+        update = next(query["sql"] for query in queries if query["sql"].startswith("UPDATE"))
+        self.assertIn('"monthly_cost_base"', update)
+        self.assertNotIn('"notes"', update)
+        self.assertNotIn('"status" =', update)
+        self.subscription.refresh_from_db()
+        self.assertEqual(
+            (self.subscription.status, self.subscription.notes, self.subscription.monthly_cost_base, self.subscription.version),
+            (SubscriptionStatus.PAUSED, "", Decimal("7.0000"), 3),
+        )
+        self.assertEqual(editor.version, 3)
+
+    def test_save_bumps_the_version_so_stale_edits_do_not_apply(self):
+        editor = Subscription.objects.get(pk=self.subscription.pk)
+        self.subscription.notes = "saved in the admin"
+        self.subscription.save()
+
+        self.assertEqual(self.subscription.version, 2)
+        editor.notes = "stale edit"
+        self.assertFalse(update_subscription(editor, ["notes"], 1))
+        self.subscription.refresh_from_db()
+        self.assertEqual((self.subscription.notes, self.subscription.version), ("saved in the admin", 2))
+
+    def test_bulk_resume_skips_rows_changed_since_they_were_read(self):
+        change_status(self.subscription, "pause")
+        stale = list(Subscription.objects.select_related("billing_cycle").filter(pk=self.subscription.pk))
+        editor = Subscription.objects.get(pk=self.subscription.pk)
+        editor.notes = "edited in between"
+        self.assertTrue(update_subscription(editor, ["notes"], editor.version))
+
+        self.assertEqual(_resume_at_read_versions(stale, timezone.now()), [])
+        self.subscription.refresh_from_db()
+        self.assertEqual((self.subscription.status, self.subscription.version), (SubscriptionStatus.PAUSED, 3))
+
+        fresh = list(Subscription.objects.select_related("billing_cycle").filter(pk=self.subscription.pk))
+        self.assertEqual(_resume_at_read_versions(fresh, timezone.now()), [self.subscription.pk])
+        self.subscription.refresh_from_db()
+        self.assertEqual((self.subscription.status, self.subscription.version), (SubscriptionStatus.ACTIVE, 4))
+
+
+class ConcurrentStatusTransitionTests(TransactionTestCase):
+    worker_count = 4
+
+    def test_concurrent_transitions_apply_exactly_once(self):
+        # The SQLite test database is a file (settings.py), so every worker gets its own connection.
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Needs a test database that several connections can open.")
+        user = get_user_model().objects.create_user(username="concurrent-user", password="safe-pass")
+        provider = Provider.objects.create(owner=user, name="Provider", category="Software")
+        cycle = BillingCycle.objects.create(owner=user, interval=1, unit=BillingCycleUnit.MONTHS)
+        subscription = Subscription.objects.create(
+            owner=user,
+            name="Sub",
+            provider=provider,
+            cost_amount=Decimal("5.00"),
+            billing_cycle=cycle,
+            start_date=timezone.now(),
+            next_billing_date=timezone.now(),
+        )
+        barrier = Barrier(self.worker_count)
+
+        def worker():
+            try:
+                # Every worker reads the row before any of them writes, as concurrent requests would.
+                stale = Subscription.objects.get(pk=subscription.pk)
+                barrier.wait()
+                return change_status(stale, "pause")
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.worker_count) as executor:
+            results = list(executor.map(lambda _: worker(), range(self.worker_count)))
+
+        self.assertEqual(results.count(True), 1)
+        subscription.refresh_from_db()
+        self.assertEqual(subscription.version, 2)
+        self.assertEqual(SubscriptionHistory.objects.filter(subscription=subscription).count(), 1)
@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..sessions import _user_cache_key, purge_expired_sessions
+
+
+# What settings.py installs when a shared cache (REDIS_URL) is configured.
+cached_sessions = override_settings(
+    SESSION_ENGINE="django.contrib.sessions.backends.cached_db",
+    MIDDLEWARE=[
+        "subscriptions.middleware.CachedAuthenticationMiddleware"
+        if name == "django.contrib.auth.middleware.AuthenticationMiddleware"
+        else name
+        for name in settings.MIDDLEWARE
+    ],
+)
+
+
+@cached_sessions
+class CachedSessionUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username="session-user", password="old-pass-123")
+        self.client.login(username="session-user", password="old-pass-123")
+        self.url = reverse("subscriptions:provider-list")
+
+    def test_repeat_requests_skip_session_and_user_queries(self):
+        self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        tables = " ".join(query["sql"] for query in queries.captured_queries)
+        self.assertNotIn("django_session", tables)
+        self.assertNotIn("auth_user", tables)
+
+    def test_password_change_ends_other_sessions(self):
+        self.client.get(self.url)
+
+        self.user.set_password("new-pass-456")
+        self.user.save()
+
+        self.assertRedirects(self.client.get(self.url), f"{reverse('login')}?next={self.url}")
+
+    def test_deactivation_signs_the_user_out(self):
+        self.client.get(self.url)
+
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_inactive_cached_user_is_signed_out(self):
+        self.client.get(self.url)
+        get_user_model().objects.filter(pk=self.user.pk).update(is_active=False)
+        cached = cache.get(_user_cache_key(self.user.pk))
+        cached.is_active = False
+        cache.set(_user_cache_key(self.user.pk), cached)
+
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+        self.assertIsNone(cache.get(_user_cache_key(self.user.pk)))
+
+    def test_logout_drops_the_cached_user(self):
+        self.client.get(self.url)
+        self.assertIsNotNone(cache.get(_user_cache_key(self.user.pk)))
+
+        self.client.post(reverse("logout"))
+
+        self.assertIsNone(cache.get(_user_cache_key(self.user.pk)))
+
+
+class UnsharedCacheSessionTests(TestCase):
+    def test_without_a_shared_cache_sessions_and_users_come_from_the_database(self):
+        if settings.SHARED_CACHE:
+            self.skipTest("A shared cache is configured.")
+        user = get_user_model().objects.create_user(username="db-session-user", password="pass-123")
+        self.client.force_login(user)
+        url = reverse("subscriptions:provider-list")
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+
+        tables = " ".join(query["sql"] for query in queries.captured_queries)
+        self.assertIn("django_session", tables)
+        self.assertIn("auth_user", tables)
+        self.assertIsNone(cache.get(_user_cache_key(user.pk)))
+
+
+class PurgeExpiredSessionsTests(TestCase):
+    def test_deletes_only_expired_sessions_in_batches(self):
+        now = timezone.now()
+        for index in range(5):
+            Session.objects.create(session_key=f"expired-{index}", session_data="", expire_date=now - timedelta(days=1))
+        Session.objects.create(session_key="current", session_data="", expire_date=now + timedelta(days=1))
+
+        self.assertEqual(purge_expired_sessions(batch_size=2), 5)
+        self.assertEqual(list(Session.objects.values_list("session_key", flat=True)), ["current"])
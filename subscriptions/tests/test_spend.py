@@ -0,0 +1,119 @@
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from ..models import BillingCycle, BillingCycleUnit, DeletionLog, MonthlySpend, Provider, RenewalEvent, Subscription
+from ..services import monthly_spend_trend, process_due_renewals
+from ..spend import compact_renewal_events
+
+NOW = datetime(2025, 6, 15, 12, tzinfo=UTC)
+
+
+@override_settings(EXCHANGE_RATES={"USD": 1, "EUR": 2})
+class MonthlySpendTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="spender", password="safe-pass")
+        self.provider = Provider.objects.create(owner=self.user, name="Music", category="Streaming")
+        cycle = BillingCycle.objects.create(owner=self.user, interval=1, unit=BillingCycleUnit.MONTHS)
+        self.subscription = Subscription.objects.create(
+            owner=self.user,
+            name="Music",
+            provider=self.provider,
+            cost_amount=Decimal("5.00"),
+            billing_cycle=cycle,
+            start_date=NOW - timedelta(days=800),
+            next_billing_date=NOW,
+        )
+
+    def renewal(self, renewal_date, amount="5.00", currency="USD", **extra):
+        return RenewalEvent.objects.create(
+            subscription=self.subscription,
+            renewal_date=renewal_date,
+            amount_amount=Decimal(amount),
+            amount_currency=currency,
+            **extra,
+        )
+
+    def snapshots(self):
+        rows = MonthlySpend.objects.order_by("month", "currency")
+        return list(rows.values_list("month", "currency", "amount_minor", "renewals"))
+
+    def totals(self, months=3):
+        return [(line.month, line.total, line.renewals) for line in monthly_spend_trend(self.user.pk, months, now=NOW)]
+
+    def test_processing_renewals_adds_them_to_the_month(self):
+        first = self.renewal(datetime(2025, 6, 1, tzinfo=UTC))
+        self.renewal(datetime(2025, 6, 10, tzinfo=UTC), amount="2.50", currency="EUR")
+        self.renewal(datetime(2025, 6, 12, tzinfo=UTC))
+
+        self.assertEqual(process_due_renewals(now=NOW), 3)
+
+        self.assertEqual(self.snapshots(), [(date(2025, 6, 1), "EUR", 250, 1), (date(2025, 6, 1), "USD", 1000, 2)])
+        first.refresh_from_db()
+        self.assertTrue(first.counted_in_spend)
+        self.assertEqual(
+            self.totals(),
+            [(date(2025, 4, 1), Decimal("0"), 0), (date(2025, 5, 1), Decimal("0"), 0), (date(2025, 6, 1), Decimal("15.00"), 3)],
+        )
+
+    def test_compaction_folds_old_processed_renewals_and_keeps_the_trend(self):
+        self.renewal(datetime(2025, 4, 3, tzinfo=UTC))
+        process_due_renewals(now=datetime(2025, 4, 4, tzinfo=UTC))
+        # Marked processed by hand, so only compaction counts it.
+        self.renewal(datetime(2025, 4, 20, tzinfo=UTC), amount="7.00", is_processed=True)
+        recent = self.renewal(datetime(2025, 6, 1, tzinfo=UTC), is_processed=True)
+        pending = self.renewal(datetime(2025, 4, 25, tzinfo=UTC))
+        before = self.totals()
+
+        self.assertEqual(compact_renewal_events(older_than_days=30, batch_size=1, now=NOW), 2)
+
+        self.assertEqual(self.totals(), before)
+        self.assertEqual(before[0], (date(2025, 4, 1), Decimal("12.00"), 2))
+        self.assertEqual(self.snapshots(), [(date(2025, 4, 1), "USD", 1200, 2)])
+        self.assertCountEqual(RenewalEvent.objects.values_list("pk", flat=True), [recent.pk, pending.pk])
+        self.assertEqual(DeletionLog.objects.filter(collection="renewal_events").count(), 2)
+
+    def test_editing_or_deleting_a_counted_renewal_corrects_the_month(self):
+        edited = self.renewal(datetime(2025, 6, 1, tzinfo=UTC))
+        deleted = self.renewal(datetime(2025, 6, 2, tzinfo=UTC))
+        process_due_renewals(now=NOW)
+
+        edited.refresh_from_db()
+        edited.amount_amount = Decimal("6.00")
+        edited.save()
+        deleted.delete()
+
+        self.assertEqual(self.snapshots(), [])
+        self.assertEqual(self.totals(1), [(date(2025, 6, 1), Decimal("6.00"), 1)])
+        compact_renewal_events(older_than_days=0, now=NOW + timedelta(days=1))
+        self.assertEqual(self.snapshots(), [(date(2025, 6, 1), "USD", 600, 1)])
+
+    def test_deleting_the_subscription_keeps_spend_already_counted(self):
+        self.renewal(datetime(2025, 6, 1, tzinfo=UTC))
+        process_due_renewals(now=NOW)
+
+        self.subscription.delete()
+
+        self.assertEqual(self.totals(1), [(date(2025, 6, 1), Decimal("5.00"), 1)])
+
+    def test_deleting_the_provider_keeps_spend_already_counted(self):
+        self.renewal(datetime(2025, 6, 1, tzinfo=UTC))
+        process_due_renewals(now=NOW)
+
+        self.subscription.delete()
+        self.provider.delete()
+
+        self.assertEqual(self.totals(1), [(date(2025, 6, 1), Decimal("5.00"), 1)])
+        self.assertIsNone(MonthlySpend.objects.get().provider_id)
+
+    def test_amounts_written_without_save_are_counted_as_stored(self):
+        renewal = self.renewal(datetime(2025, 6, 1, tzinfo=UTC))
+        RenewalEvent.objects.filter(pk=renewal.pk).update(amount_amount=Decimal("7.25"))
+
+        self.assertEqual(self.totals(1), [(date(2025, 6, 1), Decimal("0"), 0)])
+        process_due_renewals(now=NOW)
+
+        self.assertEqual(self.snapshots(), [(date(2025, 6, 1), "USD", 725, 1)])
+        self.assertEqual(self.totals(1), [(date(2025, 6, 1), Decimal("7.25"), 1)])
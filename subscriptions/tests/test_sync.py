@@ -0,0 +1,182 @@
+from datetime import timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import archive_cancelled_subscriptions, restore_archived_subscription
+from ..models import (
+    ArchivedSubscription,
+    BillingCycle,
+    BillingCycleUnit,
+    DeletionLog,
+    NotificationRule,
+    NotificationTiming,
+    Provider,
+    RenewalEvent,
+    Subscription,
+    SubscriptionStatus,
+)
+from ..sync import SETTLE_DELAY, TOMBSTONE_RETENTION, SyncCursor, prune_deletion_log, sync_changes
+
+
+class SyncChangesTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="syncer", password="safe-pass")
+        self.other = get_user_model().objects.create_user(username="sync-other", password="safe-pass")
+        Provider.objects.create(name="Catalog", category="Streaming")
+        # The seeded provider catalog is shared too.
+        self.shared_providers = set(Provider.objects.filter(owner__isnull=True).values_list("pk", flat=True))
+        self.provider = Provider.objects.create(owner=self.user, name="Own", category="Software")
+        Provider.objects.create(owner=self.other, name="Hidden", category="Software")
+        self.cycle = BillingCycle.objects.create(owner=self.user, interval=1, unit=BillingCycleUnit.MONTHS)
+        self.subscription = self.create_subscription("Music")
+        self.rule = NotificationRule.objects.create(owner=self.user, timing=NotificationTiming.ONE_DAY_BEFORE)
+        self.event = RenewalEvent.objects.create(
+            subscription=self.subscription, renewal_date=timezone.now(), amount_amount=Decimal("5.00")
+        )
+
+    def create_subscription(self, name, **extra):
+        fields = {
+            "owner": self.user,
+            "name": name,
+            "provider": self.provider,
+            "cost_amount": Decimal("5.00"),
+            "billing_cycle": self.cycle,
+            "start_date": timezone.now(),
+            "next_billing_date": timezone.now() + timedelta(days=10),
+            **extra,
+        }
+        return Subscription.objects.create(**fields)
+
+    def later(self):
+        return timezone.now() + SETTLE_DELAY + timedelta(seconds=1)
+
+    def ids(self, page):
+        return {name: {row["id"] for row in rows} for name, rows in page.changes.items() if rows}
+
+    def test_first_sync_returns_owned_and_shared_rows(self):
+        page = sync_changes(self.user.pk, now=self.later())
+
+        self.assertEqual(
+            self.ids(page),
+            {
+                "providers": {*self.shared_providers, self.provider.pk},
+                "billing_cycles": {self.cycle.pk},
+                "subscriptions": {self.subscription.pk},
+                "notification_rules": {self.rule.pk},
+                "renewal_events": {self.event.pk},
+            },
+        )
+        self.assertEqual(page.changes["renewal_events"][0]["owner_id"], self.user.pk)
+        self.assertFalse(page.has_more)
+
+    def test_sync_without_changes_is_one_query(self):
+        cursor = sync_changes(self.user.pk, now=self.later()).cursor
+
+        with self.assertNumQueries(1):
+            page = sync_changes(self.user.pk, cursor, now=self.later())
+
+        self.assertEqual(self.ids(page), {})
+        self.assertEqual(page.deleted, [])
+        self.assertEqual(page.cursor, cursor)
+
+    def test_pages_through_every_change_once_and_holds_back_unsettled_rows(self):
+        seen = []
+        cursor = None
+        while True:
+            page = sync_changes(self.user.pk, cursor, limit=2, now=self.later())
+            seen.extend(row["id"] for rows in page.changes.values() for row in rows)
+            cursor = page.cursor
+            if not page.has_more:
+                break
+        expected = len(self.shared_providers) + 5
+        self.assertEqual(len(seen), expected)
+        self.assertEqual(len(set(seen)), expected)
+
+        self.subscription.name = "Music Family"
+        self.subscription.save()
+
+        self.assertEqual(self.ids(sync_changes(self.user.pk, cursor)), {})
+        settled = sync_changes(self.user.pk, cursor, now=self.later())
+        self.assertEqual(self.ids(settled), {"subscriptions": {self.subscription.pk}})
+
+    def test_deletions_become_tombstones(self):
+        cursor = sync_changes(self.user.pk, now=self.later()).cursor
+
+        subscription_pk, event_pk = self.subscription.pk, self.event.pk
+        self.subscription.delete()
+        page = sync_changes(self.user.pk, cursor, now=self.later())
+
+        self.assertCountEqual(
+            page.deleted,
+            [
+                {"collection": "subscriptions", "id": subscription_pk},
+                {"collection": "renewal_events", "id": event_pk},
+            ],
+        )
+        self.assertEqual(self.ids(page), {})
+
+    def test_deleting_an_account_leaves_no_tombstones(self):
+        self.other.delete()
+
+        self.assertFalse(DeletionLog.objects.exists())
+
+    def test_archiving_and_restoring_show_up_as_deletion_and_change(self):
+        cancelled = self.create_subscription(
+            "Old", status=SubscriptionStatus.CANCELLED, cancellation_date=timezone.now() - timedelta(days=200)
+        )
+        cursor = sync_changes(self.user.pk, now=self.later()).cursor
+
+        archive_cancelled_subscriptions(older_than_days=90)
+        page = sync_changes(self.user.pk, cursor, now=self.later())
+        self.assertEqual(page.deleted, [{"collection": "subscriptions", "id": cancelled.pk}])
+
+        restore_archived_subscription(ArchivedSubscription.objects.get(pk=cancelled.pk))
+        page = sync_changes(self.user.pk, page.cursor, now=self.later())
+        self.assertEqual(self.ids(page), {"subscriptions": {cancelled.pk}})
+
+    def test_prunes_tombstones_past_retention(self):
+        old = DeletionLog.objects.create(
+            owner=self.user, collection="providers", object_id=uuid4(), deleted_at=timezone.now() - TOMBSTONE_RETENTION * 2
+        )
+        recent = DeletionLog.objects.create(owner=self.user, collection="providers", object_id=uuid4())
+
+        self.assertEqual(prune_deletion_log(batch_size=1), 1)
+        self.assertFalse(DeletionLog.objects.filter(pk=old.pk).exists())
+        self.assertTrue(DeletionLog.objects.filter(pk=recent.pk).exists())
+
+
+class SyncViewTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="sync-api", password="safe-pass")
+        self.provider = Provider.objects.create(owner=self.user, name="Own", category="Software")
+        # Past the settle delay, including the catalog seeded moments ago by the test database setup.
+        Provider.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        self.url = reverse("subscriptions:sync")
+
+    def test_requires_login(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_returns_changes_and_a_cursor_to_resume_from(self):
+        self.client.force_login(self.user)
+
+        payload = self.client.get(self.url).json()
+
+        owned = [row["name"] for row in payload["changes"]["providers"] if row["owner_id"] == self.user.pk]
+        self.assertEqual(owned, ["Own"])
+        self.assertFalse(payload["has_more"])
+        resumed = self.client.get(self.url, {"since": payload["cursor"]}).json()
+        self.assertEqual(resumed["changes"]["providers"], [])
+        self.assertEqual(resumed["cursor"], payload["cursor"])
+
+    def test_rejects_malformed_and_expired_cursors(self):
+        self.client.force_login(self.user)
+        expired = SyncCursor(timezone.now() - TOMBSTONE_RETENTION - timedelta(days=1), uuid4()).encode()
+
+        self.assertEqual(self.client.get(self.url, {"since": "garbage"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"limit": "0"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"since": expired}).status_code, 410)
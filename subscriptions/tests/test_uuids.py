@@ -0,0 +1,47 @@
+import time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from .. import uuids
+from ..models import Provider
+
+
+class UUID7Tests(SimpleTestCase):
+    def test_sets_version_variant_and_millisecond_timestamp(self):
+        before = time.time_ns() // 1_000_000
+        value = uuids._uuid7()
+        after = time.time_ns() // 1_000_000
+
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, "specified in RFC 4122")
+        self.assertTrue(before <= value.int >> 80 <= after)
+
+    def test_increases_within_a_millisecond_and_when_the_clock_steps_back(self):
+        with patch.object(uuids.time, "time_ns", return_value=1_700_000_000_000_000_000):
+            same_millisecond = [uuids._uuid7() for _ in range(1000)]
+        with patch.object(uuids.time, "time_ns", return_value=1_600_000_000_000_000_000):
+            stepped_back = uuids._uuid7()
+
+        self.assertEqual(same_millisecond, sorted(same_millisecond))
+        self.assertEqual(len(set(same_millisecond)), 1000)
+        self.assertGreater(stepped_back, same_millisecond[-1])
+
+    def test_carries_into_the_timestamp_when_the_tail_overflows(self):
+        with patch.object(uuids, "_last", (1_700_000_000_000, uuids._TAIL_MASK)):
+            with patch.object(uuids.time, "time_ns", return_value=1_700_000_000_000_000_000):
+                value = uuids._uuid7()
+
+        self.assertEqual(value.int >> 80, 1_700_000_000_001)
+        self.assertEqual(value.version, 7)
+
+
+class UUID7PrimaryKeyTests(TestCase):
+    def test_new_rows_get_time_ordered_keys(self):
+        user = get_user_model().objects.create_user(username="keys", password="safe-pass")
+        first = Provider.objects.create(owner=user, name="First", category="Software")
+        second = Provider.objects.create(owner=user, name="Second", category="Software")
+
+        self.assertEqual(first.pk.version, 7)
+        self.assertLess(first.pk, second.pk)
@@ -2,6 +2,7 @@ from datetime import timedelta
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from django.utils import timezone
@@ -14,6 +15,7 @@ from ..models import (
     Provider,
     RenewalEvent,
     Subscription,
+    SubscriptionHistory,
     SubscriptionStatus,
 )
 
@@ -97,6 +99,13 @@ class DashboardViewTests(TestCase):
         expected = f"{login_url}?next={reverse('subscriptions:dashboard')}"
         self.assertRedirects(response, expected)
 
+    def test_renders_title_and_a_single_event_stream(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("subscriptions:dashboard"))
+
+        self.assertContains(response, "<title>Dashboard | SMP</title>", html=False)
+        self.assertContains(response, "new EventSource(", count=1)
+
     def test_displays_domain_counts(self):
         provider = Provider.objects.create(
             owner=self.user,
@@ -136,6 +145,28 @@ class DashboardViewTests(TestCase):
         self.assertEqual(response.context["notifications"], 1)
         self.assertEqual(response.context["renewals_pending"], 1)
 
+    def test_projected_mode_lists_subscriptions_without_renewal_events(self):
+        provider = Provider.objects.create(owner=self.user, name="StreamFlix", category="Streaming")
+        cycle = BillingCycle.objects.create(owner=self.user, interval=1, unit=BillingCycleUnit.MONTHS)
+        Subscription.objects.create(
+            owner=self.user,
+            name="Projected only",
+            provider=provider,
+            cost_amount=10,
+            cost_currency="USD",
+            billing_cycle=cycle,
+            status=SubscriptionStatus.ACTIVE,
+            start_date=timezone.now() - timedelta(days=20),
+            next_billing_date=timezone.now() + timedelta(days=10),
+        )
+        self.client.force_login(self.user)
+
+        recorded = self.client.get(reverse("subscriptions:dashboard"))
+        projected = self.client.get(reverse("subscriptions:dashboard"), {"renewals": "projected"})
+
+        self.assertNotContains(recorded, "Projected only")
+        self.assertContains(projected, "Projected only")
+
     def test_hides_other_users_data(self):
         other_user = get_user_model().objects.create_user(
             username="other-owner",
@@ -211,6 +242,86 @@ class DashboardViewTests(TestCase):
         self.assertEqual(response.context["renewals_pending"], 1)
 
 
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("calendar-user", password="pass1234")
+        provider = Provider.objects.create(owner=self.user, name="StreamFlix", category="Streaming")
+        cycle = BillingCycle.objects.create(owner=self.user, interval=1, unit=BillingCycleUnit.MONTHS)
+        self.subscription = Subscription.objects.create(
+            owner=self.user,
+            name="Premium",
+            provider=provider,
+            cost_amount=10,
+            cost_currency="USD",
+            billing_cycle=cycle,
+            status=SubscriptionStatus.ACTIVE,
+            start_date=timezone.now() - timedelta(days=20),
+            next_billing_date=timezone.now() + timedelta(days=10),
+        )
+        NotificationRule.objects.create(subscription=self.subscription, timing=NotificationTiming.THREE_DAYS_BEFORE)
+        self.client.force_login(self.user)
+        self.url = self.client.get(reverse("subscriptions:dashboard")).context["calendar_feed_url"]
+        self.client.logout()
+
+    def test_rejects_invalid_token(self):
+        response = self.client.get(
+            reverse("subscriptions:calendar-feed", args=[self.user.pk, "not-a-token"])
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_rejects_inactive_users(self):
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_replacing_the_feed_url_revokes_the_old_one(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse("subscriptions:calendar-feed-rotate"))
+        new_url = self.client.get(reverse("subscriptions:dashboard")).context["calendar_feed_url"]
+        self.client.logout()
+
+        self.assertRedirects(response, reverse("subscriptions:dashboard"), fetch_redirect_response=False)
+        self.assertNotEqual(new_url, self.url)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.client.get(new_url).status_code, 200)
+
+    def test_streams_projected_renewals_with_reminder_alarms(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        body = b"".join(response.streaming_content).decode()
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR"))
+        self.assertIn("SUMMARY:Premium renews (10.00 USD)", body)
+        self.assertIn("TRIGGER:-P3D", body)
+
+    def test_unchanged_feed_is_served_from_cache_and_honours_etag(self):
+        first = self.client.get(self.url)
+        b"".join(first.streaming_content)
+
+        with self.assertNumQueries(2):
+            cached = self.client.get(self.url)
+            not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(cached["ETag"], first["ETag"])
+        self.assertIn(b"Premium", cached.content)
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_changes_to_subscriptions_produce_a_new_etag(self):
+        first = self.client.get(self.url)
+
+        self.subscription.name = "Premium HD"
+        self.subscription.save()
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second["ETag"], first["ETag"])
+        self.assertIn(b"Premium HD", b"".join(second.streaming_content))
+
+
 class ProviderCRUDTests(TestCase):
     def setUp(self):
         self.user = get_user_model().objects.create_user("manager", password="pass1234")
@@ -316,6 +427,34 @@ class SubscriptionFeaturesTests(TestCase):
         self.assertContains(response, "DevSuite Pro")
         self.assertNotContains(response, "Stream Basic")
 
+    def test_subscription_list_filters_and_orders_by_normalized_monthly_cost(self):
+        yearly_cycle = BillingCycle.objects.create(owner=self.user, interval=1, unit=BillingCycleUnit.YEARS)
+        Subscription.objects.create(
+            owner=self.user,
+            name="Yearly EUR",
+            provider=self.provider,
+            cost_amount=120,
+            cost_currency="EUR",
+            billing_cycle=yearly_cycle,
+            status=SubscriptionStatus.ACTIVE,
+            start_date=timezone.now(),
+            next_billing_date=timezone.now() + timedelta(days=365),
+        )
+
+        response = self.client.get(
+            reverse("subscriptions:subscription-list"),
+            {"cost_max": "20", "order": "-cost_amount"},
+        )
+
+        self.assertEqual([sub.name for sub in response.context["object_list"]], ["Yearly EUR"])
+
+        response = self.client.get(reverse("subscriptions:subscription-list"), {"order": "-cost_amount"})
+
+        self.assertEqual(
+            [sub.name for sub in response.context["object_list"]],
+            ["DevSuite Pro", "Yearly EUR"],
+        )
+
     def test_subscription_form_includes_shared_provider_choices(self):
         Provider.objects.create(owner=None, name="Netflix", category="Streaming")
 
@@ -383,6 +522,7 @@ class SubscriptionFeaturesTests(TestCase):
                     "start_date": "2024-01-01",
                     "cancellation_date": "",
                     "notes": "updated",
+                    "version": self.subscription.version,
                 },
             )
 
@@ -393,6 +533,57 @@ class SubscriptionFeaturesTests(TestCase):
             timezone.make_aware(timezone.datetime(2026, 3, 21)),
         )
 
+    def test_update_subscription_rejects_a_stale_form(self):
+        edit_url = reverse("subscriptions:subscription-edit", args=[self.subscription.pk])
+        stale_version = self.subscription.version
+        self.client.post(reverse("subscriptions:subscription-pause", args=[self.subscription.pk]))
+
+        response = self.client.post(
+            edit_url,
+            {
+                "name": "Renamed",
+                "provider": str(self.provider.pk),
+                "cost_amount": "100.00",
+                "cost_currency": "USD",
+                "billing_cycle": str(self.cycle.pk),
+                "status": SubscriptionStatus.ACTIVE,
+                "start_date": "2024-01-01",
+                "cancellation_date": "",
+                "notes": "",
+                "version": stale_version,
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "changed while you were editing it")
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.name, "DevSuite Pro")
+        self.assertEqual(self.subscription.status, SubscriptionStatus.PAUSED)
+
+    def test_status_action_on_a_subscription_deleted_meanwhile_is_not_found(self):
+        def delete_instead(subscription, action):
+            Subscription.objects.filter(pk=subscription.pk).delete()
+            return False
+
+        with patch("subscriptions.views.change_status", side_effect=delete_instead):
+            response = self.client.post(reverse("subscriptions:subscription-pause", args=[self.subscription.pk]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_status_action_reports_a_transition_that_no_longer_applies(self):
+        pause_url = reverse("subscriptions:subscription-pause", args=[self.subscription.pk])
+        self.client.post(pause_url)
+
+        response = self.client.post(pause_url, follow=True)
+
+        self.assertContains(response, "Subscription is already paused.")
+        self.assertEqual(
+            SubscriptionHistory.objects.filter(
+                subscription=self.subscription, event_type=SubscriptionHistory.EventType.STATUS_CHANGED
+            ).count(),
+            1,
+        )
+
     def test_subscription_list_shows_provider_cancel_action_when_link_exists(self):
         response = self.client.get(reverse("subscriptions:subscription-list"))
 
@@ -476,3 +667,26 @@ class SubscriptionFeaturesTests(TestCase):
         )
 
         self.assertContains(response, "Add provider cancellation link")
+
+
+class NotificationRuleViewTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("rules-view-user", password="pass1234")
+        self.client.force_login(self.user)
+        self.url = reverse("subscriptions:notificationrule-add")
+
+    def test_creates_owner_default_rule_and_rejects_duplicates(self):
+        data = {"subscription": "", "timing": NotificationTiming.ONE_WEEK_BEFORE, "is_enabled": "on"}
+
+        response = self.client.post(self.url, data)
+
+        self.assertRedirects(response, reverse("subscriptions:notificationrule-list"))
+        rule = NotificationRule.objects.get()
+        self.assertEqual(rule.owner, self.user)
+        self.assertIsNone(rule.subscription)
+        self.assertContains(self.client.get(reverse("subscriptions:notificationrule-list")), "All subscriptions (default)")
+
+        duplicate = self.client.post(self.url, data)
+
+        self.assertContains(duplicate, "A default rule with this timing already exists.")
+        self.assertEqual(NotificationRule.objects.count(), 1)
@@ -6,6 +6,13 @@ app_name = "subscriptions"
 
 urlpatterns = [
     path("dashboard/", views.DashboardView.as_view(), name="dashboard"),
+    path("dashboard/refresh/", views.DashboardRefreshView.as_view(), name="dashboard-refresh"),
+    path("dashboard/events/", views.DashboardEventsView.as_view(), name="dashboard-events"),
+    path("calendar/rotate/", views.CalendarFeedRotateView.as_view(), name="calendar-feed-rotate"),
+    path("calendar/<int:user_id>/<str:token>.ics", views.CalendarFeedView.as_view(), name="calendar-feed"),
+    path("metrics", views.MetricsView.as_view(), name="metrics"),
+    path("sync/", views.SyncView.as_view(), name="sync"),
+    path("batch/", views.BatchView.as_view(), name="batch"),
     path("providers/", views.ProviderListView.as_view(), name="provider-list"),
     path("providers/add/", views.ProviderCreateView.as_view(), name="provider-add"),
     path("providers/<uuid:pk>/", views.ProviderDetailView.as_view(), name="provider-detail"),
@@ -23,6 +30,7 @@ urlpatterns = [
     path("subscriptions/<uuid:pk>/pause/", views.SubscriptionPauseView.as_view(), name="subscription-pause"),
     path("subscriptions/<uuid:pk>/resume/", views.SubscriptionResumeView.as_view(), name="subscription-resume"),
     path("subscriptions/<uuid:pk>/cancel/", views.SubscriptionCancelView.as_view(), name="subscription-cancel"),
+    path("subscriptions/<uuid:pk>/restore/", views.SubscriptionRestoreView.as_view(), name="subscription-restore"),
     path("notification-rules/", views.NotificationRuleListView.as_view(), name="notificationrule-list"),
     path("notification-rules/add/", views.NotificationRuleCreateView.as_view(), name="notificationrule-add"),
     path("notification-rules/<uuid:pk>/edit/", views.NotificationRuleUpdateView.as_view(), name="notificationrule-edit"),
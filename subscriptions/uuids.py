@@ -0,0 +1,56 @@
+"""Time-ordered UUIDs for primary keys.
+
+``uuid7`` (RFC 9562) starts with a 48-bit Unix timestamp in milliseconds, so
+keys created close together sort close together and inserts land at the right
+edge of B-tree indexes instead of on random pages. Existing v4 keys are valid
+UUIDs too; they simply keep their place in the index.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+
+_VERSION = 7
+_VARIANT = 0b10
+_TAIL_BITS = 74  # rand_a (12 bits) and rand_b (62 bits)
+_TAIL_MASK = (1 << _TAIL_BITS) - 1
+
+_lock = threading.Lock()
+_last = (0, 0)
+
+
+def _uuid7() -> uuid.UUID:
+    """RFC 9562 UUIDv7, monotonic within the process.
+
+    Keys made in the same millisecond, or after the clock stepped back, reuse
+    the last timestamp and add a random increment to the 74-bit tail, which
+    keeps them increasing and still unpredictable.
+    """
+    global _last
+    with _lock:
+        timestamp = time.time_ns() // 1_000_000
+        last_timestamp, last_tail = _last
+        if timestamp > last_timestamp:
+            tail = int.from_bytes(os.urandom(10)) & _TAIL_MASK
+        else:
+            timestamp = last_timestamp
+            tail = last_tail + 1 + (int.from_bytes(os.urandom(4)) & 0xFFFFFF)
+            if tail > _TAIL_MASK:
+                timestamp += 1
+                tail &= _TAIL_MASK
+        _last = (timestamp, tail)
+    rand_a, rand_b = tail >> 62, tail & ((1 << 62) - 1)
+    value = (timestamp & ((1 << 48) - 1)) << 80 | _VERSION << 76 | rand_a << 64 | _VARIANT << 62 | rand_b
+    return uuid.UUID(int=value)
+
+
+# Python 3.14 ships its own.
+_generate = getattr(uuid, "uuid7", _uuid7)
+
+
+def uuid7() -> uuid.UUID:
+    """A new UUIDv7; a module-level function so migrations reference the same default on every Python."""
+    return _generate()
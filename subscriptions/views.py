@@ -1,17 +1,45 @@
+import json
+
+from django import forms
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import login
 from django.contrib.auth import views as auth_views
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.db.models import F, Value
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from django.views import View, generic
 
-from .forms import SignInForm, SignUpForm
+from . import jobs
+from .archive import restore_archived_subscription
+from .batch import BatchError, apply_batch
+from .caching import get_data_version
+from .forms import (
+    NOTIFICATION_RULE_FIELDS,
+    RENEWAL_EVENT_FIELDS,
+    SUBSCRIPTION_FIELDS,
+    SignInForm,
+    SignUpForm,
+)
+from .ics import calendar_feed_token, is_valid_calendar_feed_token, render_renewal_feed, rotate_calendar_feed_token
+from .metrics import record_cache_lookup, render_metrics
 from .models import (
+    ArchivedSubscription,
     BillingCycle,
+    DashboardRollup,
     NotificationRule,
     Provider,
     RenewalEvent,
@@ -19,21 +47,19 @@ from .models import (
     SubscriptionHistory,
     SubscriptionStatus,
 )
-from .services import summarize_costs, upcoming_renewals
-
-
-def scope_queryset_for_user(queryset, user, owner_lookup: str = "owner"):
-    if user.is_superuser:
-        return queryset
-    return queryset.filter(**{owner_lookup: user})
-
-
-def scope_owned_or_shared_queryset(queryset, user, owner_lookup: str = "owner"):
-    if user.is_superuser:
-        return queryset
-    return queryset.filter(
-        Q(**{owner_lookup: user}) | Q(**{f"{owner_lookup}__isnull": True})
-    )
+from .scoping import scope_owned_or_shared_queryset, scope_queryset_for_user
+from .services import (
+    STATUS_TRANSITIONS,
+    change_status,
+    delete_subscriptions,
+    estimated_count,
+    refresh_dashboard_rollup,
+    spending_breakdown,
+    summarize_costs,
+    upcoming_renewals,
+    update_subscription,
+)
+from .sync import MAX_PAGE_SIZE, PAGE_SIZE, CursorExpired, SyncCursor, sync_changes
 
 
 class SignInView(auth_views.LoginView):
@@ -95,36 +121,183 @@ class DashboardView(LoginRequiredMixin, generic.TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        if self.request.user.is_superuser:
+            context.update(self.get_global_figures())
+        else:
+            context.update(self.get_user_figures())
+        renewals_mode = "projected" if self.request.GET.get("renewals") == "projected" else "events"
+        context["renewals_mode"] = renewals_mode
+        context["upcoming_renewals"] = upcoming_renewals(user=self.request.user, mode=renewals_mode)
+        context["base_currency"] = settings.BASE_CURRENCY
+        # Always the user's own subscriptions, superusers included.
+        context["spending"] = spending_breakdown(self.request.user.pk)
+        context["calendar_feed_url"] = self.request.build_absolute_uri(
+            reverse(
+                "subscriptions:calendar-feed",
+                args=[self.request.user.pk, calendar_feed_token(self.request.user.pk)],
+            )
+        )
+        return context
+
+    def get_global_figures(self) -> dict:
+        """System-wide figures from planner statistics and the last background rollup."""
+        rollup = DashboardRollup.objects.order_by("-created_at").first()
+        return {
+            "approximate": True,
+            "providers": estimated_count(Provider),
+            "subscriptions": estimated_count(Subscription),
+            "billing_cycles": estimated_count(BillingCycle),
+            "notifications": estimated_count(NotificationRule),
+            "renewals_pending": rollup.renewals_pending if rollup else None,
+            "monthly_total": rollup.monthly_total if rollup else None,
+            "annual_total": rollup.annual_total if rollup else None,
+            "rollup": rollup,
+        }
+
+    def get_user_figures(self) -> dict:
         subs = scope_queryset_for_user(
             Subscription.objects.select_related("provider", "billing_cycle"), self.request.user
         )
         active_subs = subs.filter(status=SubscriptionStatus.ACTIVE)
-        notification_rules = scope_queryset_for_user(
-            NotificationRule.objects.all(),
-            self.request.user,
-            owner_lookup="subscription__owner",
-        )
+        notification_rules = scope_queryset_for_user(NotificationRule.objects.all(), self.request.user)
         pending_renewals = scope_queryset_for_user(
             RenewalEvent.objects.filter(is_processed=False),
             self.request.user,
             owner_lookup="subscription__owner",
         )
         summary = summarize_costs(active_subs)
+        return {
+            "providers": scope_queryset_for_user(Provider.objects.all(), self.request.user).count(),
+            "subscriptions": subs.count(),
+            "billing_cycles": scope_queryset_for_user(BillingCycle.objects.all(), self.request.user).count(),
+            "notifications": notification_rules.count(),
+            "renewals_pending": pending_renewals.count(),
+            "monthly_total": summary.monthly_total,
+            "annual_total": summary.annual_total,
+        }
 
-        context["providers"] = scope_queryset_for_user(
-            Provider.objects.all(), self.request.user
-        ).count()
-        context["subscriptions"] = subs.count()
-        context["billing_cycles"] = scope_queryset_for_user(
-            BillingCycle.objects.all(), self.request.user
-        ).count()
-        context["notifications"] = notification_rules.count()
-        context["renewals_pending"] = pending_renewals.count()
-        context["monthly_total"] = summary.monthly_total
-        context["annual_total"] = summary.annual_total
-        context["upcoming_renewals"] = upcoming_renewals(user=self.request.user)
-        context["base_currency"] = settings.BASE_CURRENCY
-        return context
+
+class DashboardRefreshView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Queue an exact recount of the global dashboard figures."""
+
+    def test_func(self):
+        return self.request.user.is_superuser
+
+    def post(self, request):
+        jobs.enqueue(refresh_dashboard_rollup, priority=10)
+        messages.success(request, "Exact dashboard figures will be recomputed in the background.")
+        return redirect("subscriptions:dashboard")
+
+
+class CalendarFeedRotateView(LoginRequiredMixin, View):
+    """Issue a new calendar feed URL; the old one stops working."""
+
+    def post(self, request):
+        rotate_calendar_feed_token(request.user.pk)
+        messages.success(request, "Your calendar feed URL was replaced. Update it in your calendar app.")
+        return redirect("subscriptions:dashboard")
+
+
+class CalendarFeedView(View):
+    """Token-authenticated iCalendar feed, cached per data version so unchanged polls cost one
+    token check and one cache hit. Inactive users and revoked tokens get a 404."""
+
+    cache_timeout = 60 * 60 * 24
+
+    def get(self, request, user_id, token):
+        if not is_valid_calendar_feed_token(user_id, token):
+            raise Http404
+        etag = f'"{user_id}-{get_data_version(user_id)}-{timezone.now():%Y%m%d}"'
+        if etag in request.headers.get("If-None-Match", ""):
+            response: HttpResponse | StreamingHttpResponse = HttpResponseNotModified()
+        else:
+            cache_key = f"subscriptions:calendar-feed:{etag}"
+            feed = cache.get(cache_key)
+            record_cache_lookup("calendar_feed", feed is not None)
+            if feed is None:
+                response = StreamingHttpResponse(
+                    self.stream_and_cache(render_renewal_feed(user_id), cache_key),
+                    content_type="text/calendar; charset=utf-8",
+                )
+            else:
+                response = HttpResponse(feed, content_type="text/calendar; charset=utf-8")
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, max-age=300"
+        return response
+
+    def stream_and_cache(self, chunks, cache_key):
+        rendered = []
+        for chunk in chunks:
+            rendered.append(chunk)
+            yield chunk
+        cache.set(cache_key, "".join(rendered), self.cache_timeout)
+
+
+class DashboardEventsView(View):
+    """Fallback for the dashboard event stream, which ``asgi.py`` serves itself.
+
+    Reached only under WSGI, where every open stream would pin a worker thread.
+    204 tells EventSource to stop reconnecting; the dashboard still works on reload.
+    """
+
+    def get(self, request):
+        if not request.user.is_authenticated:
+            return HttpResponse(status=401)
+        return HttpResponse(status=204)
+
+
+class MetricsView(View):
+    """Prometheus scrape endpoint, protected by ``METRICS_TOKEN``; open without it only under ``DEBUG``."""
+
+    def get(self, request):
+        token = settings.METRICS_TOKEN
+        if not token:
+            if not settings.DEBUG:
+                return HttpResponse(status=403)
+        elif not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return HttpResponse(status=401)
+        body, content_type = render_metrics()
+        return HttpResponse(body, content_type=content_type)
+
+
+class SyncView(View):
+    """Incremental sync feed for API clients: changes and deletions after ``?since=<cursor>``."""
+
+    def get(self, request):
+        if not request.user.is_authenticated:
+            return JsonResponse({"detail": "Authentication required."}, status=401)
+        try:
+            since = request.GET.get("since")
+            cursor = SyncCursor.decode(since) if since else None
+            limit = int(request.GET.get("limit", PAGE_SIZE))
+        except ValueError:
+            return JsonResponse({"detail": "Invalid since or limit."}, status=400)
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return JsonResponse({"detail": f"limit must be between 1 and {MAX_PAGE_SIZE}."}, status=400)
+        try:
+            page = sync_changes(request.user.pk, cursor, limit)
+        except CursorExpired:
+            return JsonResponse({"detail": "Cursor expired; sync again without since."}, status=410)
+        return JsonResponse(page.as_json())
+
+
+class BatchView(View):
+    """Apply many creates and updates in one request and transaction; see ``subscriptions.batch``."""
+
+    def post(self, request):
+        if not request.user.is_authenticated:
+            return JsonResponse({"detail": "Authentication required."}, status=401)
+        try:
+            operations = json.loads(request.body)["operations"]
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse({"detail": "Expected a JSON object with an operations list."}, status=400)
+        try:
+            applied, results = apply_batch(request.user, operations)
+        except BatchError as exc:
+            return JsonResponse({"detail": str(exc)}, status=400)
+        except IntegrityError:
+            return JsonResponse({"detail": "The batch conflicts with concurrent changes; retry it."}, status=409)
+        return JsonResponse({"applied": applied, "results": results}, status=200 if applied else 400)
 
 
 class ProviderListView(LoginRequiredMixin, generic.ListView):
@@ -191,9 +364,53 @@ class BillingCycleDeleteView(
 class SubscriptionListView(UserScopedQuerysetMixin, LoginRequiredMixin, generic.ListView):
     model = Subscription
     template_name = "subscriptions/subscription_list.html"
+    # Cost filters and ordering use the normalized monthly cost in the base currency.
+    ordering_fields = {
+        "cost_amount": "monthly_cost_base",
+        "-cost_amount": "-monthly_cost_base",
+        "name": "name",
+        "-name": "-name",
+    }
+
+    # Only the cancelled list is paginated; it merges the archive, which grows without bound.
+    archive_page_size = 100
+    merged_columns = ("pk", "name", "monthly_cost_base", "archived")
+
+    def includes_archive(self) -> bool:
+        return self.request.GET.get("status") == SubscriptionStatus.CANCELLED
+
+    def get_paginate_by(self, queryset):
+        return self.archive_page_size if self.includes_archive() else None
 
     def get_queryset(self):
-        queryset = super().get_queryset().select_related("provider", "billing_cycle")
+        queryset = self.filter_queryset(super().get_queryset().select_related("provider", "billing_cycle"))
+        if not self.includes_archive():
+            return queryset
+        # Long-cancelled subscriptions live in the archive; list them alongside the live ones. The
+        # database orders the UNION and the paginator slices it, so only one page of keys is read.
+        archived = self.filter_queryset(self.scope_queryset(ArchivedSubscription.objects.all()))
+        order = self.ordering_fields.get(self.request.GET.get("order", ""), "name")
+        live_rows = queryset.order_by().annotate(archived=Value(False)).values(*self.merged_columns)
+        archived_rows = archived.order_by().annotate(archived=Value(True)).values(*self.merged_columns)
+        return live_rows.union(archived_rows, all=True).order_by(order, "pk")
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, object_list, is_paginated = super().paginate_queryset(queryset, page_size)
+        if self.includes_archive():
+            page.object_list = object_list = self.load_page(object_list)
+        return paginator, page, object_list, is_paginated
+
+    def load_page(self, rows) -> list:
+        """The live and archived subscriptions of one page of merged rows, in the order of the rows."""
+        rows = list(rows)
+        objects = {}
+        for model, archived in ((Subscription, False), (ArchivedSubscription, True)):
+            pks = [row["pk"] for row in rows if row["archived"] == archived]
+            if pks:
+                objects.update(model.objects.select_related("provider", "billing_cycle").in_bulk(pks))
+        return [objects[row["pk"]] for row in rows]
+
+    def filter_queryset(self, queryset):
         provider = self.request.GET.get("provider")
         status = self.request.GET.get("status")
         cost_min = self.request.GET.get("cost_min")
@@ -204,12 +421,12 @@ class SubscriptionListView(UserScopedQuerysetMixin, LoginRequiredMixin, generic.
         if status:
             queryset = queryset.filter(status=status)
         if cost_min:
-            queryset = queryset.filter(cost_amount__gte=cost_min)
+            queryset = queryset.filter(monthly_cost_base__gte=cost_min)
         if cost_max:
-            queryset = queryset.filter(cost_amount__lte=cost_max)
+            queryset = queryset.filter(monthly_cost_base__lte=cost_max)
         order = self.request.GET.get("order")
-        if order in {"cost_amount", "-cost_amount", "name", "-name"}:
-            queryset = queryset.order_by(order)
+        if order in self.ordering_fields:
+            queryset = queryset.order_by(self.ordering_fields[order])
         return queryset
 
     def get_context_data(self, **kwargs):
@@ -222,6 +439,7 @@ class SubscriptionListView(UserScopedQuerysetMixin, LoginRequiredMixin, generic.
         context["cost_min"] = self.request.GET.get("cost_min", "")
         context["cost_max"] = self.request.GET.get("cost_max", "")
         context["order"] = self.request.GET.get("order", "")
+        context["base_currency"] = settings.BASE_CURRENCY
         return context
 
 
@@ -229,6 +447,13 @@ class SubscriptionDetailView(UserScopedQuerysetMixin, LoginRequiredMixin, generi
     model = Subscription
     template_name = "subscriptions/subscription_detail.html"
 
+    def get_object(self, queryset=None):
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            archived = self.scope_queryset(ArchivedSubscription.objects.select_related("provider", "billing_cycle"))
+            return get_object_or_404(archived, pk=self.kwargs["pk"])
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         subscription: Subscription = self.object
@@ -243,17 +468,7 @@ class SubscriptionDetailView(UserScopedQuerysetMixin, LoginRequiredMixin, generi
 
 class SubscriptionFormMixin:
     model = Subscription
-    fields = [
-        "name",
-        "provider",
-        "cost_amount",
-        "cost_currency",
-        "billing_cycle",
-        "status",
-        "start_date",
-        "cancellation_date",
-        "notes",
-    ]
+    fields = SUBSCRIPTION_FIELDS
     template_name = "subscriptions/form.html"
     success_url = reverse_lazy("subscriptions:subscription-list")
 
@@ -317,17 +532,27 @@ class SubscriptionUpdateView(
     SubscriptionFormMixin,
     generic.UpdateView,
 ):
+    conflict_message = "This subscription was changed while you were editing it. Reload the page to see the latest version."
+
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        form.fields["version"] = forms.IntegerField(widget=forms.HiddenInput, initial=self.object.version)
+        return form
+
     def form_valid(self, form):
         self.assign_next_billing_date(form)
-        changed = form.changed_data.copy()
-        response = super().form_valid(form)
+        changed = [name for name in form.changed_data if name != "version"]
+        if not update_subscription(form.instance, [*changed, "next_billing_date"], form.cleaned_data["version"]):
+            form.add_error(None, self.conflict_message)
+            return self.form_invalid(form)
+        self.object = form.instance
         if changed:
             SubscriptionHistory.objects.create(
                 subscription=self.object,
                 event_type=SubscriptionHistory.EventType.UPDATED,
                 description=f"Updated fields: {', '.join(changed)}",
             )
-        return response
+        return HttpResponseRedirect(self.get_success_url())
 
 
 class SubscriptionDeleteView(UserScopedQuerysetMixin, LoginRequiredMixin, generic.DeleteView):
@@ -335,63 +560,68 @@ class SubscriptionDeleteView(UserScopedQuerysetMixin, LoginRequiredMixin, generi
     template_name = "subscriptions/confirm_delete.html"
     success_url = reverse_lazy("subscriptions:subscription-list")
 
+    def form_valid(self, form):
+        delete_subscriptions(Subscription.objects.filter(pk=self.object.pk))
+        return HttpResponseRedirect(self.get_success_url())
+
 
 class SubscriptionStatusActionView(LoginRequiredMixin, View):
-    action_name = ""
+    action = ""
 
     def post(self, request, pk):
-        queryset = scope_queryset_for_user(Subscription.objects.all(), request.user)
+        queryset = scope_queryset_for_user(Subscription.objects.select_related("billing_cycle"), request.user)
         subscription = get_object_or_404(queryset, pk=pk)
-        error = self.perform_action(subscription)
-        if error:
-            messages.error(request, error)
+        if change_status(subscription, self.action):
+            action_name = STATUS_TRANSITIONS[self.action].action_name
+            messages.success(request, f"Subscription {subscription.name} {action_name}.")
         else:
-            subscription.save()
-            SubscriptionHistory.objects.create(
-                subscription=subscription,
-                event_type=SubscriptionHistory.EventType.STATUS_CHANGED,
-                description=f"Subscription {self.action_name}",
-            )
-            messages.success(request, f"Subscription {subscription.name} {self.action_name}.")
+            # The UPDATE missed on the current status, which may be newer than the one read above.
+            try:
+                subscription.refresh_from_db(fields=["status"])
+            except Subscription.DoesNotExist:
+                raise Http404 from None
+            messages.error(request, self.error_message(subscription.status))
         return redirect("subscriptions:subscription-detail", pk=subscription.pk)
 
-    def perform_action(self, subscription: Subscription) -> str | None:
-        return None
+    def error_message(self, status: str) -> str:
+        return "Subscription changed in the meantime; please try again."
 
 
 class SubscriptionPauseView(SubscriptionStatusActionView):
-    action_name = "paused"
+    action = "pause"
 
-    def perform_action(self, subscription: Subscription) -> str | None:
-        if subscription.status == SubscriptionStatus.CANCELLED:
+    def error_message(self, status: str) -> str:
+        if status == SubscriptionStatus.CANCELLED:
             return "Cannot pause a cancelled subscription."
-        if subscription.status == SubscriptionStatus.PAUSED:
+        if status == SubscriptionStatus.PAUSED:
             return "Subscription is already paused."
-        subscription.status = SubscriptionStatus.PAUSED
-        return None
+        return super().error_message(status)
 
 
 class SubscriptionResumeView(SubscriptionStatusActionView):
-    action_name = "resumed"
+    action = "resume"
 
-    def perform_action(self, subscription: Subscription) -> str | None:
-        if subscription.status != SubscriptionStatus.PAUSED:
+    def error_message(self, status: str) -> str:
+        if status != SubscriptionStatus.PAUSED:
             return "Only paused subscriptions can be resumed."
-        subscription.status = SubscriptionStatus.ACTIVE
-        subscription.next_billing_date = subscription.billing_cycle.next_date(timezone.now())
-        return None
+        return super().error_message(status)
 
 
 class SubscriptionCancelView(SubscriptionStatusActionView):
-    action_name = "cancelled"
+    action = "cancel"
 
-    def perform_action(self, subscription: Subscription) -> str | None:
-        if subscription.status == SubscriptionStatus.CANCELLED:
+    def error_message(self, status: str) -> str:
+        if status == SubscriptionStatus.CANCELLED:
             return "Subscription already cancelled."
-        subscription.status = SubscriptionStatus.CANCELLED
-        subscription.cancellation_date = timezone.now()
-        subscription.renewal_events.filter(is_processed=False).delete()
-        return None
+        return super().error_message(status)
+
+
+class SubscriptionRestoreView(LoginRequiredMixin, View):
+    def post(self, request, pk):
+        queryset = scope_queryset_for_user(ArchivedSubscription.objects.all(), request.user)
+        subscription = restore_archived_subscription(get_object_or_404(queryset, pk=pk))
+        messages.success(request, f"Subscription {subscription.name} restored from the archive.")
+        return redirect("subscriptions:subscription-detail", pk=subscription.pk)
 
 
 class NotificationRuleListView(
@@ -399,15 +629,16 @@ class NotificationRuleListView(
 ):
     model = NotificationRule
     template_name = "subscriptions/notificationrule_list.html"
-    owner_lookup = "subscription__owner"
 
     def get_queryset(self):
-        return super().get_queryset().select_related("subscription")
+        return super().get_queryset().select_related("subscription").order_by(
+            F("subscription__name").asc(nulls_first=True), "timing"
+        )
 
 
-class NotificationRuleCreateView(LoginRequiredMixin, generic.CreateView):
+class NotificationRuleCreateView(LoginRequiredMixin, OwnerAssignCreateMixin, generic.CreateView):
     model = NotificationRule
-    fields = ["subscription", "timing", "is_enabled"]
+    fields = NOTIFICATION_RULE_FIELDS
     template_name = "subscriptions/form.html"
     success_url = reverse_lazy("subscriptions:notificationrule-list")
 
@@ -417,13 +648,25 @@ class NotificationRuleCreateView(LoginRequiredMixin, generic.CreateView):
             form.fields["subscription"].queryset = scope_queryset_for_user(
                 Subscription.objects.all(), self.request.user
             )
+            form.fields["subscription"].empty_label = "All subscriptions (default)"
         return form
 
+    def form_valid(self, form):
+        rule = form.instance
+        if rule.subscription_id is None:
+            # The owner is not a form field, so ModelForm skips this unique constraint.
+            owner_id = rule.owner_id or self.request.user.pk
+            clash = NotificationRule.objects.filter(owner_id=owner_id, subscription__isnull=True, timing=rule.timing)
+            if clash.exclude(pk=rule.pk).exists():
+                form.add_error("timing", "A default rule with this timing already exists.")
+                return self.form_invalid(form)
+        return super().form_valid(form)
+
 
 class NotificationRuleUpdateView(
     UserScopedQuerysetMixin, NotificationRuleCreateView, generic.UpdateView
 ):
-    owner_lookup = "subscription__owner"
+    pass
 
 
 class NotificationRuleDeleteView(
@@ -432,7 +675,6 @@ class NotificationRuleDeleteView(
     model = NotificationRule
     template_name = "subscriptions/confirm_delete.html"
     success_url = reverse_lazy("subscriptions:notificationrule-list")
-    owner_lookup = "subscription__owner"
 
 
 class RenewalEventListView(UserScopedQuerysetMixin, LoginRequiredMixin, generic.ListView):
@@ -446,7 +688,7 @@ class RenewalEventListView(UserScopedQuerysetMixin, LoginRequiredMixin, generic.
 
 class RenewalEventCreateView(LoginRequiredMixin, generic.CreateView):
     model = RenewalEvent
-    fields = ["subscription", "renewal_date", "amount_amount", "amount_currency", "is_processed"]
+    fields = RENEWAL_EVENT_FIELDS
     template_name = "subscriptions/form.html"
     success_url = reverse_lazy("subscriptions:renewalevent-list")
 